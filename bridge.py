@@ -1,10 +1,18 @@
+from doggie_lab import log
 import can
+import logging
+
+# Every forwarded frame is logged at DEBUG (DOGGIE_LAB_LOG_LEVEL=DEBUG), not
+# rate limited, and written by a background thread so a slow terminal doesn't
+# hold the bridge back
+log.configure(rate_limit=False)
+logger = logging.getLogger("doggie_lab.bridge")
 
 # Initialize two CAN interfaces
 bus1 = can.interface.Bus(channel='vcan0', bustype='socketcan')
 bus2 = can.interface.Bus(channel='vcan1', bustype='socketcan')
 
-print("Bridging vcan0 and vcan1... Press Ctrl+C to stop.")
+logger.info("Bridging vcan0 and vcan1... Press Ctrl+C to stop.")
 
 try:
     while True:
@@ -12,16 +20,16 @@ try:
         msg = bus1.recv(timeout=0.1)
         if msg:
             bus2.send(msg)
-            print(f"Forwarded from vcan0 to vcan1: {msg}")
+            logger.debug("Forwarded from vcan0 to vcan1: %s", msg)
 
         # Read from vcan1 and send to vcan0
         msg = bus2.recv(timeout=0.1)
         if msg:
             bus1.send(msg)
-            print(f"Forwarded from vcan1 to vcan0: {msg}")
+            logger.debug("Forwarded from vcan1 to vcan0: %s", msg)
 
 except KeyboardInterrupt:
-    print("Stopped bridging.")
+    logger.info("Stopped bridging.")
 finally:
     bus1.shutdown()
     bus2.shutdown()
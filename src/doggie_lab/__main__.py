@@ -1,8 +1,28 @@
-from doggie_lab.car import Car, CarBuilder
-from doggie_lab.gui.window import Window
+from doggie_lab.car import Car, CarBuilder, POWERTRAIN_BODY
+from doggie_lab.car.udp_bus import DEFAULT_PORT
+from doggie_lab.gui.app import run_gui
+from doggie_lab.gui.link import UiLink
+from doggie_lab.profiling import ThreadProfiler
+from doggie_lab import log, timing
+from doggie_lab.analysis.intrusion import IntrusionDetector
+from doggie_lab.analysis.bus_monitor import BusMonitor
+from doggie_lab.messages import format_decode_cache_report
+from doggie_lab.analysis.bus_load import (
+    BusLoadMonitor,
+    format_report,
+    schedule_load,
+    slcan_load,
+)
+from typing import Optional, Set
 import argparse
+import multiprocessing
 import sys
 import signal
+import threading
+import time
+
+
+BUS_LOAD_REPORT_PERIOD = 5.0
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -28,6 +48,13 @@ def parse_arguments() -> argparse.Namespace:
         help='Use socketCAN interfaces (e.g., can0 can1)'
     )
 
+    # CAN over UDP, for clients without hardware or vcan
+    group.add_argument(
+        '--udp',
+        metavar='HOST:PORT',
+        help=f'Serve the CAN bus over UDP to doggie_lab.tools.udp_client (e.g., 127.0.0.1:{DEFAULT_PORT}, 0.0.0.0 for the LAN)'
+    )
+
     # CAN bus speed argument
     parser.add_argument(
         '--speed',
@@ -36,44 +63,312 @@ def parse_arguments() -> argparse.Namespace:
         help='CAN bus speed in bits per second (default: 500000)'
     )
 
+    parser.add_argument(
+        '--no-gui',
+        action='store_true',
+        help='Run the simulation without the dashboard'
+    )
+
+    parser.add_argument(
+        '--loopback',
+        action='store_true',
+        help='Deliver frames between local ECUs directly, dropping their echo from RX'
+    )
+
+    parser.add_argument(
+        '--segments',
+        action='store_true',
+        help='Put the powertrain ECUs on an internal bus behind a gateway ECU, only the body ECUs on the CAN interfaces'
+    )
+
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Run every ECU in its own process, exchanging frames through shared memory'
+    )
+
+    parser.add_argument(
+        '--bus-load',
+        action='store_true',
+        help='Print the periodic schedule load and report the measured bus load'
+    )
+
+    parser.add_argument(
+        '--ids',
+        action='store_true',
+        help='Run the intrusion detector on the bus and print its alerts'
+    )
+
+    parser.add_argument(
+        '--monitor',
+        action='store_true',
+        help='Show every message of the bus with its last data and rate in the dashboard'
+    )
+
+    parser.add_argument(
+        '--realtime',
+        action='store_true',
+        help='Schedule periodic ECU tasks in real-time mode (see --fifo, --cpus and --spin)'
+    )
+
+    parser.add_argument(
+        '--spin',
+        action='store_true',
+        help='With --realtime, busy-wait the last 0.5 ms before each deadline for sub-millisecond accuracy (keeps a CPU busy)'
+    )
+
+    parser.add_argument(
+        '--fifo',
+        action='store_true',
+        help='With --realtime, run periodic tasks with the SCHED_FIFO policy (Linux, needs CAP_SYS_NICE)'
+    )
+
+    parser.add_argument(
+        '--cpus',
+        type=parse_cpus,
+        default=None,
+        metavar='LIST',
+        help='With --realtime, pin periodic tasks to these CPUs (e.g., 2,3)'
+    )
+
+    parser.add_argument(
+        '--log-level',
+        type=str.upper,
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        default=None,
+        help=f'Minimum level of the ECU and simulator logs (default: ${log.LEVEL_ENV} or INFO)'
+    )
+
+    parser.add_argument(
+        '--log-json',
+        action='store_true',
+        help='Write the logs as JSON lines'
+    )
+
+    parser.add_argument(
+        '--log-file',
+        metavar='FILE',
+        help='Append the logs to FILE instead of stderr'
+    )
+
+    parser.add_argument(
+        '--no-log-rate-limit',
+        action='store_true',
+        help='Write every repeated log message'
+    )
+
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='profile',
+        default=None,
+        metavar='DIR',
+        help='Profile every thread, writing per-thread profiles and a CPU summary to DIR (default: profile)'
+    )
+
     return parser.parse_args()
 
 
-def signal_handler(sig, frame, car: Car, window: Window):
+def parse_cpus(value: str) -> Set[int]:
+    """Parse a comma separated list of CPU numbers."""
+    try:
+        return {int(cpu) for cpu in value.split(",")}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid CPU list: {value}")
+
+
+def serial_baudrate(port: str) -> Optional[int]:
+    """Extract the baudrate from a PORT@BAUDRATE serial channel."""
+    if "@" not in port:
+        return None
+
+    return int(port.rsplit("@", 1)[1])
+
+
+def check_bus_load(args: argparse.Namespace) -> None:
+    """Warn when the simulator's periodic schedule doesn't fit in the bus."""
+    baudrate = None
+    if args.serial is not None:
+        baudrate = min(
+            (b for b in map(serial_baudrate, args.serial) if b is not None),
+            default=None,
+        )
+
+    if args.bus_load:
+        print(format_report(args.speed, baudrate))
+
+    load = sum(schedule_load(args.speed).values())
+    if load > 1.0:
+        print(f"Warning: periodic traffic needs {load * 100:.0f}% of a {args.speed} bit/s bus")
+
+    if baudrate is not None and slcan_load(baudrate) > 1.0:
+        print(
+            f"Warning: periodic traffic needs {slcan_load(baudrate) * 100:.0f}%"
+            f" of a {baudrate} baud slcan link, frames will be dropped"
+        )
+
+
+def bus_load_report_loop(monitor: BusLoadMonitor) -> None:
+    while True:
+        time.sleep(BUS_LOAD_REPORT_PERIOD)
+        print(monitor.format_report())
+        monitor.reset()
+
+
+def write_profile(profiler: ThreadProfiler, directory: str, car: Car) -> None:
+    profiler.stop()
+    profiler.dump(directory, car.ecus)
+    print(profiler.summary(car.ecus))
+    print(format_decode_cache_report())
+    print(f"Profiles written to {directory}")
+
+
+def start_gui() -> multiprocessing.Process:
+    """Run the dashboard in its own process, linked to the UiEcus."""
+    context = multiprocessing.get_context("spawn")
+    sim_conn, gui_conn = context.Pipe()
+
+    gui_process = context.Process(
+        target=run_gui, args=(gui_conn,), name="Doggie Lab GUI", daemon=True
+    )
+    gui_process.start()
+    UiLink.connect(sim_conn)
+
+    return gui_process
+
+
+def shutdown(
+    car: Car,
+    args: argparse.Namespace,
+    gui_process: Optional[multiprocessing.Process],
+    profiler: Optional[ThreadProfiler],
+    detector: Optional[IntrusionDetector],
+) -> None:
+    """Stop the car and print the reports, on Ctrl+C or when the dashboard is closed."""
+    if profiler is not None:
+        # Sample the thread CPU times while the threads are alive
+        profiler.stop()
+    car.stop()
+    if detector is not None:
+        detector.stop()
+    if args.realtime:
+        print(timing.format_report())
+    if car.gateway is not None:
+        print(car.gateway.format_report())
+    if detector is not None:
+        print(detector.format_report())
+    if car.processes is not None:
+        print(car.processes.format_report())
+    if car.tx_stats is not None:
+        print(car.tx_stats.format_report())
+    for serial_bus in car.serial_buses:
+        print(serial_bus.format_report())
+    if gui_process is not None:
+        gui_process.terminate()
+    if profiler is not None:
+        write_profile(profiler, args.profile, car)
+
+
+def signal_handler(
+    sig,
+    frame,
+    car: Car,
+    gui_process: Optional[multiprocessing.Process],
+    profiler: Optional[ThreadProfiler],
+    detector: Optional[IntrusionDetector],
+    args,
+):
     """Handle Ctrl+C signal."""
     print("\nCtrl+C pressed. Stopping car...")
-    car.stop()
-    window.clean()
+    shutdown(car, args, gui_process, profiler, detector)
     sys.exit(0)
 
 
 def main():
     # Parse arguments
     args = parse_arguments()
+    check_bus_load(args)
+
+    # ECU threads only queue their records, a background thread writes them
+    log.configure(args.log_level, args.log_json, args.log_file, not args.no_log_rate_limit)
+
+    # Before building the car, the ECU threads start timing right away
+    timing.configure(args.realtime, args.fifo, args.cpus, args.spin)
+
+    gui_process = None if args.no_gui else start_gui()
 
-    window = Window()
+    # Started before the car so the ECU and Notifier threads get profiled
+    profiler = None
+    if args.profile is not None:
+        profiler = ThreadProfiler()
+        profiler.start()
 
     # Create car instance with instrument cluster and CAN bus
     car: Car
+    topology = POWERTRAIN_BODY if args.segments else None
     if args.serial is not None:
-        car = CarBuilder.from_serial(*args.serial, speed=args.speed)
+        car = CarBuilder.from_serial(
+            *args.serial,
+            speed=args.speed,
+            loopback=args.loopback,
+            topology=topology,
+            processes=args.processes,
+        )
+
+    elif args.udp is not None:
+        car = CarBuilder.from_udp(
+            args.udp,
+            loopback=args.loopback,
+            topology=topology,
+            processes=args.processes,
+        )
 
     else:
-        car = CarBuilder.from_socketcan(*args.socketcan, speed=args.speed)
+        car = CarBuilder.from_socketcan(
+            *args.socketcan,
+            speed=args.speed,
+            loopback=args.loopback,
+            topology=topology,
+            processes=args.processes,
+        )
+
+    if args.bus_load:
+        monitor = BusLoadMonitor(args.speed)
+        car.add_listener(monitor)
+        threading.Thread(
+            target=bus_load_report_loop, args=(monitor,), daemon=True
+        ).start()
+
+    detector = None
+    if args.ids:
+        detector = IntrusionDetector()
+        detector.start()
+        car.add_listener(detector)
+
+    if args.monitor and gui_process is not None:
+        bus_monitor = BusMonitor()
+        bus_monitor.start()
+        car.add_listener(bus_monitor)
 
     car.start()
     print("Car running")
 
     # Setup signal handler for Ctrl+C
     signal.signal(
-        signal.SIGINT, lambda sig, frame: signal_handler(sig, frame, car, window)
+        signal.SIGINT,
+        lambda sig, frame: signal_handler(
+            sig, frame, car, gui_process, profiler, detector, args
+        ),
     )
 
-    # Keep main thread running
+    # Keep main thread running until the dashboard is closed (or Ctrl+C)
     try:
-        window.run()
-        window.clean()
-        car.stop()
+        if gui_process is not None:
+            gui_process.join()
+        else:
+            threading.Event().wait()
+
+        shutdown(car, args, gui_process, profiler, detector)
 
     except KeyboardInterrupt:
         # This should be handled by signal handler
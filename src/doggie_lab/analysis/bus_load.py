@@ -0,0 +1,274 @@
+from doggie_lab.messages import (
+    EcuMessage,
+    KeyMessage,
+    EngineStatusMessage,
+    SpeedStatusMessage,
+    RpmStatusMessage,
+    AbsStatusMessage,
+    AirbagStatusMessage,
+    DoorsStatusMessage,
+    CruiseControlMessage,
+    AbsMessage,
+)
+from can import Listener, Message
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+import argparse
+import math
+import threading
+import time
+
+
+# SOF .. CRC for a base/extended frame without data, the part subject to stuffing
+STUFFED_BITS_STD = 34
+STUFFED_BITS_EXT = 54
+# CRC delimiter, ACK slot + delimiter, EOF and interframe space
+TRAILER_BITS = 13
+
+# Bits per character on the serial line (8N1)
+UART_BITS_PER_CHAR = 10
+
+
+def frame_bits(dlc: int, extended: bool = False, stuffing: bool = True) -> int:
+    """
+    Worst-case number of bits a classic CAN data frame occupies on the bus.
+
+    Args:
+        dlc: Number of data bytes (0-8)
+        extended: Whether the frame uses a 29 bit identifier
+        stuffing: Include the worst-case number of stuff bits
+
+    Returns:
+        Frame length in bits, including the interframe space
+    """
+    stuffed = (STUFFED_BITS_EXT if extended else STUFFED_BITS_STD) + 8 * dlc
+    bits = stuffed + TRAILER_BITS
+
+    if stuffing:
+        bits += (stuffed - 1) // 4
+
+    return bits
+
+
+def slcan_chars(dlc: int, extended: bool = False) -> int:
+    """Number of ASCII characters an slcan adapter uses to transfer a frame."""
+    # 't'/'T' + identifier + DLC + data in hex + '\r'
+    return 1 + (8 if extended else 3) + 1 + 2 * dlc + 1
+
+
+@dataclass
+class PeriodicMessage:
+    """
+    A message an ECU broadcasts on its own, every `period` seconds.
+
+    Statuses sent on change (see ecus.tx_policy.ChangeTriggeredTx) have their
+    heartbeat as `period`. On top of it, changes can send up to `burst` frames
+    back to back, `min_period` apart (the cycle the ECU updates them at).
+    """
+
+    sender: str
+    message: EcuMessage
+    period: float
+    burst: float = 0
+    min_period: Optional[float] = None
+
+    @property
+    def arbitration_id(self) -> int:
+        return self.message.get_id()
+
+    @property
+    def dlc(self) -> int:
+        return len(self.message.to_can_msg().data)
+
+    @property
+    def frames_per_second(self) -> float:
+        return 1 / self.period
+
+    @property
+    def peak_frames_per_second(self) -> float:
+        """Rate with a change on every update."""
+        if not self.burst:
+            return self.frames_per_second
+        return 1 / self.min_period
+
+    def min_span(self, frames: int) -> float:
+        """Shortest time `frames` consecutive frames can take, spending the whole burst."""
+        intervals = frames - 1
+        if not self.burst:
+            return intervals * self.period
+
+        bursting = min(self.burst, intervals)
+        return bursting * self.min_period + (intervals - bursting) * self.period
+
+    def max_frames_per_second(self, window: float) -> float:
+        """Highest rate over `window` seconds, spending the whole burst in it."""
+        if not self.burst:
+            return self.frames_per_second
+
+        bursting = min(self.burst, window / self.min_period)
+        return (bursting + (window - bursting * self.min_period) / self.period) / window
+
+
+# Central and Doors statuses: heartbeat of an unchanged value (STATUS_HEARTBEAT
+# of the ECUs) and cycle the values are updated at
+STATUS_HEARTBEAT = 1.0
+STATUS_UPDATE = 0.1
+# Change-triggered frames allowed back to back: a few switches of a status
+# (doors locked and unlocked, engine started...), RPM and speed change on
+# nearly every update while driving
+STATUS_BURST = 3
+DRIVING_BURST = math.inf
+
+# Periodic traffic generated by the ECUs in doggie_lab.ecus
+PERIODIC_SCHEDULE: List[PeriodicMessage] = [
+    PeriodicMessage("Immo ECU", KeyMessage(True), 0.001),
+    PeriodicMessage("Central ECU", EngineStatusMessage(True), STATUS_HEARTBEAT, STATUS_BURST, STATUS_UPDATE),
+    PeriodicMessage("Central ECU", RpmStatusMessage(0), STATUS_HEARTBEAT, DRIVING_BURST, STATUS_UPDATE),
+    PeriodicMessage("Central ECU", AbsStatusMessage(False), STATUS_HEARTBEAT, STATUS_BURST, STATUS_UPDATE),
+    PeriodicMessage("Central ECU", AirbagStatusMessage(True), STATUS_HEARTBEAT, STATUS_BURST, STATUS_UPDATE),
+    PeriodicMessage("Central ECU", SpeedStatusMessage(0), STATUS_HEARTBEAT, DRIVING_BURST, STATUS_UPDATE),
+    PeriodicMessage(
+        "Doors ECU", DoorsStatusMessage(True, True, True, True), STATUS_HEARTBEAT, STATUS_BURST, STATUS_UPDATE
+    ),
+    PeriodicMessage("Cruise Control ECU", CruiseControlMessage(True, 0), 0.2),
+    PeriodicMessage("ABS ECU", AbsMessage(), 0.5),
+]
+
+
+def schedule_load(
+    bitrate: int, schedule: Iterable[PeriodicMessage] = PERIODIC_SCHEDULE
+) -> Dict[int, float]:
+    """
+    Compute the worst-case bus utilization of a periodic schedule, with every
+    change-triggered message changing on each update.
+
+    Args:
+        bitrate: CAN bus speed in bits per second
+        schedule: Periodic messages to account for
+
+    Returns:
+        Utilization (0.0 = idle, 1.0 = saturated) keyed by arbitration ID
+    """
+    load: Dict[int, float] = {}
+
+    for entry in schedule:
+        bits = frame_bits(entry.dlc) * entry.peak_frames_per_second
+        load[entry.arbitration_id] = load.get(entry.arbitration_id, 0.0) + bits / bitrate
+
+    return load
+
+
+def slcan_load(
+    baudrate: int, schedule: Iterable[PeriodicMessage] = PERIODIC_SCHEDULE
+) -> float:
+    """Utilization of an slcan serial link carrying the whole schedule."""
+    chars = sum(slcan_chars(entry.dlc) * entry.peak_frames_per_second for entry in schedule)
+    return chars * UART_BITS_PER_CHAR / baudrate
+
+
+def format_report(
+    bitrate: int,
+    baudrate: Optional[int] = None,
+    schedule: Iterable[PeriodicMessage] = PERIODIC_SCHEDULE,
+) -> str:
+    """Human readable table of the schedule load for the given bitrate."""
+    schedule = list(schedule)
+    load = schedule_load(bitrate, schedule)
+
+    lines = [f"Periodic bus load at {bitrate} bit/s (worst-case stuffing)"]
+    for arbitration_id, utilization in sorted(load.items()):
+        senders = sorted({e.sender for e in schedule if e.arbitration_id == arbitration_id})
+        lines.append(
+            f"  0x{arbitration_id:03X} {', '.join(senders):<20} {utilization * 100:6.2f}%"
+        )
+    lines.append(f"  Total{'':<22}{sum(load.values()) * 100:6.2f}%")
+
+    if baudrate is not None:
+        lines.append(
+            f"slcan serial link at {baudrate} baud: {slcan_load(baudrate, schedule) * 100:.2f}%"
+        )
+
+    return "\n".join(lines)
+
+
+class BusLoadMonitor(Listener):
+    """
+    Measures the bus utilization of received traffic.
+
+    Attach it to a Notifier and call `utilization()` to get the load seen since
+    the last `reset()`.
+    """
+
+    def __init__(self, bitrate: int) -> None:
+        self.bitrate = bitrate
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._bits: Dict[int, int] = {}
+            self._frames: Dict[int, int] = {}
+            self._start = time.monotonic()
+
+    def on_message_received(self, msg: Message) -> None:
+        bits = frame_bits(msg.dlc, msg.is_extended_id)
+
+        with self._lock:
+            self._bits[msg.arbitration_id] = self._bits.get(msg.arbitration_id, 0) + bits
+            self._frames[msg.arbitration_id] = self._frames.get(msg.arbitration_id, 0) + 1
+
+    def utilization(self) -> Dict[int, float]:
+        """Measured utilization keyed by arbitration ID."""
+        with self._lock:
+            elapsed = max(time.monotonic() - self._start, 1e-9)
+            capacity = self.bitrate * elapsed
+            return {
+                arbitration_id: bits / capacity
+                for arbitration_id, bits in self._bits.items()
+            }
+
+    def frame_rates(self) -> Dict[int, float]:
+        """Measured frames per second keyed by arbitration ID."""
+        with self._lock:
+            elapsed = max(time.monotonic() - self._start, 1e-9)
+            return {
+                arbitration_id: frames / elapsed
+                for arbitration_id, frames in self._frames.items()
+            }
+
+    def format_report(self) -> str:
+        utilization = self.utilization()
+        rates = self.frame_rates()
+
+        lines = [f"Measured bus load at {self.bitrate} bit/s"]
+        for arbitration_id in sorted(utilization):
+            lines.append(
+                f"  0x{arbitration_id:03X} {rates[arbitration_id]:8.1f} fps"
+                f" {utilization[arbitration_id] * 100:6.2f}%"
+            )
+        lines.append(f"  Total{'':<14}{sum(utilization.values()) * 100:6.2f}%")
+
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doggie Lab CAN bus load calculator")
+    parser.add_argument(
+        "--speed",
+        type=int,
+        default=500000,
+        help="CAN bus speed in bits per second (default: 500000)",
+    )
+    parser.add_argument(
+        "--baudrate",
+        type=int,
+        default=None,
+        help="slcan serial baudrate to check as well (e.g., 921600)",
+    )
+    args = parser.parse_args()
+
+    print(format_report(args.speed, args.baudrate))
+
+
+if __name__ == "__main__":
+    main()
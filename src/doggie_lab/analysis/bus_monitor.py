@@ -0,0 +1,167 @@
+"""
+Live per-message view of the bus traffic for the dashboard.
+
+The monitor is a Notifier listener whose on_message_received only counts the
+frame and keeps its payload, in the fixed slot of its (arbitration ID, sub
+ID), so it costs the same at any bus load. A publisher thread samples the
+counters REFRESH_RATE times per second into a fixed-size NumPy ring, derives
+the rate of every message at once over RATE_WINDOW seconds, and sends the
+table to the BusMonitorPanel (see gui.panels) through the UiLink.
+
+Messages of the periodic schedule arriving faster than it allows (see
+intrusion.RATE_RATIO) are flagged, injected frames show up there first.
+"""
+from doggie_lab.analysis.bus_load import PERIODIC_SCHEDULE
+from doggie_lab.analysis.intrusion import RATE_RATIO
+from doggie_lab.gui.link import UiLink
+from doggie_lab.messages import message_key, message_class
+from can import Listener, Message
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import numpy as np
+
+
+# Table updates sent to the GUI per second
+REFRESH_RATE = 4
+# Seconds of traffic the rates are measured over
+RATE_WINDOW = 2.0
+HISTORY = int(RATE_WINDOW * REFRESH_RATE) + 1
+
+# Distinct messages tracked, the others (e.g., an ID fuzzer) are only counted
+MAX_MESSAGES = 512
+
+
+def _sort_key(key: Tuple[int, Optional[int]]) -> Tuple[int, int]:
+    # Plain messages before the sub messages of the same ID
+    return key[0], -1 if key[1] is None else key[1]
+
+
+class BusMonitor(Listener):
+    """
+    Per (arbitration ID, sub ID) last payload and frame rate.
+
+    Attach it to a Notifier and `start()` it to feed the bus monitor panel,
+    or call `rows()` to read the table directly.
+    """
+
+    PANEL = "bus_monitor"
+
+    def __init__(self, name: str = "Bus Monitor") -> None:
+        self.name = name
+        self._lock = threading.Lock()
+
+        # Slot of each message, in order of appearance
+        self._slots: Dict[Tuple[int, Optional[int]], int] = {}
+        self._keys: List[Tuple[int, Optional[int]]] = []
+        self._names: List[str] = []
+        self._counts = [0] * MAX_MESSAGES
+        self._payloads: List[bytes] = [b""] * MAX_MESSAGES
+        # Frames of messages past MAX_MESSAGES
+        self.overflow = 0
+
+        # Counters sampled at each refresh
+        self._history = np.zeros((HISTORY, MAX_MESSAGES), dtype=np.int64)
+        self._times = np.zeros(HISTORY)
+        self._samples = 0
+
+        # Highest rate of the scheduled messages before they are flagged
+        self._max_rates = {
+            message_key(periodic.message.to_can_msg()): periodic.max_frames_per_second(RATE_WINDOW) * RATE_RATIO
+            for periodic in PERIODIC_SCHEDULE
+        }
+
+        self._ui = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _add(self, key: Tuple[int, Optional[int]]) -> Optional[int]:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                return slot
+
+            if len(self._keys) >= MAX_MESSAGES:
+                return None
+
+            cls = message_class(key)
+            self._names.append(cls.__name__ if cls is not None else "")
+            self._keys.append(key)
+            self._slots[key] = len(self._keys) - 1
+            return len(self._keys) - 1
+
+    def on_message_received(self, msg: Message) -> None:
+        key = message_key(msg)
+        slot = self._slots.get(key)
+        if slot is None and (slot := self._add(key)) is None:
+            self.overflow += 1
+            return
+
+        self._counts[slot] += 1
+        self._payloads[slot] = msg.data
+
+    def rows(self, now: Optional[float] = None) -> List[list]:
+        """
+        Sample the counters and build the table, sorted by ID and sub ID.
+
+        Returns:
+            [arbitration ID, sub ID, name, payload, frames/s, frames, too fast] rows
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            count = len(self._keys)
+            keys = list(self._keys)
+
+        counts = np.array(self._counts, dtype=np.int64)
+        index = self._samples % HISTORY
+        oldest = (self._samples - min(self._samples, HISTORY - 1)) % HISTORY
+        self._history[index] = counts
+        self._times[index] = now
+        self._samples += 1
+
+        span = now - self._times[oldest]
+        if span > 0:
+            rates = (counts - self._history[oldest]) / span
+        else:
+            rates = np.zeros(MAX_MESSAGES)
+
+        rows = []
+        for slot in sorted(range(count), key=lambda slot: _sort_key(keys[slot])):
+            key = keys[slot]
+            rate = float(rates[slot])
+            max_rate = self._max_rates.get(key)
+            rows.append([
+                key[0],
+                key[1],
+                self._names[slot],
+                bytes(self._payloads[slot]).hex(" ").upper(),
+                round(rate, 1),
+                int(counts[slot]),
+                max_rate is not None and rate > max_rate,
+            ])
+
+        return rows
+
+    def start(self) -> None:
+        """Send the table to the bus monitor panel REFRESH_RATE times per second."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._ui = UiLink.get().create_panel(self.name, self.PANEL)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(1 / REFRESH_RATE):
+            rows = self.rows()
+            self._ui.update_rows(rows)
+            self._ui.update_summary(
+                len(rows), round(sum(row[4] for row in rows), 1), self.overflow
+            )
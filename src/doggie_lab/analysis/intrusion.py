@@ -0,0 +1,313 @@
+"""
+Streaming intrusion detection for the simulated bus.
+
+The detector is a Notifier listener: on_message_received only timestamps the
+frame and queues it, the analysis runs in the detector's own thread so the
+ECUs never wait on it. Every model keeps a fixed-size ring buffer and is
+updated in O(1) per frame:
+
+- rate: periodic messages (see bus_load.PERIODIC_SCHEDULE) arriving faster
+  than their schedule allows, burst of change-triggered statuses included,
+  the footprint of injected frames
+- speed_delta: SpeedStatusMessage jumps the engine model can't produce
+- unlock_burst: more DoorsControlMessage unlocks than a driver would send
+- unlock_moving: unlock requests while the car is moving too fast to open
+- cruise_flapping: CruiseControlMessage enable toggling back and forth
+
+Alerts carry the detector's own latency, from the frame entering the queue
+to the alert being raised.
+"""
+from doggie_lab.analysis.bus_load import PERIODIC_SCHEDULE, PeriodicMessage
+from doggie_lab.messages import (
+    CruiseControlMessage,
+    DoorsControlMessage,
+    SpeedStatusMessage,
+    message_key,
+    message_class,
+)
+from can import Listener, Message
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import argparse
+import queue
+import threading
+import time
+import can
+
+
+# Frames kept to estimate the rate of a periodic message
+RATE_WINDOW = 16
+# Alert when a message arrives this many times faster than scheduled
+RATE_RATIO = 1.5
+
+# Largest speed change between two SpeedStatusMessages (km/h)
+MAX_SPEED_DELTA = 30
+
+# Unlocks accepted within UNLOCK_WINDOW seconds
+MAX_UNLOCKS = 3
+UNLOCK_WINDOW = 2.0
+
+# Cruise control enable changes accepted within CRUISE_WINDOW seconds
+MAX_CRUISE_TOGGLES = 2
+CRUISE_WINDOW = 1.0
+
+# The same rule doesn't fire again for the same message within this time
+ALERT_HOLDOFF = 1.0
+
+# Processing latencies kept for the report
+LATENCY_WINDOW = 4096
+
+
+@dataclass
+class Alert:
+    timestamp: float
+    rule: str
+    arbitration_id: int
+    sub_id: Optional[int]
+    name: str
+    detail: str
+    latency: float
+
+    def __str__(self) -> str:
+        key = f"0x{self.arbitration_id:03X}" + (f".{self.sub_id}" if self.sub_id is not None else "")
+        return (
+            f"[IDS] {self.timestamp:.3f} {key} {self.name} {self.rule}: {self.detail}"
+            f" (latency {self.latency * 1e3:.2f} ms)"
+        )
+
+
+class RingBuffer:
+    """Last `size` values, overwritten in place."""
+
+    def __init__(self, size: int) -> None:
+        self._values = [0.0] * size
+        self._next = 0
+        self.count = 0
+
+    def push(self, value: float) -> None:
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self.count = min(self.count + 1, len(self._values))
+
+    @property
+    def full(self) -> bool:
+        return self.count == len(self._values)
+
+    @property
+    def oldest(self) -> float:
+        return self._values[self._next if self.full else 0]
+
+    def values(self) -> List[float]:
+        if self.full:
+            return self._values[self._next:] + self._values[:self._next]
+        return self._values[:self.count]
+
+
+class RateModel:
+    """Flags a periodic message whose last RATE_WINDOW frames came too fast."""
+
+    def __init__(self, periodic: PeriodicMessage) -> None:
+        # Even with the whole burst allowance of a change-triggered message
+        self.min_span = periodic.min_span(RATE_WINDOW)
+        self._arrivals = RingBuffer(RATE_WINDOW)
+
+    def update(self, timestamp: float) -> Optional[str]:
+        self._arrivals.push(timestamp)
+        if not self._arrivals.full:
+            return None
+
+        span = timestamp - self._arrivals.oldest
+        if span * RATE_RATIO < self.min_span:
+            rate = (RATE_WINDOW - 1) / span if span > 0 else float("inf")
+            return f"{rate:.0f} frames/s, scheduled {(RATE_WINDOW - 1) / self.min_span:.1f} frames/s"
+
+        return None
+
+
+class EventBurstModel:
+    """Flags more than `limit` events within `window` seconds."""
+
+    def __init__(self, limit: int, window: float) -> None:
+        self.window = window
+        self._events = RingBuffer(limit + 1)
+
+    def update(self, timestamp: float) -> Optional[int]:
+        self._events.push(timestamp)
+        if self._events.full and timestamp - self._events.oldest < self.window:
+            return self._events.count
+
+        return None
+
+
+class IntrusionDetector(Listener):
+    """
+    Flags injected frames on the bus.
+
+    Args:
+        on_alert: Called (from the detector thread) with every Alert
+    """
+
+    def __init__(self, on_alert: Callable[[Alert], None] = print) -> None:
+        self._on_alert = on_alert
+        self._queue: "queue.SimpleQueue[Tuple[float, Optional[Message]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+        self._rates: Dict[Tuple[int, Optional[int]], RateModel] = {
+            message_key(periodic.message.to_can_msg()): RateModel(periodic)
+            for periodic in PERIODIC_SCHEDULE
+        }
+        self._speed: Optional[int] = None
+        self._unlocks = EventBurstModel(MAX_UNLOCKS, UNLOCK_WINDOW)
+        self._cruise_enable: Optional[bool] = None
+        self._cruise_toggles = EventBurstModel(MAX_CRUISE_TOGGLES, CRUISE_WINDOW)
+
+        self._last_alert: Dict[Tuple[str, Tuple[int, Optional[int]]], float] = {}
+        self._latencies = RingBuffer(LATENCY_WINDOW)
+        self.frames = 0
+        self.alerts: Dict[str, int] = {}
+        self.max_backlog = 0
+
+    def start(self) -> None:
+        """Analyze the frames queued by on_message_received in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name="IDS", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put((0.0, None))
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def on_message_received(self, msg: Message) -> None:
+        self._queue.put((time.perf_counter(), msg))
+
+    def feed(self, msgs: Iterable[Message]) -> None:
+        """Analyze frames synchronously (e.g., read from a log)."""
+        for msg in msgs:
+            self.process(msg, time.perf_counter())
+
+    def _run(self) -> None:
+        while True:
+            received, msg = self._queue.get()
+            if msg is None:
+                return
+
+            self.max_backlog = max(self.max_backlog, self._queue.qsize())
+            self.process(msg, received)
+
+    def process(self, msg: Message, received: float) -> List[Alert]:
+        """Update the models with a frame, returning the alerts it raised."""
+        self.frames += 1
+        key = message_key(msg)
+        findings: List[Tuple[str, str]] = []
+
+        rate = self._rates.get(key)
+        if rate is not None and (detail := rate.update(msg.timestamp)) is not None:
+            findings.append(("rate", detail))
+
+        cls = message_class(key)
+        if cls is SpeedStatusMessage:
+            findings += self._check_speed(msg)
+        elif cls is DoorsControlMessage:
+            findings += self._check_doors(msg)
+        elif cls is CruiseControlMessage:
+            findings += self._check_cruise(msg)
+
+        alerts = []
+        for rule, detail in findings:
+            last = self._last_alert.get((rule, key))
+            if last is not None and msg.timestamp - last < ALERT_HOLDOFF:
+                continue
+            self._last_alert[(rule, key)] = msg.timestamp
+
+            self.alerts[rule] = self.alerts.get(rule, 0) + 1
+            alerts.append(Alert(
+                timestamp=msg.timestamp,
+                rule=rule,
+                arbitration_id=key[0],
+                sub_id=key[1],
+                name=cls.__name__ if cls is not None else "",
+                detail=detail,
+                latency=time.perf_counter() - received,
+            ))
+
+        self._latencies.push(time.perf_counter() - received)
+
+        for alert in alerts:
+            self._on_alert(alert)
+
+        return alerts
+
+    def _check_speed(self, msg: Message) -> List[Tuple[str, str]]:
+        status = SpeedStatusMessage.from_can_msg(msg)
+        if status is None:
+            return []
+
+        last, self._speed = self._speed, status.speed
+        if last is not None and abs(status.speed - last) > MAX_SPEED_DELTA:
+            return [("speed_delta", f"{last} -> {status.speed} km/h")]
+
+        return []
+
+    def _check_doors(self, msg: Message) -> List[Tuple[str, str]]:
+        control = DoorsControlMessage.from_can_msg(msg)
+        if control is None or control.lock:
+            return []
+
+        findings = []
+        if (count := self._unlocks.update(msg.timestamp)) is not None:
+            findings.append(("unlock_burst", f"{count} unlocks in {UNLOCK_WINDOW:.0f} s"))
+        if self._speed is not None and self._speed >= DoorsControlMessage.MAX_UNLOCK_SPEED:
+            findings.append(("unlock_moving", f"unlock at {self._speed} km/h"))
+
+        return findings
+
+    def _check_cruise(self, msg: Message) -> List[Tuple[str, str]]:
+        control = CruiseControlMessage.from_can_msg(msg)
+        if control is None:
+            return []
+
+        last, self._cruise_enable = self._cruise_enable, control.enable
+        if last is None or last == control.enable:
+            return []
+
+        if (count := self._cruise_toggles.update(msg.timestamp)) is not None:
+            return [("cruise_flapping", f"enable toggled {count} times in {CRUISE_WINDOW:.0f} s")]
+
+        return []
+
+    def latency_percentile(self, p: float) -> float:
+        latencies = sorted(self._latencies.values())
+        if not latencies:
+            return 0.0
+
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+    def format_report(self) -> str:
+        alerts = ", ".join(f"{rule} {count}" for rule, count in sorted(self.alerts.items()))
+        return (
+            f"IDS: {self.frames} frames, alerts: {alerts or 'none'}\n"
+            f"  latency p50 {self.latency_percentile(50) * 1e3:.3f} ms,"
+            f" p99 {self.latency_percentile(99) * 1e3:.3f} ms,"
+            f" max backlog {self.max_backlog} frames"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intrusion detection on CAN captures")
+    parser.add_argument("logs", nargs="+", help="Log files to analyze (candump .log, .asc...)")
+    args = parser.parse_args()
+
+    detector = IntrusionDetector()
+    for path in args.logs:
+        with can.LogReader(path) as reader:
+            detector.feed(reader)
+
+    print(detector.format_report())
+
+
+if __name__ == "__main__":
+    main()
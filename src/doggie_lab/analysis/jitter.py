@@ -0,0 +1,264 @@
+"""
+Cycle time analysis of periodic CAN traffic.
+
+Frames are grouped by (arbitration ID, sub ID). The nominal period of each group
+is inferred from its first intervals, after which every interval is classified:
+jitter goes into a fixed-size histogram (constant memory per ID), intervals
+spanning several periods count as missed cycles and intervals much shorter
+than the period as bursts, which is what injected frames look like.
+
+Statuses sent on change (see bus_load.PERIODIC_SCHEDULE) are measured against
+their heartbeat instead: frames sent early because of a change are neither
+jitter nor bursts, unless they come faster than the ECU updates the status.
+"""
+from doggie_lab.analysis.bus_load import PERIODIC_SCHEDULE
+from doggie_lab.messages import message_key, message_class
+from can import Listener, Message
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import bisect
+import math
+import sys
+import threading
+import can
+
+
+# Intervals used to infer the nominal period
+WARMUP_INTERVALS = 16
+
+# Jitter histogram: geometric bins from 1 us to 10 s
+JITTER_BIN_MIN = 1e-6
+JITTER_BIN_RATIO = 1.2
+JITTER_BINS = [
+    JITTER_BIN_MIN * JITTER_BIN_RATIO ** i
+    for i in range(int(math.log(10 / JITTER_BIN_MIN, JITTER_BIN_RATIO)) + 1)
+]
+
+# Interval thresholds relative to the period
+MISSED_RATIO = 1.5
+BURST_RATIO = 0.75
+
+
+@dataclass
+class CycleReport:
+    arbitration_id: int
+    sub_id: Optional[int]
+    name: str
+    period: Optional[float]
+    frames: int
+    jitter_p50: float
+    jitter_p90: float
+    jitter_p99: float
+    jitter_max: float
+    missed_cycles: int
+    burst_frames: int
+    burst_events: int
+
+
+class CycleStats:
+    """Timing statistics of a single (arbitration ID, sub ID)."""
+
+    def __init__(self, period: Optional[float] = None, min_period: Optional[float] = None) -> None:
+        self.frames = 0
+        # Inferred from the first intervals if not known
+        self.period = period
+        # Change-triggered messages: shortest interval of a change
+        self.min_period = min_period
+        self.missed_cycles = 0
+        self.burst_frames = 0
+        self.burst_events = 0
+        self.jitter_max = 0.0
+
+        self._last: Optional[float] = None
+        self._warmup: List[float] = []
+        self._histogram = [0] * (len(JITTER_BINS) + 1)
+        self._in_burst = False
+
+    def update(self, timestamp: float) -> None:
+        self.frames += 1
+        last, self._last = self._last, timestamp
+
+        if last is None:
+            return
+
+        interval = timestamp - last
+        if self.period is not None:
+            self._classify(interval)
+            return
+
+        self._warmup.append(interval)
+        if len(self._warmup) == WARMUP_INTERVALS:
+            self.period = sorted(self._warmup)[len(self._warmup) // 2]
+            for warmup_interval in self._warmup:
+                self._classify(warmup_interval)
+            self._warmup = []
+
+    def _classify(self, interval: float) -> None:
+        if self.period <= 0:
+            return
+
+        if interval < self.period * BURST_RATIO:
+            if self.min_period is not None and interval >= self.min_period * BURST_RATIO:
+                # Sent early on a change
+                self._in_burst = False
+                return
+
+            self.burst_frames += 1
+            if not self._in_burst:
+                self.burst_events += 1
+            self._in_burst = True
+            return
+
+        self._in_burst = False
+
+        if interval > self.period * MISSED_RATIO:
+            self.missed_cycles += round(interval / self.period) - 1
+            return
+
+        jitter = abs(interval - self.period)
+        self.jitter_max = max(self.jitter_max, jitter)
+        self._histogram[bisect.bisect_left(JITTER_BINS, jitter)] += 1
+
+    def jitter_percentile(self, p: float) -> float:
+        """Upper bound of the jitter percentile (0-100), in seconds."""
+        total = sum(self._histogram)
+        if total == 0:
+            return 0.0
+
+        target = total * p / 100
+        count = 0
+        for i, bin_count in enumerate(self._histogram):
+            count += bin_count
+            if count >= target:
+                return min(JITTER_BINS[min(i, len(JITTER_BINS) - 1)], self.jitter_max)
+
+        return self.jitter_max
+
+
+class CycleTimeAnalyzer(Listener):
+    """Streams frames (from a Notifier or a log) into per-ID cycle statistics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[int, Optional[int]], CycleStats] = {}
+        # Change-triggered messages, timed against their heartbeat
+        self._heartbeats = {
+            message_key(periodic.message.to_can_msg()): periodic
+            for periodic in PERIODIC_SCHEDULE
+            if periodic.burst
+        }
+
+    def on_message_received(self, msg: Message) -> None:
+        key = message_key(msg)
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                periodic = self._heartbeats.get(key)
+                if periodic is not None:
+                    stats = CycleStats(periodic.period, periodic.min_period)
+                else:
+                    stats = CycleStats()
+                self._stats[key] = stats
+            stats.update(msg.timestamp)
+
+    def feed(self, msgs: Iterable[Message]) -> None:
+        for msg in msgs:
+            self.on_message_received(msg)
+
+    def report(self) -> List[CycleReport]:
+        reports = []
+
+        with self._lock:
+            for (arbitration_id, sub_id), stats in sorted(
+                self._stats.items(), key=lambda item: (item[0][0], item[0][1] or 0)
+            ):
+                cls = message_class((arbitration_id, sub_id))
+                reports.append(CycleReport(
+                    arbitration_id=arbitration_id,
+                    sub_id=sub_id,
+                    name=cls.__name__ if cls is not None else "",
+                    period=stats.period,
+                    frames=stats.frames,
+                    jitter_p50=stats.jitter_percentile(50),
+                    jitter_p90=stats.jitter_percentile(90),
+                    jitter_p99=stats.jitter_percentile(99),
+                    jitter_max=stats.jitter_max,
+                    missed_cycles=stats.missed_cycles,
+                    burst_frames=stats.burst_frames,
+                    burst_events=stats.burst_events,
+                ))
+
+        return reports
+
+    def format_report(self) -> str:
+        lines = [
+            f"{'ID':<9} {'Message':<22} {'Frames':>8} {'Period':>9}"
+            f" {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'Missed':>7} {'Bursts':>7}"
+        ]
+        for r in self.report():
+            key = f"0x{r.arbitration_id:03X}" + (f".{r.sub_id}" if r.sub_id is not None else "")
+            period = f"{r.period * 1e3:7.1f}ms" if r.period is not None else f"{'-':>9}"
+            lines.append(
+                f"{key:<9} {r.name:<22} {r.frames:>8} {period}"
+                f" {r.jitter_p50 * 1e3:6.2f}ms {r.jitter_p90 * 1e3:6.2f}ms"
+                f" {r.jitter_p99 * 1e3:6.2f}ms {r.jitter_max * 1e3:6.2f}ms"
+                f" {r.missed_cycles:>7} {r.burst_events:>7}"
+            )
+
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cycle time jitter and deadline analysis of periodic CAN messages"
+    )
+    parser.add_argument(
+        "logs", nargs="*", help="Log files to analyze (candump .log, .asc, .blf...)"
+    )
+    parser.add_argument(
+        "--interface", help="Analyze a live bus with this python-can interface (e.g., socketcan)"
+    )
+    parser.add_argument("--channel", help="Channel of the live bus (e.g., can0)")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds to listen on a live bus (default: 10)"
+    )
+    parser.add_argument(
+        "--max-p99", type=float, default=None, metavar="MS",
+        help="Fail if any ID's p99 jitter exceeds MS milliseconds",
+    )
+    parser.add_argument(
+        "--max-missed", type=int, default=None,
+        help="Fail if any ID misses more than this many cycles",
+    )
+    args = parser.parse_args()
+
+    analyzer = CycleTimeAnalyzer()
+
+    for path in args.logs:
+        with can.LogReader(path) as reader:
+            analyzer.feed(reader)
+
+    if args.interface is not None:
+        with can.Bus(interface=args.interface, channel=args.channel) as bus:
+            notifier = can.Notifier(bus, [analyzer])
+            threading.Event().wait(args.duration)
+            notifier.stop()
+
+    print(analyzer.format_report())
+
+    failed = False
+    for r in analyzer.report():
+        if args.max_p99 is not None and r.jitter_p99 * 1e3 > args.max_p99:
+            print(f"0x{r.arbitration_id:03X} {r.name}: p99 jitter {r.jitter_p99 * 1e3:.2f} ms")
+            failed = True
+        if args.max_missed is not None and r.missed_cycles > args.max_missed:
+            print(f"0x{r.arbitration_id:03X} {r.name}: {r.missed_cycles} missed cycles")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Streaming import of CAN captures into columnar signal files.
+
+Log files (candump .log, .asc, or anything python-can's LogReader reads) are
+read frame by frame and decoded through the doggie_lab.messages classes. Every
+message gets a timestamp column plus one column per signal in its SIGNALS,
+buffered in fixed-size NumPy chunks and appended to raw files on disk, so
+memory use doesn't depend on the capture size.
+
+The output directory holds a manifest.json describing the columns;
+`open_columns` maps them back as read-only NumPy memmaps.
+"""
+from doggie_lab.messages import EcuMessage, Signal, MESSAGE_CLASSES, message_key, message_class
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Type
+import argparse
+import json
+import can
+import numpy as np
+
+
+CHUNK_ROWS = 64 * 1024
+MANIFEST = "manifest.json"
+
+
+def signal_dtype(signal: Signal) -> np.dtype:
+    """Smallest NumPy type able to hold the signal's physical value."""
+    if signal.factor != 1 or signal.offset != 0:
+        return np.dtype(np.float64)
+    if signal.length == 1:
+        return np.dtype(np.bool_)
+
+    size = 8
+    while size < signal.length:
+        size *= 2
+
+    return np.dtype(f"{'i' if signal.signed else 'u'}{size // 8}")
+
+
+class MessageColumns:
+    """Chunked column writer for one message class."""
+
+    def __init__(self, cls: Type[EcuMessage], directory: Path) -> None:
+        self.cls = cls
+        self.rows = 0
+        self._signals = cls.SIGNALS
+        self._fill = 0
+
+        dtypes = [("timestamp", np.dtype(np.float64))] + [
+            (signal.name, signal_dtype(signal)) for signal in self._signals
+        ]
+        self.dtypes = dict(dtypes)
+        self._chunks = {name: np.empty(CHUNK_ROWS, dtype) for name, dtype in dtypes}
+        self._files: Dict[str, BinaryIO] = {
+            name: open(directory / self.file_name(name), "wb") for name, _ in dtypes
+        }
+
+    def file_name(self, column: str) -> str:
+        return f"{self.cls.__name__}.{column}.bin"
+
+    def append(self, timestamp: float, msg: EcuMessage) -> None:
+        i = self._fill
+        self._chunks["timestamp"][i] = timestamp
+        for signal in self._signals:
+            self._chunks[signal.name][i] = getattr(msg, signal.name)
+
+        self._fill += 1
+        self.rows += 1
+        if self._fill == CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        for name, chunk in self._chunks.items():
+            chunk[:self._fill].tofile(self._files[name])
+        self._fill = 0
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    def manifest(self) -> dict:
+        return {
+            "rows": self.rows,
+            "columns": {
+                name: {"file": self.file_name(name), "dtype": dtype.str}
+                for name, dtype in self.dtypes.items()
+            },
+        }
+
+
+def import_frames(
+    frames: Iterable[can.Message],
+    directory: str,
+    classes: Iterable[Type[EcuMessage]] = MESSAGE_CLASSES,
+) -> dict:
+    """
+    Decode a stream of frames into column files.
+
+    Returns:
+        The manifest written to the directory
+    """
+    out_dir = Path(directory)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    writers = {cls: MessageColumns(cls, out_dir) for cls in classes}
+    total = 0
+    unknown = 0
+    malformed = 0
+
+    try:
+        for frame in frames:
+            total += 1
+            cls = message_class(message_key(frame))
+            writer = writers.get(cls)
+            if writer is None:
+                unknown += 1
+                continue
+
+            msg = cls.from_can_msg(frame)
+            if msg is None:
+                malformed += 1
+                continue
+
+            writer.append(frame.timestamp, msg)
+
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    manifest = {
+        "frames": total,
+        "unknown": unknown,
+        "malformed": malformed,
+        "messages": {cls.__name__: writer.manifest() for cls, writer in writers.items()},
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+    return manifest
+
+
+def import_log(path: str, directory: str) -> dict:
+    """Decode a log file into column files, see `import_frames`."""
+    with can.LogReader(path) as reader:
+        return import_frames(reader, directory)
+
+
+def open_columns(directory: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Map the columns written by `import_frames`.
+
+    Returns:
+        {message name: {column name: read-only memmap}}
+    """
+    in_dir = Path(directory)
+    manifest = json.loads((in_dir / MANIFEST).read_text())
+
+    columns: Dict[str, Dict[str, np.ndarray]] = {}
+    for name, message in manifest["messages"].items():
+        columns[name] = {}
+        for column, info in message["columns"].items():
+            if message["rows"] == 0:
+                columns[name][column] = np.empty(0, np.dtype(info["dtype"]))
+                continue
+
+            columns[name][column] = np.memmap(
+                in_dir / info["file"],
+                dtype=np.dtype(info["dtype"]),
+                mode="r",
+                shape=(message["rows"],),
+            )
+
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode a CAN capture into memory-mapped signal columns"
+    )
+    parser.add_argument("log", help="Log file (candump .log, .asc...)")
+    parser.add_argument("output", help="Directory for the column files")
+    args = parser.parse_args()
+
+    manifest = import_log(args.log, args.output)
+
+    print(
+        f"{manifest['frames']} frames, {manifest['unknown']} unknown,"
+        f" {manifest['malformed']} malformed"
+    )
+    for name, message in manifest["messages"].items():
+        print(f"  {name:<24} {message['rows']:>10} rows")
+
+
+if __name__ == "__main__":
+    main()
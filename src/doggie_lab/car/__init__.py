@@ -1,4 +1,17 @@
 from doggie_lab.car.car import Car
 from doggie_lab.car.builder import CarBuilder
+from doggie_lab.car.slcan_bus import SlcanBus, SlcanStats
+from doggie_lab.car.topology import POWERTRAIN_BODY, Route, Topology
+from doggie_lab.car.udp_bus import UdpBus, UdpStats
 
-__all__ = ["Car", "CarBuilder"]
+__all__ = [
+    "Car",
+    "CarBuilder",
+    "SlcanBus",
+    "SlcanStats",
+    "POWERTRAIN_BODY",
+    "Route",
+    "Topology",
+    "UdpBus",
+    "UdpStats",
+]
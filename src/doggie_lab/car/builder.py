@@ -1,25 +1,63 @@
 import can
 from doggie_lab.car.car import Car
 from doggie_lab.car.proxy_bus import ProxyBus
+from doggie_lab.car.slcan_bus import SlcanBus
+from doggie_lab.car.topology import Topology
+from doggie_lab.car.udp_bus import UdpBus
+from typing import Optional
 
 
 class CarBuilder:
     @staticmethod
-    def from_serial(tx_port: str, rx_port: str, speed: int) -> Car:
-        tx_bus = can.ThreadSafeBus(bustype="slcan", channel=tx_port, bitrate=speed)
-        rx_bus = can.ThreadSafeBus(bustype="slcan", channel=rx_port, bitrate=speed)
+    def from_serial(
+        tx_port: str,
+        rx_port: str,
+        speed: int,
+        loopback: bool = False,
+        topology: Optional[Topology] = None,
+        processes: bool = False,
+    ) -> Car:
+        # SlcanBus is thread safe, sends from every ECU are coalesced by its writer
+        tx_bus = SlcanBus(channel=tx_port, bitrate=speed)
+        rx_bus = SlcanBus(channel=rx_port, bitrate=speed)
 
-        return CarBuilder._build(tx_bus, rx_bus)
+        return CarBuilder._build(tx_bus, rx_bus, loopback, topology, processes)
 
     @staticmethod
-    def from_socketcan(tx_if: str, rx_if: str, speed: int) -> Car:
+    def from_socketcan(
+        tx_if: str,
+        rx_if: str,
+        speed: int,
+        loopback: bool = False,
+        topology: Optional[Topology] = None,
+        processes: bool = False,
+    ) -> Car:
         tx_bus = can.ThreadSafeBus(bustype="socketcan", channel=tx_if)
         rx_bus = can.ThreadSafeBus(bustype="socketcan", channel=rx_if)
 
-        return CarBuilder._build(tx_bus, rx_bus)
+        return CarBuilder._build(tx_bus, rx_bus, loopback, topology, processes)
 
-    def _build(tx_bus: can.BusABC, rx_bus: can.BusABC) -> Car:
-        proxy_bus = ProxyBus(tx_bus, rx_bus)
+    @staticmethod
+    def from_udp(
+        address: str,
+        loopback: bool = False,
+        topology: Optional[Topology] = None,
+        processes: bool = False,
+    ) -> Car:
+        # One hub socket both ways, it echoes our own frames like a shared bus
+        bus = UdpBus(channel=address, hub=True, receive_own_messages=True)
+
+        return CarBuilder._build(bus, bus, loopback, topology, processes)
+
+    def _build(
+        tx_bus: can.BusABC,
+        rx_bus: can.BusABC,
+        loopback: bool = False,
+        topology: Optional[Topology] = None,
+        processes: bool = False,
+    ) -> Car:
+        proxy_bus = ProxyBus(tx_bus, rx_bus, loopback=loopback)
         notifier = can.Notifier(proxy_bus, [])
+        proxy_bus.set_local_notifier(notifier)
 
-        return Car(proxy_bus, notifier)
+        return Car(proxy_bus, notifier, topology, processes)
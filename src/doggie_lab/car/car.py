@@ -1,24 +1,92 @@
 import can
+from doggie_lab.car.ecu_process import EcuProcess, EcuProcessPool
+from doggie_lab.car.proxy_bus import ProxyBus, TxQueueStats
+from doggie_lab.car.slcan_bus import SlcanBus
+from doggie_lab.car.topology import Topology
 from doggie_lab.ecus.ecu import Ecu
 from doggie_lab.ecus.ecu_ui import UiEcu
+from doggie_lab.ecus.gateway import GatewayEcu
 import glob
 import importlib.util
 import inspect
+import logging
+import msgpack
 import os
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
 
 
 class Car:
     """
     Acts as the central controller for all car systems and ECUs.
+
+    By default every ECU shares `bus`. With a topology, the ECUs are split
+    into segments: the external one uses `bus`, the others get in-process
+    virtual buses, and a GatewayEcu forwards frames between them.
+
+    With `processes`, every ECU (but the gateway) runs in its own worker
+    process, see car.ecu_process.
     """
 
-    def __init__(self, bus: can.BusABC, notifier: can.Notifier):
+    # Format of the blobs written by snapshot
+    SNAPSHOT_VERSION = 1
+
+    def __init__(
+        self,
+        bus: can.BusABC,
+        notifier: can.Notifier,
+        topology: Optional[Topology] = None,
+        processes: bool = False,
+    ):
         self._bus = bus
         self._notifier = notifier
+        self._topology = topology
+        self.gateway: Optional[GatewayEcu] = None
+        self.processes: Optional[EcuProcessPool] = None
+
+        # Segment name -> (ECU side bus, notifier)
+        self._segments: Dict[str, Tuple[can.BusABC, can.Notifier]] = {}
+        # Gateway side of the virtual segments
+        self._gateway_segments: Dict[str, Tuple[can.BusABC, can.Notifier]] = {}
 
         ecus_clss = Car._get_ecu_classes()
-        self._ecus = [Ecu(self._bus, self._notifier) for Ecu in ecus_clss]
+        if topology is None:
+            placements = [(Ecu, bus, notifier) for Ecu in ecus_clss]
+
+        else:
+            for name in topology.segment_names:
+                if name == topology.external:
+                    self._segments[name] = (bus, notifier)
+                    self._gateway_segments[name] = (bus, notifier)
+                else:
+                    self._segments[name] = self._virtual_segment(name, own_messages=True)
+                    self._gateway_segments[name] = self._virtual_segment(name, own_messages=False)
+
+            placements = [
+                (Ecu, *self._segments[topology.segment_of(Ecu.__name__)]) for Ecu in ecus_clss
+            ]
+
+        if processes:
+            self.processes = EcuProcessPool(placements)
+            self._ecus = list(self.processes.ecus)
+        else:
+            self._ecus = [Ecu(ecu_bus, ecu_notifier) for Ecu, ecu_bus, ecu_notifier in placements]
+
+        if topology is not None:
+            self.gateway = GatewayEcu(self._gateway_segments, topology.routes, topology.external)
+            self._ecus.append(self.gateway)
+
+    def _virtual_segment(self, name: str, own_messages: bool) -> Tuple[can.BusABC, can.Notifier]:
+        # ECUs of a segment see each other's frames, the gateway doesn't see its own
+        bus = can.ThreadSafeBus(
+            interface="virtual",
+            channel=f"{name}-{id(self):x}",
+            receive_own_messages=own_messages,
+        )
+        return bus, can.Notifier(bus, [])
 
     @staticmethod
     def _get_ecu_classes():
@@ -67,11 +135,72 @@ class Car:
                         ecu_classes.append(obj)
 
             except Exception as e:
-                print(f"Error importing {file_path}: {str(e)}")
+                logger.error("Error importing %s: %s", file_path, e)
                 continue
 
         return ecu_classes
 
+    @property
+    def ecus(self) -> List[Ecu]:
+        return list(self._ecus)
+
+    @property
+    def tx_stats(self) -> Optional[TxQueueStats]:
+        """Queueing delay of the frames sent to the car's bus, None if it isn't a ProxyBus."""
+        if isinstance(self._bus, ProxyBus):
+            return self._bus.tx_stats
+
+        return None
+
+    @property
+    def serial_buses(self) -> List[SlcanBus]:
+        """slcan adapters behind the car's bus, for their statistics."""
+        if not isinstance(self._bus, ProxyBus):
+            return []
+
+        buses = dict.fromkeys((self._bus.tx_bus, self._bus.rx_bus))
+        return [bus for bus in buses if isinstance(bus, SlcanBus)]
+
+    def _segment_notifier(self, segment: Optional[str]) -> can.Notifier:
+        if segment is None:
+            return self._notifier
+
+        return self._segments[segment][1]
+
+    def add_listener(self, listener: can.Listener, segment: Optional[str] = None) -> None:
+        """Attach an extra listener (monitor, analyzer...) to the car's bus, or to a segment."""
+        self._segment_notifier(segment).add_listener(listener)
+
+    def remove_listener(self, listener: can.Listener, segment: Optional[str] = None) -> None:
+        self._segment_notifier(segment).remove_listener(listener)
+
+    def snapshot(self) -> bytes:
+        """
+        Serialize the state of every ECU.
+
+        Returns:
+            msgpack blob for `restore`
+        """
+        return msgpack.packb({
+            "version": self.SNAPSHOT_VERSION,
+            "ecus": {ecu.ecu_name: ecu.get_state() for ecu in self._ecus},
+        })
+
+    def restore(self, snapshot: bytes) -> None:
+        """
+        Bring every ECU back to the state saved by `snapshot`.
+
+        ECUs missing from the snapshot keep their current state.
+        """
+        data = msgpack.unpackb(snapshot)
+        if data.get("version") != self.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {data.get('version')}")
+
+        for ecu in self._ecus:
+            state = data["ecus"].get(ecu.ecu_name)
+            if state:
+                ecu.set_state(state)
+
     def start(self):
         # Start all the ECUs
         for ecu in self._ecus:
@@ -80,4 +209,18 @@ class Car:
     def stop(self):
         # Stop all the ECUs
         for ecu in self._ecus:
-            ecu.stop()
+            if not isinstance(ecu, EcuProcess):
+                ecu.stop()
+
+        # Worker processes are stopped together
+        if self.processes is not None:
+            self.processes.stop()
+
+        # Virtual segments belong to the car
+        for segments in (self._segments, self._gateway_segments):
+            for bus, notifier in segments.values():
+                if bus is not self._bus:
+                    notifier.stop()
+
+        self._notifier.stop()
+        self._bus.shutdown()
@@ -0,0 +1,344 @@
+"""
+Process-isolated ECUs.
+
+Each ECU runs in its own worker process, with its own interpreter (and GIL),
+on a RingBus: frames from the car's bus reach it through a shared memory
+FrameRing, and what it sends goes back through another one. In the
+simulation process, an EcuProcess stands in for the ECU (start, stop, state
+for snapshots) and EcuProcessPool merges the TX rings of every worker into
+the car's bus from a single writer thread.
+
+A worker that crashes only takes its ECU down: the others keep running, and
+frames for the dead one are dropped once its ring is full.
+"""
+from doggie_lab import log, timing
+from doggie_lab.car.frame_ring import FrameRing
+from doggie_lab.ecus.ecu import Ecu
+from doggie_lab.gui.link import UiLink
+from can import BusABC, Message, Notifier
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple, Type
+import importlib
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# Frames buffered each way between the simulation and a worker
+RING_CAPACITY = 4096
+
+# Seconds to wait for a worker to answer a control request
+CONTROL_TIMEOUT = 10.0
+
+# Seconds between checks that the workers are still alive
+WATCHDOG_PERIOD = 1.0
+
+
+class RingBus(BusABC):
+    """Worker side bus: receives from one FrameRing, sends into another."""
+
+    def __init__(self, rx: FrameRing, tx: FrameRing, rx_bell: Any, tx_bell: Any) -> None:
+        super().__init__(channel=rx.name)
+        self._rx = rx
+        self._tx = tx
+        self._rx_bell = rx_bell
+        self._tx_bell = tx_bell
+        # The TX ring has a single producer, the ECU's threads take turns
+        self._tx_lock = threading.Lock()
+
+    def send(self, msg: Message, timeout: Optional[float] = None) -> None:
+        with self._tx_lock:
+            # Only the first unread frame rings (see FrameRing)
+            if self._tx.push(msg) and len(self._tx) == 1:
+                self._tx_bell.release()
+
+    def _recv_internal(self, timeout: Optional[float]) -> Tuple[Optional[Message], bool]:
+        msg = self._rx.pop()
+        if msg is None:
+            # Rung when a frame finds the ring empty, the ring is drained (None
+            # popped) before waiting again so a wake-up can't be missed
+            if not self._rx_bell.acquire(timeout=timeout):
+                return None, False
+
+            msg = self._rx.pop()
+
+        return msg, False
+
+    def shutdown(self) -> None:
+        # The rings stay mapped until the process exits: ECU threads (which
+        # never return) may still send, and the simulation unlinks them
+        super().shutdown()
+
+
+def _worker_main(
+    module: str,
+    class_name: str,
+    rx_name: str,
+    tx_name: str,
+    rx_bell: Any,
+    tx_bell: Any,
+    control: Connection,
+    ui_conn: Connection,
+    timing_config: timing.TimingConfig,
+    log_config: Optional[log.LogConfig],
+) -> None:
+    """Entry point of a worker process, serves the control requests of its EcuProcess."""
+    # Ctrl+C is handled by the simulation process, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    timing.configure(
+        timing_config.realtime, timing_config.fifo, timing_config.cpus, timing_config.spin
+    )
+    if log_config is not None:
+        log.configure(log_config.level, log_config.json_output, log_config.file, log_config.rate_limit)
+    UiLink.connect(ui_conn)
+
+    ecu_class = getattr(importlib.import_module(f"doggie_lab.ecus.{module}"), class_name)
+    bus = RingBus(FrameRing(rx_name), FrameRing(tx_name), rx_bell, tx_bell)
+    # Short timeout: stopping the notifier waits for its reader to time out
+    notifier = Notifier(bus, [], timeout=0.1)
+    ecu: Ecu = ecu_class(bus, notifier)
+    control.send(ecu.ecu_name)
+
+    while True:
+        try:
+            request, *args = control.recv()
+        except EOFError:
+            # Simulation gone
+            break
+
+        try:
+            if request == "start":
+                result = ecu.start()
+            elif request == "stop":
+                result = ecu.stop()
+            elif request == "get_state":
+                result = ecu.get_state()
+            elif request == "set_state":
+                result = ecu.set_state(*args)
+            else:
+                raise ValueError(f"Unknown request {request}")
+
+            control.send((None, result))
+
+        except Exception as e:
+            control.send((f"{type(e).__name__}: {e}", None))
+
+        if request == "stop":
+            break
+
+    notifier.stop()
+    bus.shutdown()
+
+
+class EcuProcess:
+    """
+    Simulation side of an ECU running in a worker process.
+
+    Has the Ecu interface Car relies on (ecu_name, start, stop, get_state,
+    set_state). Frames of `notifier` are pushed into the worker's RX ring,
+    the worker's TX ring is drained by EcuProcessPool into `bus`.
+    """
+
+    def __init__(
+        self,
+        ecu_class: Type[Ecu],
+        bus: BusABC,
+        notifier: Notifier,
+        tx_bell: Any,
+        context: multiprocessing.context.BaseContext,
+    ) -> None:
+        self.ecu_class = ecu_class
+        self.ecu_name = ecu_class.__name__
+        self.logger = log.ecu_logger(self.ecu_name)
+        self.bus = bus
+        self.notifier = notifier
+
+        self.rx = FrameRing(capacity=RING_CAPACITY, create=True)
+        self.tx = FrameRing(capacity=RING_CAPACITY, create=True)
+        self._rx_bell = context.Semaphore(0)
+        # Frames come from the notifier thread, and from local deliveries of
+        # a loopback ProxyBus: the RX ring needs a single producer
+        self._rx_lock = threading.Lock()
+
+        self._control, worker_control = context.Pipe()
+        self._control_lock = threading.Lock()
+        self._ui_conn, worker_ui_conn = context.Pipe()
+        self.exit_reported = False
+
+        self.process = context.Process(
+            target=_worker_main,
+            args=(
+                # Car loads the ECU modules from their files, without the package
+                ecu_class.__module__.rsplit(".", 1)[-1],
+                ecu_class.__name__,
+                self.rx.name,
+                self.tx.name,
+                self._rx_bell,
+                tx_bell,
+                worker_control,
+                worker_ui_conn,
+                timing.get_config(),
+                log.get_config(),
+            ),
+            name=f"ECU {ecu_class.__name__}",
+            daemon=True,
+        )
+        self.process.start()
+
+    def wait_ready(self) -> None:
+        """Wait for the worker to build its ECU."""
+        if not self._control.poll(CONTROL_TIMEOUT):
+            raise TimeoutError(f"{self.ecu_class.__name__} worker didn't start")
+
+        try:
+            self.ecu_name = self._control.recv()
+            self.logger = log.ecu_logger(self.ecu_name)
+        except EOFError:
+            self.process.join(timeout=1.0)
+            raise RuntimeError(
+                f"{self.ecu_class.__name__} worker exited with code {self.process.exitcode}"
+            )
+        UiLink.get().add_remote(self.ecu_name, self._ui_conn)
+
+    def _request(self, request: str, *args: Any) -> Any:
+        with self._control_lock:
+            if not self.process.is_alive():
+                raise RuntimeError(f"{self.ecu_name} worker exited with code {self.process.exitcode}")
+
+            self._control.send((request, *args))
+            if not self._control.poll(CONTROL_TIMEOUT):
+                raise TimeoutError(f"{self.ecu_name} didn't answer {request}")
+
+            error, result = self._control.recv()
+
+        if error is not None:
+            raise RuntimeError(f"{self.ecu_name} {request}: {error}")
+
+        return result
+
+    def on_message_received(self, msg: Message) -> None:
+        with self._rx_lock:
+            # Only the first unread frame rings (see FrameRing)
+            if self.rx.push(msg) and len(self.rx) == 1:
+                self._rx_bell.release()
+
+    def start(self) -> None:
+        self.notifier.add_listener(self.on_message_received)
+        self._request("start")
+
+    def stop(self) -> None:
+        # Not a crash for the watchdog
+        self.exit_reported = True
+        self.notifier.remove_listener(self.on_message_received)
+
+        try:
+            self._request("stop")
+        except (RuntimeError, TimeoutError, OSError) as e:
+            self.logger.error("Error stopping: %s", e)
+
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1.0)
+
+    def get_state(self) -> Dict[str, Any]:
+        return self._request("get_state")
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._request("set_state", state)
+
+    def close(self) -> None:
+        self.rx.close()
+        self.tx.close()
+
+
+class EcuProcessPool:
+    """
+    Worker processes of a car's ECUs.
+
+    A single writer thread sends the frames of every worker: it sleeps on a
+    semaphore rung by the workers for each frame they push, then drains all
+    the TX rings into the bus of each ECU.
+
+    Args:
+        placements: (ECU class, bus, notifier of the bus) of each ECU
+    """
+
+    def __init__(self, placements: List[Tuple[Type[Ecu], BusABC, Notifier]]) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._tx_bell = context.Semaphore(0)
+
+        self.ecus = [
+            EcuProcess(ecu_class, bus, notifier, self._tx_bell, context)
+            for ecu_class, bus, notifier in placements
+        ]
+        # Workers start in parallel, wait for all of them once
+        try:
+            for ecu in self.ecus:
+                ecu.wait_ready()
+        except (RuntimeError, TimeoutError):
+            for ecu in self.ecus:
+                ecu.process.terminate()
+                ecu.close()
+            raise
+
+        self.sent = 0
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, name="ECU processes writer", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self) -> None:
+        next_check = time.monotonic() + WATCHDOG_PERIOD
+        while self._running:
+            self._tx_bell.acquire(timeout=WATCHDOG_PERIOD)
+
+            for ecu in self.ecus:
+                for msg in ecu.tx.pop_all():
+                    try:
+                        ecu.bus.send(msg)
+                        self.sent += 1
+                    except Exception as e:
+                        logger.error("Error sending %s: %s", msg, e)
+
+            if time.monotonic() >= next_check:
+                next_check = time.monotonic() + WATCHDOG_PERIOD
+                self._check_workers()
+
+    def _check_workers(self) -> None:
+        for ecu in self.ecus:
+            if not ecu.process.is_alive() and not ecu.exit_reported:
+                ecu.exit_reported = True
+                ecu.logger.error("Worker process exited with code %s", ecu.process.exitcode)
+
+    def stop(self) -> None:
+        """Stop every ECU, then the writer, and release the rings."""
+        # In parallel: each worker waits up to a second for its ECU thread
+        stoppers = [threading.Thread(target=ecu.stop) for ecu in self.ecus]
+        for stopper in stoppers:
+            stopper.start()
+        for stopper in stoppers:
+            stopper.join()
+
+        self._running = False
+        self._tx_bell.release()
+        self._writer.join(timeout=1.0)
+
+        for ecu in self.ecus:
+            ecu.close()
+
+    def format_report(self) -> str:
+        lines = [f"ECU processes: {self.sent} frames sent"]
+        for ecu in self.ecus:
+            status = "running" if ecu.process.is_alive() else f"exited ({ecu.process.exitcode})"
+            lines.append(
+                f"  {ecu.ecu_name:<24} pid {ecu.process.pid:>7} {status:<12}"
+                f" RX dropped {ecu.rx.dropped:>6} TX dropped {ecu.tx.dropped:>6}"
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,149 @@
+from can import Message
+from multiprocessing import shared_memory
+from typing import List, Optional
+import struct
+import time
+
+
+# Write index and drop count at the start of the segment (producer side), read
+# index on its own cache line (consumer side). The capacity is written once at
+# creation: the segment size can be rounded up to whole pages (macOS, Windows)
+_HEAD_OFFSET = 0
+_DROPPED_OFFSET = 8
+_CAPACITY_OFFSET = 16
+_TAIL_OFFSET = 64
+_HEADER_SIZE = 128
+_INDEX = struct.Struct("<Q")
+
+# timestamp, arbitration ID, data length, flags, DLC, data. The DLC is kept on
+# its own: remote frames have one but no data
+_RECORD_HEADER = struct.Struct("<dIBBBx")
+_MAX_DATA = 64
+RECORD_SIZE = _RECORD_HEADER.size + _MAX_DATA
+
+_EXTENDED = 0x01
+_REMOTE = 0x02
+_ERROR = 0x04
+_FD = 0x08
+_BRS = 0x10
+
+
+class FrameRing:
+    """
+    Single producer, single consumer ring of CAN frames in shared memory.
+
+    Frames are fixed size records (up to 64 data bytes, CAN FD included).
+    Each side keeps its own index and only publishes it in the header: the
+    producer writes a record before advancing the write index, the consumer
+    reads it before advancing the read index, so no lock is shared between
+    the processes. A full ring rejects new frames, it never overwrites
+    unread ones.
+
+    One process creates the ring (`create=True`) and unlinks it when done,
+    the other attaches to it by name.
+
+    A producer waking the consumer (e.g., with a semaphore) only needs to when
+    its frame is the only unread one right after `push`: the consumer drains
+    the ring before waiting again, frames pushed meanwhile included.
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = 1024, create: bool = False) -> None:
+        if create:
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=_HEADER_SIZE + capacity * RECORD_SIZE
+            )
+            self._shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+            _INDEX.pack_into(self._shm.buf, _CAPACITY_OFFSET, capacity)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        self.capacity = _INDEX.unpack_from(self._buf, _CAPACITY_OFFSET)[0]
+        self._owner = create
+        # Local copies of the indexes, only the owning side moves each one
+        self._head = _INDEX.unpack_from(self._buf, _HEAD_OFFSET)[0]
+        self._tail = _INDEX.unpack_from(self._buf, _TAIL_OFFSET)[0]
+        self._dropped = _INDEX.unpack_from(self._buf, _DROPPED_OFFSET)[0]
+
+    @property
+    def dropped(self) -> int:
+        """Frames rejected by `push` because the ring was full, seen from either side."""
+        if self._buf is not None:
+            self._dropped = _INDEX.unpack_from(self._buf, _DROPPED_OFFSET)[0]
+
+        return self._dropped
+
+    def __len__(self) -> int:
+        head = _INDEX.unpack_from(self._buf, _HEAD_OFFSET)[0]
+        tail = _INDEX.unpack_from(self._buf, _TAIL_OFFSET)[0]
+        return head - tail
+
+    def push(self, msg: Message) -> bool:
+        """Producer side: append a frame, False (and counted as dropped) if the ring is full."""
+        tail = _INDEX.unpack_from(self._buf, _TAIL_OFFSET)[0]
+        if self._head - tail >= self.capacity:
+            self._dropped += 1
+            _INDEX.pack_into(self._buf, _DROPPED_OFFSET, self._dropped)
+            return False
+
+        flags = (
+            (_EXTENDED if msg.is_extended_id else 0)
+            | (_REMOTE if msg.is_remote_frame else 0)
+            | (_ERROR if msg.is_error_frame else 0)
+            | (_FD if msg.is_fd else 0)
+            | (_BRS if msg.bitrate_switch else 0)
+        )
+        data = msg.data[:_MAX_DATA]
+        offset = _HEADER_SIZE + (self._head % self.capacity) * RECORD_SIZE
+        _RECORD_HEADER.pack_into(
+            self._buf, offset, msg.timestamp or time.time(), msg.arbitration_id, len(data), flags, msg.dlc
+        )
+        start = offset + _RECORD_HEADER.size
+        self._buf[start:start + len(data)] = data
+
+        self._head += 1
+        _INDEX.pack_into(self._buf, _HEAD_OFFSET, self._head)
+        return True
+
+    def pop(self) -> Optional[Message]:
+        """Consumer side: oldest unread frame, None if the ring is empty."""
+        head = _INDEX.unpack_from(self._buf, _HEAD_OFFSET)[0]
+        if self._tail == head:
+            return None
+
+        offset = _HEADER_SIZE + (self._tail % self.capacity) * RECORD_SIZE
+        timestamp, arbitration_id, length, flags, dlc = _RECORD_HEADER.unpack_from(self._buf, offset)
+        start = offset + _RECORD_HEADER.size
+        msg = Message(
+            timestamp=timestamp,
+            arbitration_id=arbitration_id,
+            is_extended_id=bool(flags & _EXTENDED),
+            is_remote_frame=bool(flags & _REMOTE),
+            is_error_frame=bool(flags & _ERROR),
+            is_fd=bool(flags & _FD),
+            bitrate_switch=bool(flags & _BRS),
+            dlc=dlc,
+            data=bytes(self._buf[start:start + length]),
+            check=False,
+        )
+
+        self._tail += 1
+        _INDEX.pack_into(self._buf, _TAIL_OFFSET, self._tail)
+        return msg
+
+    def pop_all(self) -> List[Message]:
+        """Consumer side: every unread frame, oldest first."""
+        frames = []
+        while (msg := self.pop()) is not None:
+            frames.append(msg)
+
+        return frames
+
+    def close(self) -> None:
+        # Keep the drop count readable for reports
+        self._dropped = _INDEX.unpack_from(self._buf, _DROPPED_OFFSET)[0]
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -1,14 +1,299 @@
-from can import BusABC, Message
-from typing import Optional
+from can import BusABC, Message, Notifier
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def arbitration_priority(msg: Message) -> int:
+    """
+    Sort key reproducing CAN arbitration: lower wins.
+
+    The 11 bit base ID is compared first, on a tie a base frame wins over an
+    extended one (recessive IDE bit), then the 18 bit ID extension is compared.
+    """
+    if msg.is_extended_id:
+        return (msg.arbitration_id >> 18) << 19 | 1 << 18 | (msg.arbitration_id & 0x3FFFF)
+
+    return msg.arbitration_id << 19
+
+
+class TxQueueStats:
+    """Queueing delay of the frames sent through a ProxyBus."""
+
+    def __init__(self, history: int = 1024) -> None:
+        self.frames = 0
+        self.dropped = 0
+        self.max_depth = 0
+        # arbitration ID -> [frames, total delay, max delay]
+        self.per_id: Dict[int, List[float]] = {}
+        self._recent: Deque[float] = deque(maxlen=history)
+
+    def record(self, arbitration_id: int, delay: float) -> None:
+        self.frames += 1
+        self._recent.append(delay)
+
+        entry = self.per_id.get(arbitration_id)
+        if entry is None:
+            self.per_id[arbitration_id] = [1, delay, delay]
+        else:
+            entry[0] += 1
+            entry[1] += delay
+            entry[2] = max(entry[2], delay)
+
+    def percentile(self, p: float) -> float:
+        """Queueing delay percentile (0-100) over the most recent frames."""
+        delays = sorted(self._recent)
+        if not delays:
+            return 0.0
+
+        return delays[min(len(delays) - 1, int(len(delays) * p / 100))]
+
+    def format_report(self) -> str:
+        lines = [
+            f"TX queue: {self.frames} frames, {self.dropped} dropped, max depth {self.max_depth}",
+            f"  delay p50 {self.percentile(50) * 1e3:.3f} ms"
+            f" p99 {self.percentile(99) * 1e3:.3f} ms",
+        ]
+        for arbitration_id, (frames, total, worst) in sorted(self.per_id.items()):
+            lines.append(
+                f"  0x{arbitration_id:03X} mean {total / frames * 1e3:.3f} ms"
+                f" max {worst * 1e3:.3f} ms"
+            )
+
+        return "\n".join(lines)
 
 
 class ProxyBus(BusABC):
-    def __init__(self, tx_bus: BusABC, rx_bus: BusABC):
+    """
+    Sends through one bus and receives from another.
+
+    Sends don't touch the TX bus: frames are queued and a single writer thread
+    transmits them, lowest arbitration ID first, like a real CAN controller
+    competing for the bus. When the queue is full, a new frame takes the place
+    of the lowest priority one if it outranks it, and is dropped otherwise.
+
+    With loopback enabled, frames are also handed to the listeners of the local
+    notifier once the writer has sent them (frames dropped or evicted from the
+    queue are never seen locally), and their echo is dropped when it comes
+    back through the RX bus. An identical frame injected by someone else within
+    `echo_timeout` of a local send is indistinguishable from the echo, and is
+    dropped as well.
+    """
+
+    def __init__(
+        self,
+        tx_bus: BusABC,
+        rx_bus: BusABC,
+        max_queue: int = 4096,
+        loopback: bool = False,
+        echo_timeout: float = 2.0,
+    ):
         self._tx_bus = tx_bus
         self._rx_bus = rx_bus
 
+        self._loopback = loopback
+        self._echo_timeout = echo_timeout
+        self._local_notifier: Optional[Notifier] = None
+        # Deadlines of the frames sent locally whose echo hasn't been received
+        # yet, oldest first for each frame
+        self._pending_echoes: Dict[Tuple[int, bool, bytes], Deque[float]] = {}
+        self._next_echo_sweep = 0.0
+        self._echo_lock = threading.Lock()
+        self.echoes_dropped = 0
+
+        self._max_queue = max_queue
+        # Next frame to send first, and lowest priority (then newest) frame
+        # first, as (-priority, -sequence). Frames sent or evicted leave their
+        # entry in the other heap until it reaches the top (or the heap is
+        # rebuilt): only sequences in _queued are live
+        self._queue: List[Tuple[int, int, float, Message]] = []
+        self._worst: List[Tuple[int, int]] = []
+        self._queued: Set[int] = set()
+        self._sequence = itertools.count()
+        self._queue_cond = threading.Condition()
+        self._running = True
+        self.tx_stats = TxQueueStats()
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name="ProxyBus writer", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def tx_bus(self) -> BusABC:
+        return self._tx_bus
+
+    @property
+    def rx_bus(self) -> BusABC:
+        return self._rx_bus
+
+    def set_local_notifier(self, notifier: Notifier) -> None:
+        """Notifier whose listeners get the locally sent frames in loopback mode."""
+        self._local_notifier = notifier
+
+    @staticmethod
+    def _echo_key(msg: Message) -> Tuple[int, bool, bytes]:
+        return msg.arbitration_id, msg.is_extended_id, bytes(msg.data)
+
+    def _expire_echoes(self, now: float) -> None:
+        # Frames whose echoes never came back, swept once per echo_timeout
+        if now < self._next_echo_sweep:
+            return
+
+        self._next_echo_sweep = now + self._echo_timeout
+        expired = [key for key, deadlines in self._pending_echoes.items() if deadlines[-1] < now]
+        for key in expired:
+            del self._pending_echoes[key]
+
+    def _is_echo(self, msg: Message) -> bool:
+        key = self._echo_key(msg)
+        now = time.monotonic()
+
+        with self._echo_lock:
+            self._expire_echoes(now)
+
+            deadlines = self._pending_echoes.get(key)
+            if deadlines is None:
+                return False
+
+            while deadlines and deadlines[0] < now:
+                deadlines.popleft()
+
+            if deadlines:
+                deadlines.popleft()
+                echo = True
+            else:
+                echo = False
+
+            if not deadlines:
+                del self._pending_echoes[key]
+
+        if echo:
+            self.echoes_dropped += 1
+        return echo
+
+    def _expect_echo(self, msg: Message) -> None:
+        key = self._echo_key(msg)
+        with self._echo_lock:
+            deadlines = self._pending_echoes.setdefault(key, deque())
+            deadlines.append(time.monotonic() + self._echo_timeout)
+
+    def _forget_echo(self, msg: Message) -> None:
+        # The frame couldn't be sent, no echo will come back
+        key = self._echo_key(msg)
+        with self._echo_lock:
+            deadlines = self._pending_echoes.get(key)
+            if deadlines:
+                deadlines.pop()
+                if not deadlines:
+                    del self._pending_echoes[key]
+
+    def _deliver_locally(self, msg: Message) -> None:
+        local_msg = Message(
+            timestamp=time.time(),
+            arbitration_id=msg.arbitration_id,
+            is_extended_id=msg.is_extended_id,
+            is_remote_frame=msg.is_remote_frame,
+            dlc=msg.dlc,
+            data=msg.data,
+        )
+
+        for listener in list(self._local_notifier.listeners):
+            try:
+                listener(local_msg)
+            except Exception as e:
+                logger.error("Error delivering %s locally: %s", local_msg, e)
+
     def recv(self, timeout: Optional[float] = None) -> Optional[Message]:
-        return self._rx_bus.recv(timeout)
+        if not self._loopback:
+            return self._rx_bus.recv(timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            msg = self._rx_bus.recv(remaining)
+
+            if msg is None or not self._is_echo(msg):
+                return msg
 
     def send(self, msg: Message, timeout: Optional[float] = None) -> None:
-        self._tx_bus.send(msg, timeout)
+        entry = (arbitration_priority(msg), next(self._sequence), time.perf_counter(), msg)
+
+        with self._queue_cond:
+            if len(self._queued) >= self._max_queue:
+                self.tx_stats.dropped += 1
+
+                while -self._worst[0][1] not in self._queued:
+                    heapq.heappop(self._worst)
+                priority, sequence = -self._worst[0][0], -self._worst[0][1]
+                if entry[:2] > (priority, sequence):
+                    return
+
+                heapq.heappop(self._worst)
+                self._queued.remove(sequence)
+
+            heapq.heappush(self._queue, entry)
+            heapq.heappush(self._worst, (-entry[0], -entry[1]))
+            self._queued.add(entry[1])
+            self._compact()
+            self.tx_stats.max_depth = max(self.tx_stats.max_depth, len(self._queued))
+            self._queue_cond.notify()
+
+    def _compact(self) -> None:
+        # Drop the entries of frames gone from the queue, once they are as many
+        # as the live ones: amortized O(1) per frame
+        if len(self._queue) > 2 * self._max_queue:
+            self._queue = [entry for entry in self._queue if entry[1] in self._queued]
+            heapq.heapify(self._queue)
+        if len(self._worst) > 2 * self._max_queue:
+            self._worst = [entry for entry in self._worst if -entry[1] in self._queued]
+            heapq.heapify(self._worst)
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._queue_cond:
+                while not self._queued and self._running:
+                    self._queue_cond.wait()
+
+                if not self._running:
+                    return
+
+                _, sequence, queued_at, msg = heapq.heappop(self._queue)
+                while sequence not in self._queued:
+                    _, sequence, queued_at, msg = heapq.heappop(self._queue)
+                self._queued.remove(sequence)
+
+            self.tx_stats.record(msg.arbitration_id, time.perf_counter() - queued_at)
+
+            loopback = self._loopback and self._local_notifier is not None
+            # Before the frame is on the bus, so its echo is always recognized
+            if loopback:
+                self._expect_echo(msg)
+
+            try:
+                self._tx_bus.send(msg)
+            except Exception as e:
+                logger.error("Error sending %s: %s", msg, e)
+                if loopback:
+                    self._forget_echo(msg)
+                continue
+
+            if loopback:
+                self._deliver_locally(msg)
+
+    def shutdown(self) -> None:
+        with self._queue_cond:
+            self._running = False
+            self._queue_cond.notify()
+        self._writer.join(timeout=1.0)
+
+        self._tx_bus.shutdown()
+        if self._rx_bus is not self._tx_bus:
+            self._rx_bus.shutdown()
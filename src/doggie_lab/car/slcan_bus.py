@@ -0,0 +1,348 @@
+from can import BusABC, Message, CanInitializationError, CanOperationError
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+import logging
+import serial
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SlcanStats:
+    """Counters of the serial side of an SlcanBus."""
+
+    tx_frames: int = 0
+    tx_writes: int = 0
+    tx_bytes: int = 0
+    # Frames discarded because the pending TX buffer was full
+    tx_overruns: int = 0
+    rx_frames: int = 0
+    rx_reads: int = 0
+    rx_bytes: int = 0
+    # Lines that couldn't be parsed (usually bytes lost on the serial line)
+    rx_malformed: int = 0
+    # Commands rejected by the adapter (BEL), e.g. its TX FIFO being full
+    rx_errors: int = 0
+    # Status flags reported by the adapter (see SlcanBus status_period)
+    fifo_overruns: int = 0
+    data_overruns: int = 0
+
+    @property
+    def frames_per_write(self) -> float:
+        return self.tx_frames / self.tx_writes if self.tx_writes else 0.0
+
+
+class SlcanBus(BusABC):
+    """
+    slcan (Lawicel) transport tuned for throughput.
+
+    Frames sent from any thread are appended to a pending buffer that a single
+    writer thread flushes with one serial write, so concurrent senders end up
+    coalesced into large writes. Received data is read in chunks of whatever the
+    driver has buffered and split into frames, instead of byte by byte.
+
+    The writer also requests the adapter status flags every `status_period`,
+    the overruns they report are counted in `stats`.
+    """
+
+    BITRATES = {
+        10000: b"S0",
+        20000: b"S1",
+        50000: b"S2",
+        100000: b"S3",
+        125000: b"S4",
+        250000: b"S5",
+        500000: b"S6",
+        750000: b"S7",
+        1000000: b"S8",
+        83300: b"S9",
+    }
+
+    TERMINATOR = b"\r"
+    BELL = b"\x07"
+
+    # Serial read timeout, recv keeps reading until its own timeout expires
+    READ_TIMEOUT = 0.05
+
+    # Status flags returned by the F command
+    STATUS_RX_FIFO_FULL = 0x01
+    STATUS_TX_FIFO_FULL = 0x02
+    STATUS_DATA_OVERRUN = 0x08
+
+    def __init__(
+        self,
+        channel: str,
+        bitrate: Optional[int] = None,
+        tty_baudrate: int = 115200,
+        max_pending: int = 64 * 1024,
+        coalesce_delay: float = 0.0002,
+        status_period: float = 1.0,
+        rtscts: bool = False,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            channel: Serial port, optionally with the baudrate (/dev/ttyUSB0@921600)
+            bitrate: CAN bus speed, None to keep the adapter's configuration
+            tty_baudrate: Serial baudrate if not given in the channel
+            max_pending: Maximum bytes waiting to be written before frames are dropped
+            coalesce_delay: Time the writer waits for more frames before a write
+            status_period: Seconds between status requests, 0 to disable them
+            rtscts: Enable hardware flow control
+        """
+        if not channel:
+            raise ValueError("Must specify a serial port.")
+
+        if "@" in channel:
+            channel, baudrate = channel.rsplit("@", 1)
+            tty_baudrate = int(baudrate)
+
+        if bitrate is not None and bitrate not in self.BITRATES:
+            bitrates = ", ".join(str(k) for k in self.BITRATES)
+            raise ValueError(f"Invalid bitrate, choose one of {bitrates}.")
+
+        try:
+            self._serial = serial.serial_for_url(
+                channel,
+                baudrate=tty_baudrate,
+                rtscts=rtscts,
+                timeout=self.READ_TIMEOUT,
+            )
+        except serial.SerialException as e:
+            raise CanInitializationError(f"Could not open {channel}: {e}") from e
+
+        self.channel_info = f"slcan {channel}@{tty_baudrate}"
+        self.stats = SlcanStats()
+
+        self._max_pending = max_pending
+        self._coalesce_delay = coalesce_delay
+        self._status_period = status_period
+        self._status_requested = False
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._tx_cond = threading.Condition()
+        self._running = True
+
+        self._rx_buffer = bytearray()
+        self._rx_frames: Deque[Message] = deque()
+
+        # Close first in case the adapter was left open
+        self._write_command(b"C")
+        if bitrate is not None:
+            self._write_command(self.BITRATES[bitrate])
+        self._write_command(b"O")
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name=f"{self.channel_info} writer", daemon=True
+        )
+        self._writer.start()
+
+        super().__init__(channel, **kwargs)
+
+    @staticmethod
+    def encode(msg: Message) -> bytes:
+        """Encode a frame as an slcan line."""
+        if msg.is_extended_id:
+            header = b"R" if msg.is_remote_frame else b"T"
+            arbitration_id = b"%08X" % msg.arbitration_id
+        else:
+            header = b"r" if msg.is_remote_frame else b"t"
+            arbitration_id = b"%03X" % msg.arbitration_id
+
+        data = b"" if msg.is_remote_frame else msg.data.hex().upper().encode()
+
+        return header + arbitration_id + b"%d" % msg.dlc + data + SlcanBus.TERMINATOR
+
+    @staticmethod
+    def decode(line: bytes) -> Optional[Message]:
+        """Decode an slcan line (without terminator), None if it isn't a frame."""
+        kind = line[:1]
+        if kind in (b"t", b"r"):
+            id_length = 3
+        elif kind in (b"T", b"R"):
+            id_length = 8
+        else:
+            return None
+
+        dlc = int(line[1 + id_length:2 + id_length])
+        arbitration_id = int(line[1:1 + id_length], 16)
+        remote = kind in (b"r", b"R")
+        data_end = 2 + id_length + (0 if remote else 2 * dlc)
+
+        # Some adapters append a 16 bit timestamp
+        if len(line) not in (data_end, data_end + 4):
+            raise ValueError(f"Bad frame length {line!r}")
+
+        return Message(
+            timestamp=time.time(),
+            arbitration_id=arbitration_id,
+            is_extended_id=id_length == 8,
+            is_remote_frame=remote,
+            dlc=dlc,
+            data=None if remote else bytes.fromhex(line[2 + id_length:data_end].decode()),
+        )
+
+    def send(self, msg: Message, timeout: Optional[float] = None) -> None:
+        line = self.encode(msg)
+
+        with self._tx_cond:
+            if self._pending_bytes + len(line) > self._max_pending:
+                self.stats.tx_overruns += 1
+                return
+
+            self._pending.append(line)
+            self._pending_bytes += len(line)
+            self._tx_cond.notify()
+
+    def _write_loop(self) -> None:
+        next_status = time.monotonic() + self._status_period
+        while self._running:
+            with self._tx_cond:
+                while not self._pending and not self._status_requested and self._running:
+                    timeout = None
+                    if self._status_period:
+                        timeout = next_status - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self._tx_cond.wait(timeout)
+
+            # Let other senders add their frames to this write
+            if self._coalesce_delay:
+                time.sleep(self._coalesce_delay)
+
+            with self._tx_cond:
+                pending, self._pending = self._pending, []
+                self._pending_bytes = 0
+                status, self._status_requested = self._status_requested, False
+
+            now = time.monotonic()
+            if self._status_period and now >= next_status:
+                status = True
+            if status:
+                next_status = now + self._status_period
+
+            if not pending and not status:
+                continue
+
+            data = b"".join(pending)
+            if status:
+                data += b"F" + self.TERMINATOR
+            try:
+                self._serial.write(data)
+            except serial.SerialException as e:
+                logger.error("Error writing to %s: %s", self.channel_info, e)
+                continue
+
+            self.stats.tx_frames += len(pending)
+            self.stats.tx_writes += 1
+            self.stats.tx_bytes += len(data)
+
+    def _write_command(self, command: bytes) -> None:
+        try:
+            self._serial.write(command + self.TERMINATOR)
+            self._serial.flush()
+        except serial.SerialException as e:
+            raise CanOperationError(f"Could not write to {self.channel_info}: {e}") from e
+
+    def poll_status(self) -> None:
+        """Request the adapter status flags with the next write, besides the periodic requests."""
+        with self._tx_cond:
+            self._status_requested = True
+            self._tx_cond.notify()
+
+    def format_report(self) -> str:
+        stats = self.stats
+        return "\n".join([
+            f"{self.channel_info}:",
+            f"  TX {stats.tx_frames} frames in {stats.tx_writes} writes"
+            f" ({stats.frames_per_write:.1f} per write, {stats.tx_overruns} overruns)",
+            f"  RX {stats.rx_frames} frames in {stats.rx_reads} reads"
+            f" ({stats.rx_malformed} malformed, {stats.rx_errors} commands rejected)",
+            f"  Adapter {stats.fifo_overruns} FIFO overruns, {stats.data_overruns} data overruns",
+        ])
+
+    def _parse(self) -> None:
+        """Split the RX buffer in lines and queue the decoded frames."""
+        buffer = self._rx_buffer
+
+        while True:
+            bell = buffer.find(self.BELL)
+            end = buffer.find(self.TERMINATOR)
+
+            if bell != -1 and (end == -1 or bell < end):
+                self.stats.rx_errors += 1
+                del buffer[:bell + 1]
+                continue
+
+            if end == -1:
+                break
+
+            line = bytes(buffer[:end])
+            del buffer[:end + 1]
+            self._parse_line(line)
+
+    def _parse_line(self, line: bytes) -> None:
+        # Empty lines and z/Z are acknowledges of our own commands
+        if not line or line[:1] in (b"z", b"Z"):
+            return
+
+        if line[:1] == b"F" and len(line) == 3:
+            flags = int(line[1:], 16)
+            if flags & (self.STATUS_RX_FIFO_FULL | self.STATUS_TX_FIFO_FULL):
+                self.stats.fifo_overruns += 1
+            if flags & self.STATUS_DATA_OVERRUN:
+                self.stats.data_overruns += 1
+            return
+
+        try:
+            msg = self.decode(line)
+        except ValueError:
+            msg = None
+
+        if msg is None:
+            self.stats.rx_malformed += 1
+            return
+
+        self.stats.rx_frames += 1
+        self._rx_frames.append(msg)
+
+    def _recv_internal(self, timeout: Optional[float]) -> Tuple[Optional[Message], bool]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self._rx_frames:
+            try:
+                # Block for the first byte, then take everything already buffered
+                data = self._serial.read(1)
+                if data:
+                    data += self._serial.read(self._serial.in_waiting)
+            except serial.SerialException as e:
+                raise CanOperationError(f"Could not read from {self.channel_info}: {e}") from e
+
+            if data:
+                self.stats.rx_reads += 1
+                self.stats.rx_bytes += len(data)
+                self._rx_buffer += data
+                self._parse()
+
+            if not self._rx_frames and deadline is not None and time.monotonic() >= deadline:
+                return None, False
+
+        return self._rx_frames.popleft(), False
+
+    def shutdown(self) -> None:
+        super().shutdown()
+
+        with self._tx_cond:
+            self._running = False
+            self._tx_cond.notify()
+        self._writer.join(timeout=1.0)
+
+        try:
+            self._write_command(b"C")
+        except CanOperationError:
+            pass
+        self._serial.close()
@@ -0,0 +1,81 @@
+from doggie_lab import ids
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    Frames with `arbitration_id` seen on `source` are forwarded to `destination`.
+
+    Args:
+        rate: Sustained frames per second allowed through
+        burst: Frames allowed back to back above the sustained rate
+    """
+
+    arbitration_id: int
+    source: str
+    destination: str
+    rate: float
+    burst: int
+
+
+@dataclass(frozen=True)
+class Topology:
+    """
+    Split of the car's ECUs into CAN segments joined by a gateway.
+
+    Args:
+        external: Segment on the car's bus (the one the Doggie is plugged
+            into), the others are in-process virtual buses
+        segments: ECU class names of every segment, ECUs not listed go to
+            the external segment
+        routes: Frames forwarded by the gateway, everything else stays in its
+            segment
+    """
+
+    external: str
+    segments: Dict[str, Tuple[str, ...]]
+    routes: Tuple[Route, ...] = field(default=())
+
+    def __post_init__(self) -> None:
+        # An ID forwarded from more than one segment could bounce between them
+        sources: Dict[int, str] = {}
+        for route in self.routes:
+            for segment in (route.source, route.destination):
+                if segment != self.external and segment not in self.segments:
+                    raise ValueError(f"Route of 0x{route.arbitration_id:03X}: unknown segment {segment}")
+
+            if sources.setdefault(route.arbitration_id, route.source) != route.source:
+                raise ValueError(f"0x{route.arbitration_id:03X} is routed from more than one segment")
+
+    def segment_of(self, ecu_class_name: str) -> str:
+        for segment, ecus in self.segments.items():
+            if ecu_class_name in ecus:
+                return segment
+
+        return self.external
+
+    @property
+    def segment_names(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys((self.external, *self.segments)))
+
+
+# Powertrain behind the gateway, body (and diagnostics) on the external bus
+POWERTRAIN_BODY = Topology(
+    external="body",
+    segments={
+        "powertrain": ("CentralEcu", "AbsEcu", "CruiseControlEcu"),
+        "body": ("DoorsEcu", "ImmoEcu", "InstrumentsClusterEcu", "VinEcu", "MemoryEcu"),
+    },
+    routes=(
+        # Engine, speed, RPM, ABS and airbag status for the cluster and doors
+        Route(ids.CENTRAL_ECU_ID, "powertrain", "body", rate=100, burst=50),
+        # Cruise control state and throttle shown by the cluster
+        Route(ids.CRUISE_CONTROL_ECU_ID, "powertrain", "body", rate=10, burst=5),
+        # Key for the engine start
+        Route(ids.IMMO_ECU_ID, "body", "powertrain", rate=1200, burst=50),
+        # Engine start/stop and airbag toggle from the cluster
+        Route(ids.INSTRUMENT_CLUSTER_ID, "body", "powertrain", rate=20, burst=5),
+    ),
+)
@@ -0,0 +1,416 @@
+from can import BusABC, Message, CanInitializationError
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+import logging
+import random
+import select
+import socket
+import struct
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PORT = 29536
+
+# Datagram header: magic, version, kind, sender ID, sequence number, frame count
+_HEADER = struct.Struct("!2sBBIIH")
+MAGIC = b"DL"
+VERSION = 1
+
+KIND_DATA = 0
+# Clients announce themselves (and keep their registration alive) with HELLO
+KIND_HELLO = 1
+KIND_BYE = 2
+
+# Frame record: CAN ID with SocketCAN flag bits, FD flags, data length, data
+_FRAME = struct.Struct("!IBB")
+_CAN_EFF_FLAG = 0x80000000
+_CAN_RTR_FLAG = 0x40000000
+_CAN_ERR_FLAG = 0x20000000
+_FD = 0x01
+_BRS = 0x02
+_ESI = 0x04
+
+# Fits in an Ethernet frame without IP fragmentation
+MAX_DATAGRAM = 1400
+
+# Socket buffers, room for bursts while the reader is not scheduled
+SOCKET_BUFFER = 4 * 1024 * 1024
+
+
+@dataclass
+class UdpStats:
+    """Counters of the datagram side of a UdpBus."""
+
+    tx_frames: int = 0
+    tx_datagrams: int = 0
+    # Frames discarded because the pending TX buffer, or the socket's, was full
+    tx_overruns: int = 0
+    rx_frames: int = 0
+    rx_datagrams: int = 0
+    # Datagrams missing from a sender's sequence
+    rx_lost: int = 0
+    # Datagrams older than the last one seen from their sender
+    rx_reordered: int = 0
+    rx_malformed: int = 0
+    # Datagrams relayed by a hub to its other peers
+    forwarded: int = 0
+
+    @property
+    def frames_per_datagram(self) -> float:
+        return self.tx_frames / self.tx_datagrams if self.tx_datagrams else 0.0
+
+
+def parse_address(channel: str) -> Tuple[str, int]:
+    """HOST[:PORT] -> (host, port)."""
+    host, _, port = channel.rpartition(":")
+    if not host:
+        return channel, DEFAULT_PORT
+
+    return host, int(port)
+
+
+class UdpBus(BusABC):
+    """
+    CAN frames over UDP, batched many per datagram.
+
+    The simulator is a hub (`hub=True`) bound to `channel`: clients (attack
+    tools, other simulators...) send it a HELLO and then exchange frames
+    with it, and the hub relays every datagram received from a client to the
+    other clients, so all of them share one bus. Clients that stay silent for
+    PEER_TIMEOUT are forgotten, idle clients send a HELLO every
+    KEEPALIVE_PERIOD.
+
+    Frames sent from any thread are appended to a pending buffer that a single
+    writer thread packs into as few datagrams as possible. Every datagram
+    carries the sender's random ID and a sequence number, so receivers count
+    lost and reordered datagrams. On receive, every datagram already queued on
+    the socket is read and unpacked at once.
+    """
+
+    KEEPALIVE_PERIOD = 2.0
+    PEER_TIMEOUT = 10.0
+
+    def __init__(
+        self,
+        channel: str,
+        hub: bool = False,
+        receive_own_messages: bool = False,
+        max_pending: int = 4096,
+        coalesce_delay: float = 0.0,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            channel: HOST[:PORT] to bind (hub) or of the hub (client)
+            hub: Bind the address and relay between clients
+            receive_own_messages: Also receive the frames sent through this bus
+            max_pending: Maximum frames waiting to be sent before frames are dropped
+            coalesce_delay: Time the writer waits for more frames before packing
+        """
+        if not channel:
+            raise ValueError("Must specify an address.")
+
+        self._address = parse_address(channel)
+        self._hub = hub
+        self._receive_own = receive_own_messages
+        # Tells apart the buses behind one address (and our own relayed datagrams)
+        self._sender = random.getrandbits(32)
+
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Capped by the system (net.core.rmem_max on Linux), best effort
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER)
+            if hub:
+                self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self._socket.bind(self._address)
+            else:
+                self._socket.bind(("", 0))
+            self._socket.setblocking(False)
+        except OSError as e:
+            raise CanInitializationError(f"Could not open UDP {channel}: {e}") from e
+
+        host, port = self._socket.getsockname()
+        # Own datagrams are delivered by sending them to ourselves
+        self._own_address = ("127.0.0.1" if host == "0.0.0.0" else host, port)
+
+        role = "hub" if hub else "client"
+        self.channel_info = f"udp {role} {self._address[0]}:{self._address[1]}"
+        self.stats = UdpStats()
+
+        # Hub: address -> time of its last datagram
+        self._peers: Dict[Tuple[str, int], float] = {}
+        self._peers_lock = threading.Lock()
+        # Sender ID -> last sequence number seen
+        self._sequences: Dict[int, int] = {}
+        self._sequence = 0
+
+        self._max_pending = max_pending
+        self._coalesce_delay = coalesce_delay
+        self._pending: List[bytes] = []
+        self._tx_cond = threading.Condition()
+        self._running = True
+
+        self._rx_frames: Deque[Message] = deque()
+
+        if not hub:
+            self._send_control(KIND_HELLO)
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name=f"{self.channel_info} writer", daemon=True
+        )
+        self._writer.start()
+
+        super().__init__(channel, **kwargs)
+
+    @staticmethod
+    def encode(msg: Message) -> bytes:
+        """Encode a frame as a datagram record."""
+        can_id = msg.arbitration_id
+        if msg.is_extended_id:
+            can_id |= _CAN_EFF_FLAG
+        if msg.is_remote_frame:
+            can_id |= _CAN_RTR_FLAG
+        if msg.is_error_frame:
+            can_id |= _CAN_ERR_FLAG
+
+        flags = (_FD if msg.is_fd else 0) | (_BRS if msg.bitrate_switch else 0) | (
+            _ESI if msg.error_state_indicator else 0
+        )
+
+        if msg.is_remote_frame:
+            return _FRAME.pack(can_id, flags, msg.dlc)
+
+        return _FRAME.pack(can_id, flags, len(msg.data)) + bytes(msg.data)
+
+    @staticmethod
+    def decode_frames(payload: bytes, count: int, timestamp: float) -> List[Message]:
+        """Decode the `count` records of a datagram payload."""
+        frames = []
+        offset = 0
+        for _ in range(count):
+            can_id, flags, length = _FRAME.unpack_from(payload, offset)
+            offset += _FRAME.size
+
+            remote = bool(can_id & _CAN_RTR_FLAG)
+            data = None
+            if not remote:
+                data = payload[offset:offset + length]
+                if len(data) != length:
+                    raise ValueError("Truncated frame")
+                offset += length
+
+            frames.append(Message(
+                timestamp=timestamp,
+                arbitration_id=can_id & 0x1FFFFFFF,
+                is_extended_id=bool(can_id & _CAN_EFF_FLAG),
+                is_remote_frame=remote,
+                is_error_frame=bool(can_id & _CAN_ERR_FLAG),
+                is_fd=bool(flags & _FD),
+                bitrate_switch=bool(flags & _BRS),
+                error_state_indicator=bool(flags & _ESI),
+                dlc=length,
+                data=data,
+                check=False,
+            ))
+
+        return frames
+
+    def send(self, msg: Message, timeout: Optional[float] = None) -> None:
+        record = self.encode(msg)
+
+        with self._tx_cond:
+            if len(self._pending) >= self._max_pending:
+                self.stats.tx_overruns += 1
+                return
+
+            self._pending.append(record)
+            self._tx_cond.notify()
+
+    def _destinations(self) -> List[Tuple[str, int]]:
+        if not self._hub:
+            destinations = [self._address]
+        else:
+            with self._peers_lock:
+                destinations = list(self._peers)
+
+        if self._receive_own:
+            destinations.append(self._own_address)
+
+        return destinations
+
+    def _datagram(self, kind: int, records: List[bytes]) -> bytes:
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        header = _HEADER.pack(MAGIC, VERSION, kind, self._sender, self._sequence, len(records))
+        return header + b"".join(records)
+
+    def _sendto(self, datagram: bytes, destinations: List[Tuple[str, int]]) -> bool:
+        sent = False
+        for address in destinations:
+            try:
+                self._socket.sendto(datagram, address)
+                sent = True
+            except BlockingIOError:
+                # Socket buffer full
+                pass
+            except OSError as e:
+                logger.error("Error sending to %s:%d on %s: %s", address[0], address[1], self.channel_info, e)
+
+        return sent
+
+    def _send_control(self, kind: int) -> None:
+        destinations = [self._address] if not self._hub else self._destinations()
+        self._sendto(self._datagram(kind, []), destinations)
+
+    def _send_pending(self, pending: List[bytes]) -> None:
+        destinations = self._destinations()
+        if not destinations:
+            # Nobody listening
+            return
+
+        batch: List[bytes] = []
+        size = _HEADER.size
+        for record in pending + [b""]:
+            # The empty record flushes the last batch
+            if batch and (not record or size + len(record) > MAX_DATAGRAM):
+                if self._sendto(self._datagram(KIND_DATA, batch), destinations):
+                    self.stats.tx_frames += len(batch)
+                    self.stats.tx_datagrams += 1
+                else:
+                    self.stats.tx_overruns += len(batch)
+
+                batch = []
+                size = _HEADER.size
+
+            if record:
+                batch.append(record)
+                size += len(record)
+
+    def _expire_peers(self, now: float) -> None:
+        with self._peers_lock:
+            for address, last_seen in list(self._peers.items()):
+                if now - last_seen > self.PEER_TIMEOUT:
+                    del self._peers[address]
+
+    def _write_loop(self) -> None:
+        next_keepalive = time.monotonic() + self.KEEPALIVE_PERIOD
+        while self._running:
+            with self._tx_cond:
+                if not self._pending and self._running:
+                    self._tx_cond.wait(max(0.0, next_keepalive - time.monotonic()))
+
+            now = time.monotonic()
+            if now >= next_keepalive:
+                next_keepalive = now + self.KEEPALIVE_PERIOD
+                if self._hub:
+                    self._expire_peers(time.time())
+                else:
+                    self._send_control(KIND_HELLO)
+
+            # Let other senders add their frames to these datagrams
+            if self._coalesce_delay:
+                time.sleep(self._coalesce_delay)
+
+            with self._tx_cond:
+                pending, self._pending = self._pending, []
+
+            if pending:
+                self._send_pending(pending)
+
+    def _handle_datagram(self, datagram: bytes, address: Tuple[str, int], timestamp: float) -> None:
+        if len(datagram) < _HEADER.size:
+            self.stats.rx_malformed += 1
+            return
+
+        magic, version, kind, sender, sequence, count = _HEADER.unpack_from(datagram)
+        if magic != MAGIC or version != VERSION:
+            self.stats.rx_malformed += 1
+            return
+
+        own = sender == self._sender
+        if own and not self._receive_own:
+            return
+
+        if self._hub and not own:
+            with self._peers_lock:
+                if kind == KIND_BYE:
+                    self._peers.pop(address, None)
+                else:
+                    self._peers[address] = time.time()
+
+        if kind != KIND_DATA:
+            return
+
+        self.stats.rx_datagrams += 1
+        last = self._sequences.get(sender)
+        if last is not None:
+            gap = (sequence - last) & 0xFFFFFFFF
+            if gap == 0 or gap > 0x7FFFFFFF:
+                self.stats.rx_reordered += 1
+            else:
+                self.stats.rx_lost += gap - 1
+        if last is None or 0 < (sequence - last) & 0xFFFFFFFF <= 0x7FFFFFFF:
+            self._sequences[sender] = sequence
+
+        try:
+            frames = self.decode_frames(datagram[_HEADER.size:], count, timestamp)
+        except (ValueError, struct.error):
+            self.stats.rx_malformed += 1
+            return
+
+        self.stats.rx_frames += len(frames)
+        self._rx_frames.extend(frames)
+
+        # Relay to the other clients, unchanged (sender and sequence included)
+        if self._hub and not own:
+            with self._peers_lock:
+                others = [peer for peer in self._peers if peer != address]
+            if others and self._sendto(datagram, others):
+                self.stats.forwarded += 1
+
+    def _recv_internal(self, timeout: Optional[float]) -> Tuple[Optional[Message], bool]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self._rx_frames:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._socket], [], [], remaining)
+            if not readable:
+                return None, False
+
+            # Take every datagram already queued, not just the first one
+            timestamp = time.time()
+            while True:
+                try:
+                    datagram, address = self._socket.recvfrom(65535)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    # e.g. ICMP port unreachable from a client that went away
+                    continue
+
+                self._handle_datagram(datagram, address, timestamp)
+
+        return self._rx_frames.popleft(), False
+
+    @property
+    def peers(self) -> List[Tuple[str, int]]:
+        """Clients currently registered with a hub."""
+        with self._peers_lock:
+            return list(self._peers)
+
+    def shutdown(self) -> None:
+        super().shutdown()
+
+        with self._tx_cond:
+            self._running = False
+            self._tx_cond.notify()
+        self._writer.join(timeout=1.0)
+
+        if not self._hub:
+            self._send_control(KIND_BYE)
+        self._socket.close()
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ButtonState(Enum):
+    OFF = "OFF"
+    IGNITION = "IGNITION"
+    ON = "ON"
@@ -1,14 +1,15 @@
 from doggie_lab.ecus.ecu_ui import Ecu
 from doggie_lab.messages import AbsMessage
+from doggie_lab.timing import PeriodicTimer
 import can
-import time
 
 
-class ImmoEcu(Ecu):
+class AbsEcu(Ecu):
     def __init__(self, bus: can.BusABC, notifier: can.Notifier):
         super().__init__(bus, notifier, "ABS ECU")
+        self._timer = PeriodicTimer(0.5, self.ecu_name)
 
     def loop(self):
         while True:
-            time.sleep(0.5)
-            self.send_msg(AbsMessage().to_can_msg())
+            self._timer.wait()
+            self.send_msg(AbsMessage.cached_can_msg())
@@ -1,4 +1,6 @@
 from doggie_lab.ecus.ecu import Ecu
+from doggie_lab.ecus.tx_policy import ChangeTriggeredTx
+from doggie_lab.timing import PeriodicTimer
 from doggie_lab.messages import (
     EngineStatusMessage,
     SpeedStatusMessage,
@@ -16,6 +18,7 @@ import time
 import threading
 from enum import Enum
 import random
+from typing import Any, Dict
 
 
 RPM_BASE = 200
@@ -53,6 +56,20 @@ class Engine:
         else:
             self.throttle = 0
 
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "speed": self.speed,
+            "rpm": self.rpm,
+            "state": self.state.value,
+            "throttle": self.throttle,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.speed = state["speed"]
+        self.rpm = state["rpm"]
+        self.state = EngineState(state["state"])
+        self.throttle = state["throttle"]
+
     def update(self):
         """Called every 100ms to update engine state"""
         # if self.state == EngineState.OFF:
@@ -108,6 +125,9 @@ class Engine:
 class CentralEcu(Ecu):
     RPM_PHASE = 10
 
+    # Seconds between repetitions of an unchanged status
+    STATUS_HEARTBEAT = 1.0
+
     def __init__(self, bus: can.BusABC, notifier: can.Notifier):
         super().__init__(bus, notifier, "Central ECU")
 
@@ -116,18 +136,21 @@ class CentralEcu(Ecu):
         self._abs_cnt = 0
         self._abs_error = False
         self._airbag_enabled = True
+        self._status_tx = ChangeTriggeredTx(self.send_msg, self.STATUS_HEARTBEAT)
 
-        threading.Thread(target=self._report_loop, daemon=True).start()
+        threading.Thread(
+            target=self._report_loop, name=f"{self.ecu_name} report", daemon=True
+        ).start()
 
     def _start_engine(self):
         if not self._key_inserted:
-            print("[Central ECU] Can't start engine, no key inserted")
+            self.logger.info("Can't start engine, no key inserted")
 
         elif self._engine.state == EngineState.ON:
-            print("[Central ECU] Can't start engine, engine running")
+            self.logger.info("Can't start engine, engine running")
 
         else:
-            print("[Central ECU] Starting engine")
+            self.logger.info("Starting engine")
             self._engine.set_state(EngineState.ON)
             self._abs_error = True
             self._airbag_enabled = False
@@ -137,14 +160,30 @@ class CentralEcu(Ecu):
             self._abs_error = False
             self._abs_count = 0
 
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "engine": self._engine.snapshot(),
+            "key_inserted": self._key_inserted,
+            "abs_cnt": self._abs_cnt,
+            "abs_error": self._abs_error,
+            "airbag_enabled": self._airbag_enabled,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._engine.restore(state["engine"])
+        self._key_inserted = state["key_inserted"]
+        self._abs_cnt = state["abs_cnt"]
+        self._abs_error = state["abs_error"]
+        self._airbag_enabled = state["airbag_enabled"]
+
     def _stop_engine(self):
         if self._engine.state == EngineState.OFF:
-            print("[Central ECU] Can't stop engine, engine not running")
+            self.logger.info("Can't stop engine, engine not running")
 
         else:
             self._engine.set_state(EngineState.OFF)
 
-    def _report_status(self):
+    def _report_status(self, force: bool = False):
         msgs = [
             EngineStatusMessage(self._engine.state == EngineState.ON),
             RpmStatusMessage(self._engine.rpm),
@@ -154,11 +193,12 @@ class CentralEcu(Ecu):
         ]
 
         for msg in msgs:
-            self.send_msg(msg.to_can_msg())
+            self._status_tx.update(msg, force)
 
     def _report_loop(self):
+        timer = PeriodicTimer(0.1, f"{self.ecu_name} report")
         while True:
-            time.sleep(0.1)
+            timer.wait()
             self._abs_cnt += 1
             self._emulate_engine()
             self._report_status()
@@ -189,7 +229,7 @@ class CentralEcu(Ecu):
                 else:
                     self._stop_engine()
 
-                self._report_status()
+                self._report_status(force=True)
 
             elif (msg := CruiseControlMessage.from_can_msg(can_msg)) is not None:
                 self._cruise_control_handle(msg)
@@ -200,4 +240,4 @@ class CentralEcu(Ecu):
             elif AirbagToggleMessage.from_can_msg(can_msg) is not None:
                 self._airbag_enabled = not self._airbag_enabled
 
-                self.send_msg(AirbagStatusMessage(self._airbag_enabled).to_can_msg())
+                self._status_tx.update(AirbagStatusMessage(self._airbag_enabled))
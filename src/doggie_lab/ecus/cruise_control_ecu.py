@@ -1,7 +1,11 @@
 from doggie_lab.ecus.ecu_ui import UiEcu
 from doggie_lab.messages import SpeedStatusMessage, CruiseControlMessage
-import dearpygui.dearpygui as dpg
+from doggie_lab.timing import PeriodicTimer
+from pathlib import Path
+from typing import Any, Dict
 import can
+import json
+import os
 import time
 import threading
 
@@ -71,6 +75,15 @@ class PIDController:
 
         return output
 
+    def snapshot(self) -> Dict[str, Any]:
+        return {"previous_error": self.previous_error, "integral": self.integral}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.previous_error = state["previous_error"]
+        self.integral = state["integral"]
+        # The time spent saved doesn't count as one long control period
+        self.last_time = time.time()
+
     def reset(self):
         """Reset PID controller state"""
         self.previous_error = 0.0
@@ -79,8 +92,29 @@ class PIDController:
 
 
 class CruiseControlEcu(UiEcu):
+    """
+    Holds the target speed with a PID on the throttle.
+
+    The gains are read from the JSON file named by the DOGGIE_LAB_CRUISE_PID
+    environment variable or, without it, from PID_CONFIG (written by
+    tools/pid_tuning.py). Without a config file DEFAULT_GAINS are used.
+    """
+
+    PANEL = "cruise_control"
+    # The target speed isn't on the bus, the cluster's panel gets it over the UI link
+    CLUSTER_PANEL = "Instrument Cluster ECU"
+
     THRESHOLD = 10
 
+    PID_CONFIG_ENV = "DOGGIE_LAB_CRUISE_PID"
+    PID_CONFIG = Path(__file__).resolve().parent.parent / "data" / "cruise_pid.json"
+
+    DEFAULT_GAINS = {
+        "kp": 2.0,  # Proportional gain - how aggressively to respond to current error
+        "ki": 0.5,  # Integral gain - how aggressively to respond to accumulated error
+        "kd": 0.1,  # Derivative gain - how aggressively to respond to rate of change
+    }
+
     def __init__(self, bus: can.BusABC, notifier: can.Notifier):
         super().__init__(bus, notifier, "Cruise Control ECU")
         self._readed_speed = 0
@@ -88,42 +122,53 @@ class CruiseControlEcu(UiEcu):
         self._enabled = True
 
         # PID Controller
-        self.pid_controller = PIDController(
-            kp=2.0,  # Proportional gain - how aggressively to respond to current error
-            ki=0.5,  # Integral gain - how aggressively to respond to accumulated error
-            kd=0.1,  # Derivative gain - how aggressively to respond to rate of change
-        )
+        self.pid_controller = PIDController(**self._load_gains())
 
-        self._init_ui()
+        self.on_ui_command("set_speed", self._set_speed_calback)
+        self.on_ui_command("enable", self._enable_callback)
 
-        threading.Thread(target=self._control_loop, daemon=True).start()
+        threading.Thread(
+            target=self._control_loop, name=f"{self.ecu_name} control", daemon=True
+        ).start()
 
-    def _init_ui(self):
-        dpg.add_slider_int(
-            label="Speed",
-            parent=self._window_tag,
-            callback=self._set_speed_calback,
-            default_value=0,
-            min_value=0,
-            max_value=300,
-        )
-        dpg.add_checkbox(
-            label="Enabled",
-            default_value=True,
-            callback=self._enable_callback,
-            parent=self._window_tag,
-        )
+    def _load_gains(self) -> Dict[str, float]:
+        path = Path(os.environ.get(self.PID_CONFIG_ENV, self.PID_CONFIG))
+        if not path.exists():
+            return dict(self.DEFAULT_GAINS)
+
+        try:
+            config = json.loads(path.read_text())
+            return {name: float(config.get(name, value)) for name, value in self.DEFAULT_GAINS.items()}
 
-    def _set_speed_calback(self, sender, app_data, user_data):
-        self._target_speed = app_data
+        except (ValueError, AttributeError, TypeError) as e:
+            self.logger.warning("Invalid PID config %s, using default gains: %s", path, e)
+            return dict(self.DEFAULT_GAINS)
 
-    def _enable_callback(self, sender, app_data, user_data):
-        if not self._enabled and app_data:
+    def _set_speed_calback(self, speed: int):
+        self._target_speed = speed
+
+    def _enable_callback(self, enabled: bool):
+        if not self._enabled and enabled:
             self.pid_controller.reset()
 
-        self._enabled = app_data
+        self._enabled = enabled
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "readed_speed": self._readed_speed,
+            "target_speed": self._target_speed,
+            "enabled": self._enabled,
+            "pid": self.pid_controller.snapshot(),
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._readed_speed = state["readed_speed"]
+        self._target_speed = state["target_speed"]
+        self._enabled = state["enabled"]
+        self.pid_controller.restore(state["pid"])
 
     def _control(self) -> None:
+        self._ui_link.update(self.CLUSTER_PANEL, "update_cruise_target", self._target_speed)
         self.send_msg(
             CruiseControlMessage(
                 self._enabled,
@@ -132,8 +177,9 @@ class CruiseControlEcu(UiEcu):
         )
 
     def _control_loop(self) -> None:
+        timer = PeriodicTimer(0.2, f"{self.ecu_name} control")
         while True:
-            time.sleep(0.2)
+            timer.wait()
 
             self._control()
 
@@ -1,4 +1,6 @@
 from doggie_lab.ecus.ecu_ui import Ecu
+from doggie_lab.ecus.tx_policy import ChangeTriggeredTx
+from doggie_lab.timing import PeriodicTimer
 from doggie_lab.messages import (
     DoorsStatusMessage,
     DoorsControlMessage,
@@ -6,23 +8,28 @@ from doggie_lab.messages import (
 )
 import can
 from doggie_lab.common.doors import DoorsStatus
-import time
+from dataclasses import asdict
+from typing import Any, Dict
 import threading
 
 
 class DoorsEcu(Ecu):
-    MAX_SPEED = 20
+    # Seconds between repetitions of an unchanged status
+    STATUS_HEARTBEAT = 1.0
 
     def __init__(self, bus: can.BusABC, notifier: can.Notifier):
         super().__init__(bus, notifier, "Doors ECU")
 
         self._doors = DoorsStatus(True, True, True, True)
         self._speed = 0
+        self._status_tx = ChangeTriggeredTx(self.send_msg, self.STATUS_HEARTBEAT)
 
-        threading.Thread(target=self._report_loop, daemon=True).start()
+        threading.Thread(
+            target=self._report_loop, name=f"{self.ecu_name} report", daemon=True
+        ).start()
 
     def _set_doors(self, msg: DoorsControlMessage) -> None:
-        if self._speed < self.MAX_SPEED or msg.lock:
+        if self._speed < DoorsControlMessage.MAX_UNLOCK_SPEED or msg.lock:
             if msg.fl:
                 self._doors.fl = msg.lock
 
@@ -35,12 +42,21 @@ class DoorsEcu(Ecu):
             if msg.rr:
                 self._doors.rr = msg.lock
 
-        self.send_msg(DoorsStatusMessage.from_status(self._doors).to_can_msg())
+        # Answer every request, even if it left the doors as they were
+        self._status_tx.update(DoorsStatusMessage.from_status(self._doors), force=True)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"doors": asdict(self._doors), "speed": self._speed}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._doors = DoorsStatus(**state["doors"])
+        self._speed = state["speed"]
 
     def _report_loop(self):
+        timer = PeriodicTimer(0.1, f"{self.ecu_name} report")
         while True:
-            time.sleep(0.1)
-            self.send_msg(DoorsStatusMessage.from_status(self._doors).to_can_msg())
+            timer.wait()
+            self._status_tx.update(DoorsStatusMessage.from_status(self._doors))
 
     def loop(self) -> None:
         while True:
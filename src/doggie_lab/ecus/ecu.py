@@ -1,6 +1,8 @@
+from doggie_lab import log
 from can import BusABC, Message, Notifier
 import queue
 from abc import ABC, abstractmethod
+from typing import Any, Dict
 import threading
 import time
 
@@ -13,6 +15,8 @@ class Ecu(ABC):
     ):
         ABC.__init__(self)
         self.ecu_name = ecu_name
+        # Records tagged with the ECU name, written off the ECU threads
+        self.logger = log.ecu_logger(ecu_name)
         self.bus = bus
         self.msg_queue = queue.Queue()
         self.notifier = notifier
@@ -21,18 +25,20 @@ class Ecu(ABC):
 
     def start(self):
         """Start the ECU thread."""
-        print(f"Starting {self.ecu_name}...")
+        self.logger.info("Starting %s...", self.ecu_name)
         if self.thread is not None and self.thread.is_alive():
             return
 
         self.running = True
         self.notifier.add_listener(self.on_message_received)
-        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread = threading.Thread(
+            target=self._run, name=self.ecu_name, daemon=True
+        )
         self.thread.start()
 
     def stop(self):
         """Stop the ECU thread."""
-        print(f"Stopping {self.ecu_name}...")
+        self.logger.info("Stopping %s...", self.ecu_name)
         self.running = False
         self.notifier.remove_listener(self.on_message_received)
         if self.thread is not None:
@@ -55,7 +61,15 @@ class Ecu(ABC):
         try:
             self.msg_queue.put(msg)
         except Exception as e:
-            print(f"Error passing message to {self.ecu_name}: {e}")
+            self.logger.error("Error passing message to %s: %s", self.ecu_name, e)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Simulation state of the ECU, made of msgpack serializable values."""
+        return {}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore a state returned by `get_state`."""
+        pass
 
     def _run(self):
         """Main loop for the response sender thread."""
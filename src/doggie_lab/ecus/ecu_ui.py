@@ -1,8 +1,18 @@
 from doggie_lab.ecus.ecu import Ecu
+from doggie_lab.gui.link import UiLink
 from can import BusABC, Notifier
-import dearpygui.dearpygui as dpg
+from typing import Any, Callable
+
 
 class UiEcu(Ecu):
+    """
+    ECU with a panel in the GUI process.
+
+    PANEL names the panel class the GUI builds for it (see gui.panels.PANELS).
+    """
+
+    PANEL = ""
+
     def __init__(
                  self,
                  bus: BusABC,
@@ -11,6 +21,9 @@ class UiEcu(Ecu):
         ):
         super().__init__(bus, notifier, ecu_name)
 
-        self._window_tag = dpg.generate_uuid()
+        self._ui_link = UiLink.get()
+        self.ui = self._ui_link.create_panel(self.ecu_name, self.PANEL)
 
-        dpg.add_window(label=self.ecu_name, tag=self._window_tag)
+    def on_ui_command(self, command: str, callback: Callable[..., Any]) -> None:
+        """Call `callback` when the panel reports `command`."""
+        self._ui_link.add_command_handler(self.ecu_name, command, callback)
@@ -0,0 +1,121 @@
+from doggie_lab.car.topology import Route
+from doggie_lab.ecus.ecu import Ecu
+from can import BusABC, Message, Notifier
+from typing import Callable, Dict, Iterable, List, Tuple
+import time
+
+
+class TokenBucket:
+    """Rate limiter allowing `rate` events per second with bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+
+class RouteStats:
+    def __init__(self, route: Route) -> None:
+        self.route = route
+        self.forwarded = 0
+        self.dropped = 0
+
+
+class GatewayEcu(Ecu):
+    """
+    Forwards frames between CAN segments.
+
+    The routing table is built once: every segment gets a dict from
+    arbitration ID to its destinations, so forwarding a frame is a lookup
+    and a token bucket check. Frames without a route stay in their segment,
+    frames over a route's rate limit are dropped.
+
+    Args:
+        segments: Segment name -> (bus used to send into it, notifier of its traffic)
+        routes: Forwarding rules
+        external: Segment the gateway is attached to as an ECU
+    """
+
+    def __init__(
+        self,
+        segments: Dict[str, Tuple[BusABC, Notifier]],
+        routes: Iterable[Route],
+        external: str,
+    ):
+        super().__init__(*segments[external], "Gateway ECU")
+
+        self._segments = segments
+        self.stats: List[RouteStats] = []
+        self._tables: Dict[str, Dict[int, List[Tuple[BusABC, TokenBucket, RouteStats]]]] = {
+            name: {} for name in segments
+        }
+
+        for route in routes:
+            stats = RouteStats(route)
+            self.stats.append(stats)
+            self._tables[route.source].setdefault(route.arbitration_id, []).append(
+                (segments[route.destination][0], TokenBucket(route.rate, route.burst), stats)
+            )
+
+        self._listeners = {name: self._forwarder(self._tables[name]) for name in segments}
+
+    def _forwarder(
+        self, table: Dict[int, List[Tuple[BusABC, TokenBucket, RouteStats]]]
+    ) -> Callable[[Message], None]:
+        logger = self.logger
+
+        def forward(msg: Message) -> None:
+            if msg.is_error_frame:
+                return
+
+            for bus, bucket, stats in table.get(msg.arbitration_id, ()):
+                if not bucket.take():
+                    stats.dropped += 1
+                    continue
+
+                try:
+                    bus.send(msg)
+                    stats.forwarded += 1
+                except Exception as e:
+                    logger.error("Error forwarding %s: %s", msg, e)
+
+        return forward
+
+    def start(self):
+        self.logger.info("Starting %s...", self.ecu_name)
+        self.running = True
+        for name, (_, notifier) in self._segments.items():
+            notifier.add_listener(self._listeners[name])
+
+    def stop(self):
+        self.logger.info("Stopping %s...", self.ecu_name)
+        self.running = False
+        for name, (_, notifier) in self._segments.items():
+            notifier.remove_listener(self._listeners[name])
+
+    def loop(self):
+        # Forwarding happens in the notifiers' threads
+        pass
+
+    def format_report(self) -> str:
+        lines = ["Gateway routes:"]
+        for stats in self.stats:
+            route = stats.route
+            lines.append(
+                f"  0x{route.arbitration_id:03X} {route.source:>10} -> {route.destination:<10}"
+                f" {stats.forwarded:>8} forwarded {stats.dropped:>6} rate limited"
+            )
+
+        return "\n".join(lines)
@@ -1,31 +1,32 @@
 from doggie_lab.ecus.ecu_ui import UiEcu
 from doggie_lab.messages.immo_message import KeyMessage
-import dearpygui.dearpygui as dpg
+from doggie_lab.timing import PeriodicTimer
+from typing import Any, Dict
 import can
-import time
 
 
 class ImmoEcu(UiEcu):
+    PANEL = "immo"
+
     KEY_INSERTED = 0x1
     KEY_NOT_INSERTED = 0x0
 
     def __init__(self, bus: can.BusABC, notifier: can.Notifier):
         super().__init__(bus, notifier, "Immo ECU")
         self.key_inserted = True
-        self._init_ui()
+        self._timer = PeriodicTimer(0.001, self.ecu_name)
+        self.on_ui_command("insert_key", self._insert_key)
+
+    def _insert_key(self, key_inserted: bool):
+        self.key_inserted = key_inserted
 
-    def _init_ui(self):
-        dpg.add_checkbox(
-            label="Key inserted",
-            default_value=True,
-            callback=self._insert_key,
-            parent=self._window_tag,
-        )
+    def get_state(self) -> Dict[str, Any]:
+        return {"key_inserted": self.key_inserted}
 
-    def _insert_key(self, sender, app_data, user_data):
-        self.key_inserted = app_data
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.key_inserted = state["key_inserted"]
 
     def loop(self):
         while True:
-            time.sleep(.001)
-            self.send_msg(KeyMessage(self.key_inserted).to_can_msg())
+            self._timer.wait()
+            self.send_msg(KeyMessage.cached_can_msg(self.key_inserted))
@@ -1,6 +1,5 @@
 from doggie_lab.ecus.ecu_ui import UiEcu
-from doggie_lab.gui.instrument_cluster import InstrumentCluster
-from doggie_lab.gui.digital_display import ButtonState, StartButton
+from doggie_lab.common.button import ButtonState
 from doggie_lab.messages import (
     SpeedStatusMessage,
     RpmStatusMessage,
@@ -29,36 +28,37 @@ class InstrumentsClusterEcu(UiEcu):
         TX: 0x7E9
     """
 
+    PANEL = "instrument_cluster"
+
     def __init__(self, bus: can.BusABC, notifier: can.Notifier):
         super().__init__(bus, notifier, "Instrument Cluster ECU")
 
-        self._window_thread = None
-        self._instruments = InstrumentCluster(
-            self._window_tag,
-            self._start_button_callback,
-            self._lock_doors_callback,
-            self._unlock_doors_callback,
-            self._toggle_airbag_callback,
-        )
+        # Updates are applied by the InstrumentCluster in the GUI process
+        self._instruments = self.ui
 
-        self._instruments.update_all()
+        self.on_ui_command("start_button", self._start_button_callback)
+        self.on_ui_command("lock_doors", self._lock_doors_callback)
+        self.on_ui_command("unlock_doors", self._unlock_doors_callback)
+        self.on_ui_command("toggle_airbag", self._toggle_airbag_callback)
 
     def _toggle_airbag_callback(self) -> None:
-        self.send_msg(AirbagToggleMessage().to_can_msg())
+        self.send_msg(AirbagToggleMessage.cached_can_msg())
 
     def _lock_doors_callback(self) -> None:
-        self.send_msg(DoorsControlMessage(True, True, True, True, True).to_can_msg())
+        self.send_msg(DoorsControlMessage.cached_can_msg(True, True, True, True, True))
 
     def _unlock_doors_callback(self) -> None:
-        self.send_msg(DoorsControlMessage(False, True, True, True, True).to_can_msg())
+        self.send_msg(DoorsControlMessage.cached_can_msg(False, True, True, True, True))
+
+    def _start_button_callback(self, state: str) -> None:
+        state = ButtonState(state)
 
-    def _start_button_callback(self, button: StartButton, state: ButtonState) -> None:
         if state == ButtonState.ON:
-            self.send_msg(EngineControlMessage(False).to_can_msg())
+            self.send_msg(EngineControlMessage.cached_can_msg(False))
 
         elif state == ButtonState.OFF:
             self._instruments.set_button_state(ButtonState.IGNITION)
-            self.send_msg(EngineControlMessage(True).to_can_msg())
+            self.send_msg(EngineControlMessage.cached_can_msg(True))
 
         elif state == ButtonState.IGNITION:
             # self._intruments.set_button_state(ButtonState.OFF)
@@ -90,7 +90,7 @@ class InstrumentsClusterEcu(UiEcu):
                 self._instruments.update_airbag_warning(msg.enabled)
 
             elif (msg := CruiseControlMessage.from_can_msg(can_msg)) is not None:
-                self._instruments.update_cruise_control(msg.enable, None)
+                self._instruments.update_cruise_control(msg.enable)
                 self._instruments.update_throttle(
                     msg.throttle / 100 if msg.enable else 0.0
                 )
@@ -1,16 +1,32 @@
 import isotp
 from can import BusABC, Notifier
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
 
 
 class IsotpNode(ABC):
-    def __init__(self, bus: BusABC, notifier: Notifier):
+    """
+    ISO-TP endpoint of an ECU.
+
+    Flow control and framing come from DEFAULT_PARAMS, overridden by the
+    node's ISOTP_PARAMS and then by the `params` given to the constructor
+    (see isotp.TransportLayer.Params: blocksize, stmin, tx_data_length,
+    can_fd, max_frame_size...).
+    """
+
+    DEFAULT_PARAMS: Dict[str, Any] = {"tx_padding": 0x00}
+
+    ISOTP_PARAMS: Dict[str, Any] = {}
+
+    def __init__(
+        self, bus: BusABC, notifier: Notifier, params: Optional[Dict[str, Any]] = None
+    ):
         super().__init__()
         self.isotp_layer = isotp.NotifierBasedCanStack(
             bus,
             notifier,
             address=self.get_address(),
-            params={"tx_padding": 0x00}
+            params={**self.DEFAULT_PARAMS, **self.ISOTP_PARAMS, **(params or {})}
         )
 
     def start(self):
@@ -0,0 +1,214 @@
+from doggie_lab.ecus.ecu import Ecu
+from doggie_lab.ecus.isotp_node import IsotpNode
+from can import BusABC, Message, Notifier
+from typing import Any, Dict, Optional, Tuple
+import isotp
+import mmap
+import os
+import random
+
+
+# Negative response codes
+NRC_SERVICE_NOT_SUPPORTED = 0x11
+NRC_INCORRECT_LENGTH = 0x13
+NRC_REQUEST_SEQUENCE_ERROR = 0x24
+NRC_REQUEST_OUT_OF_RANGE = 0x31
+NRC_WRONG_BLOCK_SEQUENCE_COUNTER = 0x73
+
+READ_MEMORY_BY_ADDRESS = 0x23
+REQUEST_UPLOAD = 0x35
+TRANSFER_DATA = 0x36
+REQUEST_TRANSFER_EXIT = 0x37
+
+
+def parse_address_and_length(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Decode an addressAndLengthFormatIdentifier followed by address and size.
+
+    Returns:
+        (address, size), None if malformed
+    """
+    if len(data) < 1:
+        return None
+
+    size_len = data[0] >> 4
+    addr_len = data[0] & 0x0F
+    if size_len == 0 or addr_len == 0 or len(data) != 1 + addr_len + size_len:
+        return None
+
+    address = int.from_bytes(data[1:1 + addr_len], "big")
+    size = int.from_bytes(data[1 + addr_len:], "big")
+    return address, size
+
+
+class MemoryEcu(Ecu, IsotpNode):
+    """
+    Serves a memory image over UDS, for firmware dump exercises.
+
+    The image is the file named by the DOGGIE_LAB_MEMORY_IMAGE environment
+    variable (memory mapped, read only) or, without it, a synthesized firmware
+    of IMAGE_SIZE bytes. It's mapped at IMAGE_BASE and read through
+    ReadMemoryByAddress or RequestUpload/TransferData/RequestTransferExit.
+    Responses are sent straight from memoryview slices of the image.
+
+    Responses are at most MAX_RESPONSE bytes, the largest ISO-TP frame with a
+    12 bit length (and the default max_frame_size of can-isotp). `max_response`
+    allows bigger ones, for clients accepting longer frames.
+    """
+
+    IMAGE_ENV = "DOGGIE_LAB_MEMORY_IMAGE"
+    IMAGE_BASE = 0x08000000
+    IMAGE_SIZE = 512 * 1024
+
+    MAX_RESPONSE = 4095
+
+    ISOTP_PARAMS: Dict[str, Any] = {"blocksize": 0, "stmin": 0}
+
+    flag = b"flag{dump1ng_th3_wh0l3_f1rmwar3}"
+
+    def __init__(
+        self,
+        bus: BusABC,
+        notifier: Notifier,
+        image_path: Optional[str] = None,
+        isotp_params: Optional[Dict[str, Any]] = None,
+        max_response: int = MAX_RESPONSE,
+    ):
+        Ecu.__init__(self, bus, notifier, "Memory ECU")
+        IsotpNode.__init__(self, bus, notifier, isotp_params)
+
+        self.image = self._load_image(image_path or os.environ.get(self.IMAGE_ENV))
+        # Largest ReadMemoryByAddress read: the response adds the SID
+        self.max_read_size = max_response - 1
+        # maxNumberOfBlockLength of uploads (SID + block sequence counter + data), in 2 bytes
+        self.max_block_length = min(0xFFFF, max_response)
+        # (next offset, end offset, expected block sequence counter)
+        self._upload: Optional[Tuple[int, int, int]] = None
+        self._last_block: Optional[Tuple[int, int, int]] = None
+
+    def _load_image(self, path: Optional[str]) -> memoryview:
+        if path is not None:
+            with open(path, "rb") as f:
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+        image = bytearray(random.Random(self.IMAGE_BASE).randbytes(self.IMAGE_SIZE))
+        header = b"DOGGIE FW v1.0\x00"
+        image[:len(header)] = header
+        flag_offset = self.IMAGE_SIZE * 3 // 4
+        image[flag_offset:flag_offset + len(self.flag)] = self.flag
+
+        return memoryview(image)
+
+    def get_address(self) -> isotp.Address:
+        return isotp.Address(isotp.AddressingMode.Normal_11bits, txid=0x7EA, rxid=0x7E2)
+
+    def _send_response(self, header: bytes, data: memoryview = memoryview(b"")) -> None:
+        # A single copy of the image slice, the transport layer slices bytes natively
+        self.isotp_layer.send(bytes(header) + data)
+
+    def _send_negative(self, service: int, nrc: int) -> None:
+        self._send_response(bytes([0x7F, service, nrc]))
+
+    def _image_range(self, address: int, size: int) -> Optional[Tuple[int, int]]:
+        start = address - self.IMAGE_BASE
+        if size == 0 or start < 0 or start + size > len(self.image):
+            return None
+
+        return start, start + size
+
+    def _read_memory_by_address(self, msg: bytes) -> None:
+        request = parse_address_and_length(msg[1:])
+        if request is None:
+            return self._send_negative(READ_MEMORY_BY_ADDRESS, NRC_INCORRECT_LENGTH)
+
+        span = self._image_range(*request)
+        if span is None or request[1] > self.max_read_size:
+            return self._send_negative(READ_MEMORY_BY_ADDRESS, NRC_REQUEST_OUT_OF_RANGE)
+
+        self._send_response(bytes([READ_MEMORY_BY_ADDRESS + 0x40]), self.image[span[0]:span[1]])
+
+    def _request_upload(self, msg: bytes) -> None:
+        # dataFormatIdentifier: no compression nor encryption supported
+        if len(msg) < 2 or msg[1] != 0x00:
+            return self._send_negative(REQUEST_UPLOAD, NRC_REQUEST_OUT_OF_RANGE)
+
+        request = parse_address_and_length(msg[2:])
+        if request is None:
+            return self._send_negative(REQUEST_UPLOAD, NRC_INCORRECT_LENGTH)
+
+        span = self._image_range(*request)
+        if span is None:
+            return self._send_negative(REQUEST_UPLOAD, NRC_REQUEST_OUT_OF_RANGE)
+
+        self._upload = (span[0], span[1], 1)
+        self._last_block = None
+
+        # lengthFormatIdentifier: maxNumberOfBlockLength in 2 bytes
+        self._send_response(
+            bytes([REQUEST_UPLOAD + 0x40, 0x20]) + self.max_block_length.to_bytes(2, "big")
+        )
+
+    def _transfer_data(self, msg: bytes) -> None:
+        if self._upload is None:
+            return self._send_negative(TRANSFER_DATA, NRC_REQUEST_SEQUENCE_ERROR)
+        if len(msg) != 2:
+            return self._send_negative(TRANSFER_DATA, NRC_INCORRECT_LENGTH)
+
+        offset, end, counter = self._upload
+        block = self._last_block
+
+        # Repeated request, the response was lost: send the same block again
+        if block is not None and msg[1] == block[0]:
+            _, start, stop = block
+
+        elif msg[1] == counter:
+            if offset >= end:
+                return self._send_negative(TRANSFER_DATA, NRC_REQUEST_SEQUENCE_ERROR)
+
+            start, stop = offset, min(end, offset + self.max_block_length - 2)
+            self._last_block = (counter, start, stop)
+            self._upload = (stop, end, (counter + 1) & 0xFF)
+
+        else:
+            return self._send_negative(TRANSFER_DATA, NRC_WRONG_BLOCK_SEQUENCE_COUNTER)
+
+        self._send_response(bytes([TRANSFER_DATA + 0x40, msg[1]]), self.image[start:stop])
+
+    def _request_transfer_exit(self, msg: bytes) -> None:
+        if self._upload is None:
+            return self._send_negative(REQUEST_TRANSFER_EXIT, NRC_REQUEST_SEQUENCE_ERROR)
+
+        self._upload = None
+        self._last_block = None
+        self._send_response(bytes([REQUEST_TRANSFER_EXIT + 0x40]))
+
+    def on_message_received(self, msg: Message):
+        # Requests arrive through the ISO-TP layer, don't queue every bus frame
+        pass
+
+    def loop(self):
+        services = {
+            READ_MEMORY_BY_ADDRESS: self._read_memory_by_address,
+            REQUEST_UPLOAD: self._request_upload,
+            TRANSFER_DATA: self._transfer_data,
+            REQUEST_TRANSFER_EXIT: self._request_transfer_exit,
+        }
+
+        while True:
+            msg = self.get_isotp_msg()
+            if not msg:
+                continue
+
+            service = services.get(msg[0])
+            if service is None:
+                self._send_negative(msg[0], NRC_SERVICE_NOT_SUPPORTED)
+            else:
+                service(bytes(msg))
+
+    def start(self) -> None:
+        Ecu.start(self)
+        IsotpNode.start(self)
+
+    def stop(self) -> None:
+        Ecu.stop(self)
+        IsotpNode.stop(self)
@@ -0,0 +1,58 @@
+from doggie_lab.messages import EcuMessage, message_key
+from can import Message
+from typing import Callable, Dict, Optional, Tuple
+import threading
+import time
+
+
+class ChangeTriggeredTx:
+    """
+    Transmission policy for status broadcasts.
+
+    A status message is sent as soon as its value changes; an unchanged value
+    is only repeated every `heartbeat` seconds so late listeners still catch
+    up. Frames come from the message's frame cache (see
+    EcuMessage.to_cached_can_msg), repeating a status doesn't encode it again.
+
+    Args:
+        send: Sends a CAN frame (usually Ecu.send_msg)
+        heartbeat: Seconds between repetitions of an unchanged status
+    """
+
+    def __init__(self, send: Callable[[Message], None], heartbeat: float) -> None:
+        self._send = send
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        # message key -> (value, last sent)
+        self._last: Dict[Tuple[int, Optional[int]], Tuple[tuple, float]] = {}
+
+    @staticmethod
+    def _value(msg: EcuMessage) -> tuple:
+        return tuple(getattr(msg, signal.name) for signal in msg.SIGNALS)
+
+    def update(self, msg: EcuMessage, force: bool = False) -> bool:
+        """
+        Send `msg` if its value changed or its heartbeat is due.
+
+        Args:
+            msg: Current status
+            force: Send even if nothing changed (e.g., answering a request)
+
+        Returns:
+            Whether the message was sent
+        """
+        value = self._value(msg)
+        now = time.monotonic()
+
+        with self._lock:
+            frame = msg.to_cached_can_msg()
+            key = message_key(frame)
+            last = self._last.get(key)
+
+            if not force and last is not None and last[0] == value and now - last[1] < self.heartbeat:
+                return False
+
+            self._last[key] = (value, now)
+
+        self._send(frame)
+        return True
@@ -0,0 +1,65 @@
+from doggie_lab.gui.link import CREATE_PANEL, UPDATE, COMMAND, pack, unpack
+from doggie_lab.gui.panels import PANELS, Panel
+from doggie_lab.gui.window import Window
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict
+import dearpygui.dearpygui as dpg
+import signal
+import threading
+
+
+class GuiApp:
+    """GUI process: builds the ECU panels and applies the updates sent by the simulation."""
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+        self._send_lock = threading.Lock()
+        self._panels: Dict[str, Panel] = {}
+        self._window = Window()
+
+    def _sender(self, ecu_name: str) -> Callable[..., None]:
+        def send(command: str, *args: Any) -> None:
+            try:
+                with self._send_lock:
+                    self._conn.send_bytes(pack([[COMMAND, ecu_name, command, list(args)]]))
+            except OSError:
+                # Simulation gone, the frame loop will notice and close the window
+                pass
+
+        return send
+
+    def _apply(self, kind: int, ecu_name: str, name: str, args: list) -> None:
+        if kind == CREATE_PANEL:
+            if ecu_name not in self._panels:
+                self._panels[ecu_name] = PANELS[name](ecu_name, self._sender(ecu_name))
+
+        elif kind == UPDATE and not name.startswith("_"):
+            panel = self._panels.get(ecu_name)
+            if panel is not None:
+                getattr(panel, name)(*args)
+
+    def _poll(self) -> None:
+        """Apply everything received since the last frame, then refresh the panels."""
+        try:
+            while self._conn.poll():
+                for kind, ecu_name, name, args in unpack(self._conn.recv_bytes()):
+                    self._apply(kind, ecu_name, name, args)
+
+        except (EOFError, OSError):
+            dpg.stop_dearpygui()
+            return
+
+        for panel in self._panels.values():
+            panel.refresh()
+
+    def run(self) -> None:
+        self._window.run(self._poll)
+        self._window.clean()
+
+
+def run_gui(conn: Connection) -> None:
+    """Entry point of the GUI process."""
+    # Ctrl+C is handled by the simulation process, which terminates this one
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    GuiApp(conn).run()
@@ -1,5 +1,5 @@
+from doggie_lab.common.button import ButtonState
 import dearpygui.dearpygui as dpg
-from enum import Enum
 
 
 class DigitalDisplay:
@@ -60,12 +60,12 @@ class DigitalDisplay:
         self.units = units
         self.justify = justify
 
-        # Track elements for updates
-        self.display_id = f"digital_{center_x}_{center_y}"
-        self.background_tag = f"{self.display_id}_bg"
-        self.border_tag = f"{self.display_id}_border"
-        self.text_tag = f"{self.display_id}_text"
-        self.label_tag = f"{self.display_id}_label"
+        # Track elements for updates, unique per display so several
+        # clusters can be shown
+        self.background_tag = dpg.generate_uuid()
+        self.border_tag = dpg.generate_uuid()
+        self.text_tag = dpg.generate_uuid()
+        self.label_tag = dpg.generate_uuid()
         self.static_drawn = False
 
     def draw_static_elements(self):
@@ -115,10 +115,6 @@ class DigitalDisplay:
         # Ensure static elements are drawn
         self.draw_static_elements()
 
-        # Delete existing text
-        if dpg.does_item_exist(self.text_tag):
-            dpg.delete_item(self.text_tag)
-
         # Format the value
         if isinstance(value, (int, float)):
             display_text = self.text_format.format(value)
@@ -139,15 +135,20 @@ class DigitalDisplay:
 
         text_y = self.y + (self.height - self.font_size) // 2
 
-        # Draw the text
-        dpg.draw_text(
-            (text_x, text_y),
-            display_text,
-            size=self.font_size,
-            color=self.text_color,
-            parent=self.parent_tag,
-            tag=self.text_tag,
-        )
+        # Created once, then only changed
+        if not dpg.does_item_exist(self.text_tag):
+            dpg.draw_text(
+                (text_x, text_y),
+                display_text,
+                size=self.font_size,
+                color=self.text_color,
+                parent=self.parent_tag,
+                tag=self.text_tag,
+            )
+        else:
+            dpg.configure_item(
+                self.text_tag, text=display_text, pos=(text_x, text_y), color=self.text_color
+            )
 
     def draw(self, value):
         """Draw the complete display"""
@@ -297,7 +298,7 @@ class DoorStatusDisplay(DigitalDisplay):
         self.closed_color = (0, 255, 0, 255)  # Green for closed
 
         # Individual door text tags
-        self.door_text_tags = [f"{self.display_id}_door_{i}" for i in range(4)]
+        self.door_text_tags = [dpg.generate_uuid() for _ in range(4)]
 
     def update_door_status(self, door_states):
         """Update door status display
@@ -308,11 +309,6 @@ class DoorStatusDisplay(DigitalDisplay):
         # Ensure static elements are drawn
         self.draw_static_elements()
 
-        # Delete existing door text elements
-        for tag in self.door_text_tags:
-            if dpg.does_item_exist(tag):
-                dpg.delete_item(tag)
-
         # Draw each door status
         start_x = self.x + 10
         start_y = self.y + 15
@@ -332,14 +328,17 @@ class DoorStatusDisplay(DigitalDisplay):
             status = "CLOSED" if door_closed else "OPEN"
             text = f"{label}: {status}"
 
-            dpg.draw_text(
-                pos,
-                text,
-                size=self.font_size,
-                color=color,
-                parent=self.parent_tag,
-                tag=self.door_text_tags[i],
-            )
+            if not dpg.does_item_exist(self.door_text_tags[i]):
+                dpg.draw_text(
+                    pos,
+                    text,
+                    size=self.font_size,
+                    color=color,
+                    parent=self.parent_tag,
+                    tag=self.door_text_tags[i],
+                )
+            else:
+                dpg.configure_item(self.door_text_tags[i], text=text, color=color)
 
 
 class ThrottleProgressBar:
@@ -402,12 +401,6 @@ class ThrottleProgressBar:
         )
 
 
-class ButtonState(Enum):
-    OFF = "OFF"
-    IGNITION = "IGNITION"
-    ON = "ON"
-
-
 class StartButton:
     def __init__(self, parent=None, tag=None, pos=(0, 0), size=(120, 120)):
         self.state = ButtonState.OFF
@@ -1,7 +1,55 @@
 import math
 import dearpygui.dearpygui as dpg
+import numpy as np
+
+
+# Arc segments of a gauge face
+ARC_SEGMENTS = 60
+# Radial length of the arc segments
+ARC_WIDTH = 4
+
+
+def render_arc(radius, min_angle, max_angle, color, thickness):
+    """
+    Rasterize the segmented background arc of a gauge, anti-aliased.
+
+    Returns:
+        (size, flat RGBA float32 pixels) of a square texture centered on the gauge
+    """
+    # Room for the outer radius and the line caps
+    half = int(math.ceil(radius + ARC_WIDTH + thickness)) + 1
+    size = 2 * half
+    coords = np.arange(size, dtype=np.float32) - half + 0.5
+    x, y = np.meshgrid(coords, coords)
+    distance = np.hypot(x, y)
+    angle = np.degrees(np.arctan2(y, x))
+
+    # Nearest segment, then the pixel's distance to its line
+    step = (max_angle - min_angle) / ARC_SEGMENTS
+    # Signed angle from min_angle, wrapped around the middle of the arc so the
+    # pixels just before the first segment don't wrap to the far end
+    middle = (max_angle - min_angle) / 2
+    relative = (angle - min_angle - middle + 180) % 360 - 180 + middle
+    index = np.clip(np.rint(relative / step), 0, ARC_SEGMENTS)
+    offset = np.radians(relative - index * step)
+    across = np.abs(distance * np.sin(offset))
+    along = distance * np.cos(offset)
+
+    coverage = np.clip(thickness / 2 + 0.5 - across, 0, 1)
+    coverage *= np.clip(along - radius + 0.5, 0, 1) * np.clip(radius + ARC_WIDTH + 0.5 - along, 0, 1)
+
+    pixels = np.empty((size, size, 4), dtype=np.float32)
+    pixels[..., :3] = np.array(color[:3], dtype=np.float32) / 255
+    pixels[..., 3] = coverage * color[3] / 255
+
+    return size, pixels.ravel()
+
 
 class Gauge:
+    # Arc textures, shared by the gauges with the same face
+    _faces = {}
+    _texture_registry = None
+
     def __init__(self, parent_tag, center_x, center_y, radius, min_angle=-135, max_angle=135,
                  min_value=0, max_value=240, units="", label="", tick_interval=None,
                  needle_color=(255, 0, 0, 255), background_color=(150, 150, 150, 255),
@@ -47,12 +95,12 @@ class Gauge:
         self.needle_length_ratio = needle_length_ratio
         self.decimal_places = decimal_places
 
-        # Track dynamic elements for efficient updates
-        self.gauge_id = f"gauge_{center_x}_{center_y}"
-        self.needle_tag = f"{self.gauge_id}_needle"
-        self.center_dot_tag = f"{self.gauge_id}_center"
-        self.value_text_tag = f"{self.gauge_id}_value"
-        self.label_text_tag = f"{self.gauge_id}_label"
+        # Track dynamic elements for efficient updates, unique per gauge so
+        # several clusters can be shown
+        self.needle_tag = dpg.generate_uuid()
+        self.center_dot_tag = dpg.generate_uuid()
+        self.value_text_tag = dpg.generate_uuid()
+        self.label_text_tag = dpg.generate_uuid()
         self.static_drawn = False
 
         # Auto-calculate tick interval if not provided
@@ -80,22 +128,31 @@ class Gauge:
         value_ratio = (value - self.min_value) / (self.max_value - self.min_value)
         return self.min_angle + (self.max_angle - self.min_angle) * value_ratio
 
+    def _face_texture(self):
+        key = (self.radius, self.min_angle, self.max_angle, self.background_color, self.background_thickness)
+        face = Gauge._faces.get(key)
+        if face is None:
+            if Gauge._texture_registry is None:
+                Gauge._texture_registry = dpg.add_texture_registry()
+
+            size, pixels = render_arc(
+                self.radius, self.min_angle, self.max_angle, self.background_color, self.background_thickness
+            )
+            texture = dpg.add_static_texture(size, size, pixels, parent=Gauge._texture_registry)
+            face = Gauge._faces[key] = (texture, size)
+
+        return face
+
     def draw_static_elements(self):
         """Draw the static elements of the gauge (background arc and tick labels)"""
         if self.static_drawn:
             return  # Static elements already drawn
 
-        # Draw background arc (using segments to simulate an arc)
-        num_segments = 60
-        for i in range(num_segments + 1):
-            t = i / num_segments
-            segment_angle = math.radians(self.min_angle + t * (self.max_angle - self.min_angle))
-            x1 = self.center_x + self.radius * math.cos(segment_angle)
-            y1 = self.center_y + self.radius * math.sin(segment_angle)
-            x2 = self.center_x + (self.radius + 4) * math.cos(segment_angle)
-            y2 = self.center_y + (self.radius + 4) * math.sin(segment_angle)
-            dpg.draw_line((x1, y1), (x2, y2), color=self.background_color,
-                         thickness=self.background_thickness, parent=self.parent_tag)
+        # Background arc, rendered once into a texture: a single quad per frame
+        texture, size = self._face_texture()
+        half = size // 2
+        dpg.draw_image(texture, (self.center_x - half, self.center_y - half),
+                       (self.center_x + half, self.center_y + half), parent=self.parent_tag)
 
         # Draw tick labels
         tick_value = self.min_value
@@ -118,52 +175,44 @@ class Gauge:
 
             tick_value += self.tick_interval
 
+        # Draw label if provided
+        if self.label:
+            label_x = self.center_x - len(self.label) * 4  # Rough centering
+            label_y = self.center_y + self.radius + 50
+            dpg.draw_text((label_x, label_y), self.label, size=14, color=self.text_color,
+                         parent=self.parent_tag, tag=self.label_text_tag)
+
+        # Needle, center dot and value are created once, updates only move them
+        dpg.draw_line((self.center_x, self.center_y), (self.center_x, self.center_y),
+                     color=self.needle_color, thickness=self.needle_thickness,
+                     parent=self.parent_tag, tag=self.needle_tag)
+        dpg.draw_circle((self.center_x, self.center_y), 5, color=self.needle_color,
+                       fill=self.needle_color, parent=self.parent_tag, tag=self.center_dot_tag)
+        dpg.draw_text((self.center_x, self.center_y + self.radius + 25), "", size=20,
+                     color=self.text_color, parent=self.parent_tag, tag=self.value_text_tag)
+
         self.static_drawn = True
 
     def update_dynamic_elements(self, value):
         """Update only the dynamic elements (needle and value text)"""
-        # Delete existing dynamic elements
-        if dpg.does_item_exist(self.needle_tag):
-            dpg.delete_item(self.needle_tag)
-        if dpg.does_item_exist(self.center_dot_tag):
-            dpg.delete_item(self.center_dot_tag)
-        if dpg.does_item_exist(self.value_text_tag):
-            dpg.delete_item(self.value_text_tag)
-        if dpg.does_item_exist(self.label_text_tag):
-            dpg.delete_item(self.label_text_tag)
-
         # Calculate needle angle
         angle_deg = self.value_to_angle(value)
         angle_rad = math.radians(angle_deg)
 
-        # Draw needle
+        # Move needle
         needle_length = self.radius * self.needle_length_ratio
         needle_x = self.center_x + needle_length * math.cos(angle_rad)
         needle_y = self.center_y + needle_length * math.sin(angle_rad)
-        dpg.draw_line((self.center_x, self.center_y), (needle_x, needle_y),
-                     color=self.needle_color, thickness=self.needle_thickness,
-                     parent=self.parent_tag, tag=self.needle_tag)
+        dpg.configure_item(self.needle_tag, p2=(needle_x, needle_y))
 
-        # Draw center dot
-        dpg.draw_circle((self.center_x, self.center_y), 5, color=self.needle_color,
-                       fill=self.needle_color, parent=self.parent_tag, tag=self.center_dot_tag)
-
-        # Draw value text
+        # Update value text
         value_text = f"{value:.{self.decimal_places}f}"
         if self.units:
             value_text += f" {self.units}"
 
         text_x = self.center_x - len(value_text) * 6  # Rough centering
         text_y = self.center_y + self.radius + 25
-        dpg.draw_text((text_x, text_y), value_text, size=20, color=self.text_color,
-                     parent=self.parent_tag, tag=self.value_text_tag)
-
-        # Draw label if provided
-        if self.label:
-            label_x = self.center_x - len(self.label) * 4  # Rough centering
-            label_y = self.center_y + self.radius + 50
-            dpg.draw_text((label_x, label_y), self.label, size=14, color=self.text_color,
-                         parent=self.parent_tag, tag=self.label_text_tag)
+        dpg.configure_item(self.value_text_tag, text=value_text, pos=(text_x, text_y))
 
     def draw(self, value):
         """
@@ -0,0 +1,130 @@
+import dearpygui.dearpygui as dpg
+import numpy as np
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+
+# Seconds of history shown
+HISTORY_SECONDS = 60
+# Samples kept per series, updates come at most at UiLink.FLUSH_RATE
+CAPACITY = 8192
+# Plot redraws per second
+PLOT_RATE = 20
+
+
+class SeriesBuffer:
+    """Last `capacity` (time, value) samples, in preallocated circular arrays."""
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self._times = np.zeros(capacity)
+        self._values = np.zeros(capacity)
+        self._next = 0
+        self.count = 0
+
+    def append(self, timestamp: float, value: float) -> None:
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._times)
+        self.count = min(self.count + 1, len(self._times))
+
+    def since(self, start: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples from `start` on, oldest first."""
+        if self.count < len(self._times):
+            times, values = self._times[:self.count], self._values[:self.count]
+        else:
+            times = np.concatenate((self._times[self._next:], self._times[:self._next]))
+            values = np.concatenate((self._values[self._next:], self._values[:self._next]))
+
+        first = np.searchsorted(times, start)
+        return times[first:], values[first:]
+
+
+def downsample(
+    times: np.ndarray, values: np.ndarray, start: float, end: float, columns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce samples to the min and max of each of `columns` time slices.
+
+    Spikes survive the reduction (a spoofed speed shows up whatever the
+    zoom), and a plot never draws more than two points per pixel column.
+    """
+    if len(times) <= 2 * columns:
+        return times, values
+
+    edges = np.searchsorted(times, np.linspace(start, end, columns + 1)[:-1])
+    # Slices without samples
+    edges = np.unique(edges[edges < len(times)])
+
+    x = np.repeat(times[edges], 2)
+    y = np.column_stack(
+        (np.minimum.reduceat(values, edges), np.maximum.reduceat(values, edges))
+    ).ravel()
+    return x, y
+
+
+class HistoryPlot:
+    """
+    Scrolling plot of the last HISTORY_SECONDS of some series.
+
+    Samples go into SeriesBuffers as they arrive, the line series of the plot
+    are only updated in `refresh`, at most PLOT_RATE times per second.
+    """
+
+    def __init__(
+        self,
+        parent_tag,
+        label: str,
+        series: Dict[str, str],
+        y_limits: Tuple[float, float],
+        pos: Sequence[int],
+        width: int = 740,
+        height: int = 160,
+    ) -> None:
+        """
+        Args:
+            parent_tag: Dear PyGui parent tag
+            label: Title of the plot
+            series: Label of each series, by name
+            y_limits: Fixed range of the values
+            pos: Position of the plot in its parent
+            width, height: Size of the plot
+        """
+        self.width = width
+        self._last_refresh = 0.0
+        self._last_sample = 0.0
+        self._buffers: Dict[str, SeriesBuffer] = {}
+        self._series: Dict[str, int] = {}
+
+        self._plot = dpg.add_plot(
+            label=label, parent=parent_tag, pos=pos, width=width, height=height, no_menus=True
+        )
+        dpg.add_plot_legend(parent=self._plot, location=dpg.mvPlot_Location_NorthWest)
+        x_axis = dpg.add_plot_axis(dpg.mvXAxis, label="s", parent=self._plot)
+        dpg.set_axis_limits(x_axis, -HISTORY_SECONDS, 0)
+        y_axis = dpg.add_plot_axis(dpg.mvYAxis, parent=self._plot)
+        dpg.set_axis_limits(y_axis, *y_limits)
+
+        for name, series_label in series.items():
+            self._buffers[name] = SeriesBuffer()
+            self._series[name] = dpg.add_line_series([], [], label=series_label, parent=y_axis)
+
+    def add(self, name: str, value: float, timestamp: Optional[float] = None) -> None:
+        self._last_sample = time.monotonic() if timestamp is None else timestamp
+        self._buffers[name].append(self._last_sample, value)
+
+    def refresh(self, now: Optional[float] = None) -> None:
+        """Redraw the series, if due."""
+        now = time.monotonic() if now is None else now
+        if now - self._last_refresh < 1 / PLOT_RATE:
+            return
+        self._last_refresh = now
+
+        if now - self._last_sample > HISTORY_SECONDS + 1 / PLOT_RATE:
+            # Everything scrolled out already
+            return
+
+        columns = int(dpg.get_item_rect_size(self._plot)[0]) or self.width
+        start = now - HISTORY_SECONDS
+        for name, buffer in self._buffers.items():
+            times, values = downsample(*buffer.since(start), start, now, columns)
+            dpg.set_value(self._series[name], [(times - now).tolist(), values.tolist()])
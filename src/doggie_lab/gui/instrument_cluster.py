@@ -1,4 +1,5 @@
 from doggie_lab.gui.gauge import SpeedometerGauge, TachometerGauge
+from doggie_lab.gui.history_plot import HistoryPlot
 from doggie_lab.gui.digital_display import (
     OdometerDisplay,
     CruiseControlDisplay,
@@ -36,6 +37,8 @@ class InstrumentCluster:
         self.parent_tag = parent_tag
         self.lock_doors = lock_doors
         self.unlock_doors = unlock_doors
+        # Sent by the cruise control ECU over the UI link, not on the bus
+        self._cruise_target = None
 
         # Initialize gauges
         self._speedometer = SpeedometerGauge(
@@ -94,8 +97,27 @@ class InstrumentCluster:
 
         dpg.add_separator(parent=parent_tag)
 
+        # Below the controls
+        self._speed_history = HistoryPlot(
+            parent_tag,
+            "Speed",
+            {"speed": "Speed (km/h)", "cruise": "Cruise target (km/h)", "throttle": "Throttle (%)"},
+            (0, 240),
+            pos=[10, 570],
+        )
+        self._rpm_history = HistoryPlot(
+            parent_tag, "Engine", {"rpm": "RPM"}, (0, 8000), pos=[10, 740]
+        )
+
+    def refresh(self) -> None:
+        """Redraw the history plots, if due."""
+        self._speed_history.refresh()
+        self._rpm_history.refresh()
+
     def update_throttle(self, value: float) -> None:
-        self._throttle.update_value(value if self._start_button.get_state() == ButtonState.ON else 0) 
+        value = value if self._start_button.get_state() == ButtonState.ON else 0
+        self._throttle.update_value(value)
+        self._speed_history.add("throttle", max(0.0, min(1.0, value)) * 100)
 
     def set_button_state(self, state) -> None:
         self._start_button.set_state(state)
@@ -103,18 +125,28 @@ class InstrumentCluster:
     def update_speed(self, speed):
         """Update speedometer value"""
         self._speedometer.update_value(speed)
+        self._speed_history.add("speed", speed)
 
     def update_rpm(self, rpm):
         """Update tachometer value"""
         self._tachometer.update_value(rpm)
+        self._rpm_history.add("rpm", rpm)
 
     def update_gear(self, gear):
         """Update gear display"""
         self._gear_display.update_display(gear)
 
+    def update_cruise_target(self, speed):
+        """Update cruise control target speed"""
+        self._cruise_target = speed or None
+
     def update_cruise_control(self, active, speed=None):
-        """Update cruise control status"""
+        """Update cruise control status, showing the last target if `speed` isn't given"""
+        if speed is None:
+            speed = self._cruise_target
         self._cruise_control.update_cruise_status(active, speed)
+        # No target while disengaged
+        self._speed_history.add("cruise", speed if active and speed is not None else 0)
 
     def update_airbag_warning(self, active):
         """Update engine warning light status"""
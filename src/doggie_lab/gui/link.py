@@ -0,0 +1,221 @@
+from multiprocessing.connection import Connection
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import msgpack
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# Message kinds exchanged with the GUI process
+CREATE_PANEL = 0
+UPDATE = 1
+COMMAND = 2
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, Enum):
+        return obj.value
+
+    raise TypeError(f"Can't send {obj!r} to the GUI")
+
+
+def pack(batch: List[list]) -> bytes:
+    return msgpack.packb(batch, default=_encode)
+
+
+def unpack(data: bytes) -> List[list]:
+    return msgpack.unpackb(data)
+
+
+class RemotePanel:
+    """
+    Stand-in for an ECU's panel in the GUI process.
+
+    Calling any method on it queues that call as a state update for the panel.
+    """
+
+    def __init__(self, link: "UiLink", ecu_name: str) -> None:
+        self._link = link
+        self._ecu_name = ecu_name
+
+    def __getattr__(self, method: str) -> Callable[..., None]:
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def update(*args: Any) -> None:
+            self._link.update(self._ecu_name, method, *args)
+
+        return update
+
+
+class UiLink:
+    """
+    Simulation side of the channel to the GUI process.
+
+    State updates never block the ECU threads: only the latest arguments of each
+    (ECU, method) are kept, and a sender thread ships them in one msgpack batch
+    at most FLUSH_RATE times per second. Commands coming from the GUI (button
+    clicks, checkboxes...) are dispatched to the handlers registered by the ECUs.
+
+    Panels of ECUs running in worker processes (see car.ecu_process) are
+    relayed: their own UiLink batches are forwarded as they are, and their
+    commands are sent back to them.
+
+    Without a connection (headless mode) updates are discarded.
+    """
+
+    _instance = None
+
+    FLUSH_RATE = 60
+
+    def __init__(self, conn: Optional[Connection] = None) -> None:
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._panels: List[list] = []
+        self._updates: Dict[Tuple[str, str], list] = {}
+        self._handlers: Dict[Tuple[str, str], Callable[..., None]] = {}
+        self._pending = threading.Event()
+        # ECU name -> link to the worker process running it
+        self._remotes: Dict[str, Connection] = {}
+        self._remote_lock = threading.Lock()
+        # Batches are sent by the sender thread and by the relays
+        self._send_lock = threading.Lock()
+
+        if conn is not None:
+            threading.Thread(target=self._send_loop, name="GUI link sender", daemon=True).start()
+            threading.Thread(target=self._recv_loop, name="GUI link receiver", daemon=True).start()
+
+    @classmethod
+    def connect(cls, conn: Connection) -> "UiLink":
+        """Create the link used by every UiEcu, talking through `conn`."""
+        cls._instance = cls(conn)
+        return cls._instance
+
+    @classmethod
+    def get(cls) -> "UiLink":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def create_panel(self, ecu_name: str, kind: str) -> RemotePanel:
+        if self.connected:
+            with self._lock:
+                self._panels.append([CREATE_PANEL, ecu_name, kind, []])
+            self._pending.set()
+
+        return RemotePanel(self, ecu_name)
+
+    def update(self, ecu_name: str, method: str, *args: Any) -> None:
+        if not self.connected:
+            return
+
+        with self._lock:
+            self._updates[(ecu_name, method)] = list(args)
+        self._pending.set()
+
+    def add_command_handler(
+        self, ecu_name: str, command: str, callback: Callable[..., None]
+    ) -> None:
+        self._handlers[(ecu_name, command)] = callback
+
+    def add_remote(self, ecu_name: str, conn: Connection) -> None:
+        """Relay the panel of an ECU whose UiLink is connected to `conn`, in another process."""
+        with self._remote_lock:
+            self._remotes[ecu_name] = conn
+
+        threading.Thread(
+            target=self._relay_loop, args=(conn,), name=f"GUI link relay {ecu_name}", daemon=True
+        ).start()
+
+    def command(self, ecu_name: str, command: str, *args: Any) -> bool:
+        """
+        Dispatch a command as if it came from the GUI (scenarios, tests...).
+
+        Returns:
+            Whether an ECU handles the command (always True for remote ECUs
+            still running, their handlers aren't known here)
+        """
+        remote = self._remotes.get(ecu_name)
+        if remote is not None:
+            try:
+                with self._remote_lock:
+                    remote.send_bytes(pack([[COMMAND, ecu_name, command, list(args)]]))
+                return True
+            except OSError:
+                return False
+
+        handler = self._handlers.get((ecu_name, command))
+        if handler is None:
+            return False
+
+        try:
+            handler(*args)
+        except Exception as e:
+            logger.error("Error handling %s for %s: %s", command, ecu_name, e)
+
+        return True
+
+    def _disconnect(self) -> None:
+        self._conn = None
+        self._pending.set()
+
+    def _send_loop(self) -> None:
+        while self.connected:
+            self._pending.wait()
+            self._pending.clear()
+
+            with self._lock:
+                batch = self._panels + [
+                    [UPDATE, ecu_name, method, args]
+                    for (ecu_name, method), args in self._updates.items()
+                ]
+                self._panels = []
+                self._updates = {}
+
+            if batch:
+                try:
+                    with self._send_lock:
+                        self._conn.send_bytes(pack(batch))
+                except (OSError, AttributeError):
+                    # GUI closed, keep simulating without it
+                    self._disconnect()
+                    return
+
+            time.sleep(1 / self.FLUSH_RATE)
+
+    def _relay_loop(self, conn: Connection) -> None:
+        while True:
+            try:
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                # Worker gone
+                return
+
+            if not self.connected:
+                continue
+
+            try:
+                with self._send_lock:
+                    self._conn.send_bytes(data)
+            except (OSError, AttributeError):
+                self._disconnect()
+
+    def _recv_loop(self) -> None:
+        while self.connected:
+            try:
+                batch = unpack(self._conn.recv_bytes())
+            except (EOFError, OSError, AttributeError):
+                self._disconnect()
+                return
+
+            for kind, ecu_name, command, args in batch:
+                if kind == COMMAND:
+                    self.command(ecu_name, command, *args)
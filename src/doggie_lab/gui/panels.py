@@ -0,0 +1,180 @@
+from doggie_lab.common.button import ButtonState
+from doggie_lab.gui.digital_display import StartButton
+from doggie_lab.gui.instrument_cluster import InstrumentCluster
+import dearpygui.dearpygui as dpg
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Panel:
+    """
+    GUI side of a UiEcu: a dearpygui window for the ECU.
+
+    Public methods are the state updates the ECU can send. User actions are
+    reported to the ECU through `send(command, *args)`.
+    """
+
+    def __init__(self, ecu_name: str, send: Callable[..., None]) -> None:
+        self.ecu_name = ecu_name
+        self._send = send
+        self._window_tag = dpg.generate_uuid()
+
+        dpg.add_window(label=self.ecu_name, tag=self._window_tag)
+
+    def refresh(self) -> None:
+        """Called once per rendered frame, after the updates."""
+
+
+class ImmoPanel(Panel):
+    def __init__(self, ecu_name: str, send: Callable[..., None]) -> None:
+        super().__init__(ecu_name, send)
+
+        dpg.add_checkbox(
+            label="Key inserted",
+            default_value=True,
+            callback=self._insert_key,
+            parent=self._window_tag,
+        )
+
+    def _insert_key(self, sender, app_data, user_data):
+        self._send("insert_key", app_data)
+
+
+class CruiseControlPanel(Panel):
+    def __init__(self, ecu_name: str, send: Callable[..., None]) -> None:
+        super().__init__(ecu_name, send)
+
+        dpg.add_slider_int(
+            label="Speed",
+            parent=self._window_tag,
+            callback=self._set_speed_calback,
+            default_value=0,
+            min_value=0,
+            max_value=300,
+        )
+        dpg.add_checkbox(
+            label="Enabled",
+            default_value=True,
+            callback=self._enable_callback,
+            parent=self._window_tag,
+        )
+
+    def _set_speed_calback(self, sender, app_data, user_data):
+        self._send("set_speed", app_data)
+
+    def _enable_callback(self, sender, app_data, user_data):
+        self._send("enable", app_data)
+
+
+class InstrumentClusterPanel(Panel):
+    def __init__(self, ecu_name: str, send: Callable[..., None]) -> None:
+        super().__init__(ecu_name, send)
+
+        self._instruments = InstrumentCluster(
+            self._window_tag,
+            self._start_button_callback,
+            lambda: self._send("lock_doors"),
+            lambda: self._send("unlock_doors"),
+            lambda: self._send("toggle_airbag"),
+        )
+
+        self._instruments.update_all()
+
+    def _start_button_callback(self, button: StartButton, state: ButtonState) -> None:
+        self._send("start_button", state)
+
+    def refresh(self) -> None:
+        self._instruments.refresh()
+
+    def set_button_state(self, state: str) -> None:
+        self._instruments.set_button_state(ButtonState(state))
+
+    def __getattr__(self, method: str) -> Any:
+        # Every other update goes straight to the instrument cluster
+        if method.startswith("update_"):
+            return getattr(self._instruments, method)
+
+        raise AttributeError(method)
+
+
+class BusMonitorPanel(Panel):
+    """
+    Table of the messages seen on the bus, fed by analysis.bus_monitor.
+
+    Rows are created once per message and then only have their cells' values
+    changed, at the monitor's refresh rate.
+    """
+
+    COLUMNS = ["ID", "Sub", "Name", "Data", "Frames/s", "Frames"]
+    NORMAL_COLOR = (255, 255, 255, 255)
+    TOO_FAST_COLOR = (255, 80, 80, 255)
+
+    def __init__(self, ecu_name: str, send: Callable[..., None]) -> None:
+        super().__init__(ecu_name, send)
+
+        dpg.configure_item(self._window_tag, width=640, height=360)
+        self._summary = dpg.add_text("No traffic", parent=self._window_tag)
+        self._table = dpg.add_table(
+            parent=self._window_tag,
+            header_row=True,
+            borders_innerV=True,
+            row_background=True,
+            scrollY=True,
+            resizable=True,
+        )
+        for column in self.COLUMNS:
+            dpg.add_table_column(label=column, parent=self._table)
+
+        # (ID, sub ID) -> cells of its row, and the rows in display order
+        self._cells: Dict[Tuple[int, Optional[int]], List[int]] = {}
+        self._rows: List[Tuple[Tuple[int, int], int]] = []
+        self._too_fast: Dict[Tuple[int, Optional[int]], bool] = {}
+
+    def _add_row(self, key: Tuple[int, Optional[int]], name: str) -> List[int]:
+        order = (key[0], -1 if key[1] is None else key[1])
+        position = next((i for i, (other, _) in enumerate(self._rows) if other > order), len(self._rows))
+        before = self._rows[position][1] if position < len(self._rows) else 0
+
+        row = dpg.add_table_row(parent=self._table, before=before)
+        self._rows.insert(position, (order, row))
+
+        sub_id = "" if key[1] is None else f"{key[1]:02X}"
+        cells = [
+            dpg.add_text(f"{key[0]:03X}", parent=row),
+            dpg.add_text(sub_id, parent=row),
+            dpg.add_text(name, parent=row),
+            dpg.add_text("", parent=row),
+            dpg.add_text("", parent=row),
+            dpg.add_text("", parent=row),
+        ]
+        return cells
+
+    def update_rows(self, rows: List[list]) -> None:
+        for arbitration_id, sub_id, name, payload, rate, frames, too_fast in rows:
+            key = (arbitration_id, sub_id)
+            cells = self._cells.get(key)
+            if cells is None:
+                cells = self._cells[key] = self._add_row(key, name)
+
+            dpg.set_value(cells[3], payload)
+            dpg.set_value(cells[4], f"{rate:.1f}")
+            dpg.set_value(cells[5], str(frames))
+
+            if self._too_fast.get(key) != too_fast:
+                self._too_fast[key] = too_fast
+                color = self.TOO_FAST_COLOR if too_fast else self.NORMAL_COLOR
+                for cell in cells:
+                    dpg.configure_item(cell, color=color)
+
+    def update_summary(self, messages: int, rate: float, overflow: int) -> None:
+        summary = f"{messages} messages, {rate:.0f} frames/s"
+        if overflow:
+            summary += f", {overflow} frames of untracked messages"
+        dpg.set_value(self._summary, summary)
+
+
+PANELS = {
+    "immo": ImmoPanel,
+    "cruise_control": CruiseControlPanel,
+    "instrument_cluster": InstrumentClusterPanel,
+    "bus_monitor": BusMonitorPanel,
+}
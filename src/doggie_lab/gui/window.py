@@ -1,5 +1,6 @@
 import dearpygui.dearpygui as dpg
 from importlib.resources import files
+from typing import Callable, Optional
 
 
 class Window:
@@ -19,10 +20,23 @@ class Window:
         file_path = files("doggie_lab.data") / "custom_layout.ini"
         dpg.set_init_file(file=file_path)
 
-    def run(self):
+    def run(self, frame_callback: Optional[Callable[[], None]] = None):
+        """
+        Show the window until it's closed.
+
+        Args:
+            frame_callback: Called before rendering each frame
+        """
         dpg.setup_dearpygui()
         dpg.show_viewport()
-        dpg.start_dearpygui()
+
+        if frame_callback is None:
+            dpg.start_dearpygui()
+            return
+
+        while dpg.is_dearpygui_running():
+            frame_callback()
+            dpg.render_dearpygui_frame()
 
     def clean(self):
         dpg.destroy_context()
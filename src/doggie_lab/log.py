@@ -0,0 +1,198 @@
+"""
+Non-blocking logging.
+
+Every logger of the package (module loggers and the per-ECU loggers of
+`ecu_logger`) ends in a QueueHandler once `configure` is called: the thread
+logging only formats the message and queues the record, a QueueListener
+thread writes it to stderr or a file. A slow terminal or disk never stalls
+an ECU thread, so diagnostics can stay on during load tests.
+
+Messages are logged as format strings with arguments (not f-strings), which
+is how repeats are recognized: records of the same logger and format string
+are rate limited before being queued, at most RATE_LIMIT_BURST of them per
+RATE_LIMIT_PERIOD, and the next one let through carries the count of those
+suppressed. Records are written as text lines, or as JSON lines for tools.
+
+Without `configure` (e.g., the package used as a library), records follow the
+standard logging defaults: warnings and errors go to stderr.
+"""
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+
+ROOT_LOGGER = "doggie_lab"
+ECU_LOGGER = f"{ROOT_LOGGER}.ecus"
+
+# Level used when `configure` isn't given one
+LEVEL_ENV = "DOGGIE_LAB_LOG_LEVEL"
+
+# Records with the same logger and format string let through per period
+RATE_LIMIT_BURST = 5
+RATE_LIMIT_PERIOD = 10.0
+
+
+@dataclass
+class LogConfig:
+    level: str = "INFO"
+    json_output: bool = False
+    file: Optional[str] = None
+    rate_limit: bool = True
+
+
+_config: Optional[LogConfig] = None
+_listener: Optional[QueueListener] = None
+
+
+def ecu_logger(ecu_name: str) -> logging.Logger:
+    """Logger of an ECU, its records are tagged with the ECU name."""
+    return logging.getLogger(f"{ECU_LOGGER}.{ecu_name}")
+
+
+def _component(record: logging.LogRecord) -> str:
+    # ECU name, or module path within the package
+    for prefix in (f"{ECU_LOGGER}.", f"{ROOT_LOGGER}."):
+        if record.name.startswith(prefix):
+            return record.name[len(prefix):]
+
+    return record.name
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops records repeating the same message beyond `burst` per `period`.
+
+    Messages are told apart by logger and format string, not by their
+    arguments: a flood of "Error sending %s" is one message.
+    """
+
+    def __init__(self, burst: int = RATE_LIMIT_BURST, period: float = RATE_LIMIT_PERIOD) -> None:
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self._lock = threading.Lock()
+        # (logger, format string) -> [window start, records let through, suppressed]
+        self._windows: Dict[Tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                suppressed = window[2]
+                window[1] += 1
+                window[2] = 0
+            else:
+                window[2] += 1
+                return False
+
+        if suppressed:
+            record.suppressed = suppressed
+
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """time level [ECU or module] message"""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s.%(msecs)03d %(levelname)-7s [%(component)s] %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.component = _component(record)
+        text = super().format(record)
+
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "component": _component(record),
+            "logger": record.name,
+            "thread": record.threadName,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+
+        return json.dumps(entry)
+
+
+def configure(
+    level: Optional[str] = None,
+    json_output: bool = False,
+    file: Optional[str] = None,
+    rate_limit: bool = True,
+) -> None:
+    """
+    Route the records of the package through a queue to a background writer.
+
+    Args:
+        level: Minimum level name (default: $DOGGIE_LAB_LOG_LEVEL, or INFO)
+        json_output: Write JSON lines instead of text
+        file: Append to this file instead of writing to stderr
+        rate_limit: Suppress repeated messages
+    """
+    global _config, _listener
+    shutdown()
+
+    level = (level or os.environ.get(LEVEL_ENV) or "INFO").upper()
+    _config = LogConfig(level, json_output, file, rate_limit)
+
+    handler = logging.FileHandler(file) if file is not None else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_output else TextFormatter())
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = QueueListener(records, handler)
+    _listener.start()
+
+
+def get_config() -> Optional[LogConfig]:
+    """Logging selected by `configure`, None if not called (e.g., to apply it in a worker process)."""
+    return _config
+
+
+def shutdown() -> None:
+    """Write the queued records and stop the writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown)
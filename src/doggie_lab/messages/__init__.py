@@ -1,4 +1,12 @@
-from doggie_lab.messages.messages import EcuMessage, EcuSubMessage
+from doggie_lab.messages.messages import (
+    EcuMessage,
+    EcuSubMessage,
+    Signal,
+    DECODE_CACHE_SIZE,
+    decode_cache_info,
+    clear_decode_cache,
+    format_decode_cache_report,
+)
 from doggie_lab.messages.central_ecu_message import (
     EngineStatusMessage,
     SpeedStatusMessage,
@@ -16,6 +24,13 @@ from doggie_lab.messages.doors_message import DoorsStatusMessage
 from doggie_lab.messages.cruise_control_message import CruiseControlMessage
 from doggie_lab.messages.abs_message import AbsMessage
 
+from doggie_lab.messages.registry import (
+    MESSAGE_CLASSES,
+    SUB_MESSAGE_IDS,
+    message_key,
+    message_class,
+)
+
 all = [
     "EcuMessage",
     "EcuSubMessageEngineControlMessage",
@@ -30,4 +45,13 @@ all = [
     "AbsStatusMessage",
     "AirbagStatusMessage",
     "AirbagToggleMessage",
+    "Signal",
+    "DECODE_CACHE_SIZE",
+    "decode_cache_info",
+    "clear_decode_cache",
+    "format_decode_cache_report",
+    "MESSAGE_CLASSES",
+    "SUB_MESSAGE_IDS",
+    "message_key",
+    "message_class",
 ]
@@ -10,7 +10,7 @@ class AbsMessage(EcuMessage):
 
     @classmethod
     def _from_bytes(cls, data: bytes) -> Optional["AbsMessage"]:
-        return AbsMessage
+        return cls()
 
     def _to_bytes(self) -> bytes:
         return b""
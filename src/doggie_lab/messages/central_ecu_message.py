@@ -1,4 +1,4 @@
-from doggie_lab.messages.messages import EcuSubMessage
+from doggie_lab.messages.messages import EcuSubMessage, Signal
 from doggie_lab import ids
 from typing import Optional
 import struct
@@ -11,6 +11,8 @@ class CentralEcuMessage(EcuSubMessage):
 
 
 class EngineStatusMessage(CentralEcuMessage):
+    SIGNALS = (Signal("engine_on", 0),)
+
     @staticmethod
     def get_sub_id() -> int:
         return 1
@@ -33,6 +35,8 @@ class EngineStatusMessage(CentralEcuMessage):
 
 
 class SpeedStatusMessage(CentralEcuMessage):
+    SIGNALS = (Signal("speed", 0, 16, unit="km/h"),)
+
     @staticmethod
     def get_sub_id() -> int:
         return 2
@@ -54,6 +58,8 @@ class SpeedStatusMessage(CentralEcuMessage):
 
 
 class RpmStatusMessage(CentralEcuMessage):
+    SIGNALS = (Signal("rpm", 0, 16, unit="rpm"),)
+
     @staticmethod
     def get_sub_id() -> int:
         return 3
@@ -75,6 +81,8 @@ class RpmStatusMessage(CentralEcuMessage):
 
 
 class AbsStatusMessage(CentralEcuMessage):
+    SIGNALS = (Signal("failed", 0),)
+
     @staticmethod
     def get_sub_id() -> int:
         return 4
@@ -96,6 +104,8 @@ class AbsStatusMessage(CentralEcuMessage):
 
 
 class AirbagStatusMessage(CentralEcuMessage):
+    SIGNALS = (Signal("enabled", 0),)
+
     def __init__(self, enabled: bool) -> None:
         self.enabled = enabled
 
@@ -1,4 +1,4 @@
-from doggie_lab.messages import EcuMessage
+from doggie_lab.messages import EcuMessage, Signal
 from doggie_lab import ids
 from typing import Optional
 
@@ -10,6 +10,11 @@ class CruiseControlMessage(EcuMessage):
 
 
 class CruiseControlMessage(CruiseControlMessage):
+    SIGNALS = (
+        Signal("enable", 0),
+        Signal("throttle", 1, unit="%"),
+    )
+
     def __init__(self, enable: bool, throttle: int) -> None:
         self.enable = enable
         self.throttle = throttle
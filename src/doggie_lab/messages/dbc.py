@@ -0,0 +1,378 @@
+"""
+DBC export/import for the doggie_lab messages.
+
+`dumps`/`dump` describe the message classes (through their SIGNALS) as a DBC
+database. Sub messages sharing an arbitration ID are exported as a multiplexed
+message, with the sub ID as multiplexor.
+
+`loads`/`load` build EcuMessage classes back from a DBC file. The encode and
+decode methods of each class are generated and compiled when the file is loaded,
+packing all the byte aligned signals with a single precompiled struct.
+"""
+from doggie_lab.messages import EcuMessage, EcuSubMessage, Signal, MESSAGE_CLASSES
+from doggie_lab import ids
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+import argparse
+import re
+import struct
+
+
+MUX_SIGNAL = "sub_id"
+NO_NODE = "Vector__XXX"
+
+NODES = {
+    ids.CENTRAL_ECU_ID: "CentralEcu",
+    ids.IMMO_ECU_ID: "ImmoEcu",
+    ids.INSTRUMENT_CLUSTER_ID: "InstrumentClusterEcu",
+    ids.DOORS_ECU_ID: "DoorsEcu",
+    ids.CRUISE_CONTROL_ECU_ID: "CruiseControlEcu",
+    ids.ABS_ECU_ID: "AbsEcu",
+    ids.AIRBAG_ECU_ID: "AirbagEcu",
+}
+
+STRUCT_FORMATS = {8: "B", 16: "H", 32: "I", 64: "Q"}
+
+
+def _start_bit(signal: Signal, byte_shift: int) -> int:
+    """DBC start bit: MSB for big endian (Motorola), LSB for little endian (Intel)."""
+    start_byte = signal.start_byte + byte_shift
+
+    if signal.length < 8 or signal.byte_order == "little":
+        if signal.byte_order == "little":
+            return start_byte * 8 + signal.bit
+        return start_byte * 8 + signal.bit + signal.length - 1
+
+    return start_byte * 8 + 7
+
+
+def _signal_range(signal: Signal) -> Tuple[float, float]:
+    if signal.signed:
+        raw_min, raw_max = -(1 << (signal.length - 1)), (1 << (signal.length - 1)) - 1
+    else:
+        raw_min, raw_max = 0, (1 << signal.length) - 1
+
+    return (
+        raw_min * signal.factor + signal.offset,
+        raw_max * signal.factor + signal.offset,
+    )
+
+
+def _format_number(value: float) -> str:
+    return f"{value:g}"
+
+
+def _format_signal(signal: Signal, mux: str, byte_shift: int) -> str:
+    low, high = _signal_range(signal)
+    return (
+        f" SG_ {signal.name} {mux}: {_start_bit(signal, byte_shift)}|{signal.length}"
+        f"@{0 if signal.byte_order == 'big' else 1}{'-' if signal.signed else '+'}"
+        f" ({_format_number(signal.factor)},{_format_number(signal.offset)})"
+        f" [{_format_number(low)}|{_format_number(high)}] \"{signal.unit}\" {NO_NODE}"
+    )
+
+
+def dumps(classes: Iterable[Type[EcuMessage]] = MESSAGE_CLASSES) -> str:
+    """Describe the message classes as a DBC database."""
+    by_id: Dict[int, List[Type[EcuMessage]]] = {}
+    for cls in classes:
+        by_id.setdefault(cls.get_id(), []).append(cls)
+
+    lines = [
+        'VERSION ""',
+        "",
+        "NS_ :",
+        "",
+        "BS_:",
+        "",
+        "BU_: " + " ".join(NODES[i] for i in sorted(by_id) if i in NODES),
+        "",
+    ]
+    value_tables = []
+
+    for arbitration_id, group in sorted(by_id.items()):
+        node = NODES.get(arbitration_id, NO_NODE)
+        dlc = max(cls.payload_length() for cls in group)
+
+        if issubclass(group[0], EcuSubMessage):
+            name = group[0].__bases__[0].__name__
+            lines.append(f"BO_ {arbitration_id} {name}: {dlc} {node}")
+            lines.append(
+                f" SG_ {MUX_SIGNAL} M : 7|8@0+ (1,0) [0|255] \"\" {NO_NODE}"
+            )
+
+            for cls in sorted(group, key=lambda c: c.get_sub_id()):
+                for signal in cls.SIGNALS:
+                    lines.append(_format_signal(signal, f"m{cls.get_sub_id()} ", 1))
+
+            value_tables.append(
+                f"VAL_ {arbitration_id} {MUX_SIGNAL} "
+                + " ".join(f'{cls.get_sub_id()} "{cls.__name__}"' for cls in group)
+                + " ;"
+            )
+
+        else:
+            for cls in group:
+                lines.append(f"BO_ {arbitration_id} {cls.__name__}: {dlc} {node}")
+                for signal in cls.SIGNALS:
+                    lines.append(_format_signal(signal, "", 0))
+
+        lines.append("")
+
+    lines.extend(value_tables)
+
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: str, classes: Iterable[Type[EcuMessage]] = MESSAGE_CLASSES) -> None:
+    with open(path, "w") as f:
+        f.write(dumps(classes))
+
+
+BO_RE = re.compile(r"^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\w+)")
+SG_RE = re.compile(
+    r"^\s*SG_\s+(\w+)\s+(M|m\d+)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*"
+    r"\(([^,]+),([^)]+)\)\s*\[[^\]]*\]\s*\"([^\"]*)\""
+)
+VAL_RE = re.compile(r"^VAL_\s+(\d+)\s+(\w+)\s+(.*);")
+VAL_ITEM_RE = re.compile(r"(-?\d+)\s+\"([^\"]*)\"")
+
+
+def _parse_number(text: str) -> float:
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _from_start_bit(
+    name: str, start: int, length: int, byte_order: str, signed: bool,
+    factor: float, offset: float, unit: str, byte_shift: int,
+) -> Signal:
+    """Inverse of `_start_bit`."""
+    start_byte = start // 8 - byte_shift
+    bit = start % 8
+
+    if byte_order == "big":
+        if length <= bit + 1:
+            bit = bit - length + 1
+        elif bit == 7 and length % 8 == 0:
+            bit = 0
+        else:
+            raise ValueError(f"Unsupported layout for signal {name}")
+
+    elif bit + length > 8 and (bit != 0 or length % 8 != 0):
+        raise ValueError(f"Unsupported layout for signal {name}")
+
+    if start_byte < 0:
+        raise ValueError(f"Signal {name} overlaps the multiplexor")
+
+    return Signal(
+        name, start_byte, length, bit=bit, signed=signed, byte_order=byte_order,
+        factor=factor, offset=offset, unit=unit,
+    )
+
+
+def _generate_codec(name: str, signals: Tuple[Signal, ...]) -> Dict[str, object]:
+    """
+    Generate and compile `__init__`, `_from_bytes` and `_to_bytes` for a layout.
+
+    Byte aligned signals of 8/16/32/64 bits are packed with one struct per byte
+    order; other signals are extracted with shifts and masks.
+    """
+    length = max((signal.end_byte for signal in signals), default=0)
+    namespace: Dict[str, object] = {"struct": struct}
+
+    packed: Dict[str, List[Tuple[int, Signal]]] = {"big": [], "little": []}
+    extracted: List[Signal] = []
+    for signal in signals:
+        if signal.bit == 0 and signal.length in STRUCT_FORMATS:
+            packed[signal.byte_order].append((signal.start_byte, signal))
+        else:
+            extracted.append(signal)
+
+    decode = [f"if len(data) < {length}:", "    return None"]
+    encode = [f"buf = bytearray({length})"]
+
+    for byte_order, fields in packed.items():
+        if not fields:
+            continue
+
+        fmt = ">" if byte_order == "big" else "<"
+        position = 0
+        for start_byte, signal in sorted(fields, key=lambda f: f[0]):
+            fmt += "x" * (start_byte - position)
+            code = STRUCT_FORMATS[signal.length]
+            fmt += code.lower() if signal.signed else code
+            position = signal.end_byte
+
+        struct_name = f"_{byte_order}"
+        namespace[struct_name] = struct.Struct(fmt)
+
+        names = [signal.name for _, signal in sorted(fields, key=lambda f: f[0])]
+        decode.append(f"{', '.join(names)}, = {struct_name}.unpack_from(data)")
+        raws = [_raw_expression(signal) for _, signal in sorted(fields, key=lambda f: f[0])]
+        encode.append(f"{struct_name}.pack_into(buf, 0, {', '.join(raws)})")
+
+    for signal in extracted:
+        mask = (1 << signal.length) - 1
+        if signal.length <= 8 - signal.bit:
+            decode.append(
+                f"{signal.name} = (data[{signal.start_byte}] >> {signal.bit}) & {mask:#x}"
+            )
+            encode.append(
+                f"buf[{signal.start_byte}] |= ({_raw_expression(signal)} & {mask:#x})"
+                f" << {signal.bit}"
+            )
+        else:
+            end = signal.end_byte
+            decode.append(
+                f"{signal.name} = int.from_bytes(data[{signal.start_byte}:{end}],"
+                f" '{signal.byte_order}', signed={signal.signed})"
+            )
+            encode.append(
+                f"buf[{signal.start_byte}:{end}] = ({_raw_expression(signal)})"
+                f".to_bytes({end - signal.start_byte}, '{signal.byte_order}',"
+                f" signed={signal.signed})"
+            )
+
+        if signal.signed and signal.length < 8:
+            decode.append(
+                f"{signal.name} -= ({signal.name} >> {signal.length - 1}) << {signal.length}"
+            )
+
+    for signal in signals:
+        if signal.factor != 1 or signal.offset != 0:
+            decode.append(
+                f"{signal.name} = {signal.name} * {signal.factor!r} + {signal.offset!r}"
+            )
+
+    args = ", ".join(signal.name for signal in signals)
+    decode.append(f"return cls({args})")
+    encode.append("return bytes(buf)")
+
+    source = "\n".join(
+        [f"def __init__(self{', ' if args else ''}{args}):"]
+        + [f"    self.{signal.name} = {signal.name}" for signal in signals]
+        + (["    pass"] if not signals else [])
+        + ["", "def _from_bytes(cls, data):"]
+        + [f"    {line}" for line in decode]
+        + ["", "def _to_bytes(self):"]
+        + [f"    {line}" for line in encode]
+    )
+
+    exec(compile(source, f"<dbc codec {name}>", "exec"), namespace)
+
+    return {
+        "__init__": namespace["__init__"],
+        "_from_bytes": classmethod(namespace["_from_bytes"]),
+        "_to_bytes": namespace["_to_bytes"],
+        "SIGNALS": signals,
+        "_codec_source": source,
+    }
+
+
+def _raw_expression(signal: Signal) -> str:
+    value = f"self.{signal.name}"
+    if signal.factor != 1 or signal.offset != 0:
+        return f"round(({value} - {signal.offset!r}) / {signal.factor!r})"
+    return f"int({value})"
+
+
+def _build_class(
+    name: str,
+    arbitration_id: int,
+    signals: Tuple[Signal, ...],
+    sub_id: Optional[int] = None,
+) -> Type[EcuMessage]:
+    attrs = _generate_codec(name, signals)
+    attrs["get_id"] = staticmethod(lambda: arbitration_id)
+
+    if sub_id is None:
+        return type(name, (EcuMessage,), attrs)
+
+    attrs["get_sub_id"] = staticmethod(lambda: sub_id)
+    return type(name, (EcuSubMessage,), attrs)
+
+
+def loads(text: str) -> Dict[str, Type[EcuMessage]]:
+    """
+    Build message classes from a DBC database.
+
+    Returns:
+        Generated classes keyed by name. Multiplexed messages produce one class
+        per multiplexor value, named after the multiplexor's value table, with
+        the signals of that value and the ones that aren't multiplexed.
+    """
+    messages: Dict[int, Tuple[str, List[Tuple[Optional[int], Tuple]]]] = {}
+    # Multiplexor signal name of each multiplexed message
+    multiplexors: Dict[int, str] = {}
+    # (arbitration ID, signal name) -> value table
+    value_tables: Dict[Tuple[int, str], Dict[int, str]] = {}
+    current: Optional[int] = None
+
+    for line in text.splitlines():
+        if (match := BO_RE.match(line)) is not None:
+            current = int(match.group(1))
+            messages[current] = (match.group(2), [])
+
+        elif (match := SG_RE.match(line)) is not None and current is not None:
+            name, mux, start, length, order, sign, factor, offset, unit = match.groups()
+            if mux == "M":
+                if (int(start), int(length), order) != (7, 8, "0"):
+                    raise ValueError(f"Unsupported multiplexor {name}")
+                multiplexors[current] = name
+                continue
+
+            messages[current][1].append((
+                int(mux[1:]) if mux else None,
+                (name, int(start), int(length), "big" if order == "0" else "little",
+                 sign == "-", _parse_number(factor), _parse_number(offset), unit),
+            ))
+
+        elif (match := VAL_RE.match(line)) is not None:
+            value_tables[(int(match.group(1)), match.group(2))] = {
+                int(value): label for value, label in VAL_ITEM_RE.findall(match.group(3))
+            }
+
+        elif not line.startswith(" "):
+            current = None
+
+    classes: Dict[str, Type[EcuMessage]] = {}
+    for arbitration_id, (name, signals) in messages.items():
+        subs = sorted({mux for mux, _ in signals if mux is not None})
+
+        if not subs:
+            layout = tuple(_from_start_bit(*args, 0) for _, args in signals)
+            classes[name] = _build_class(name, arbitration_id, layout)
+            continue
+
+        # Sub messages without signals only show up in the value table
+        multiplexor = multiplexors.get(arbitration_id, MUX_SIGNAL)
+        mux_names = value_tables.get((arbitration_id, multiplexor), {})
+        subs = sorted(set(subs) | set(mux_names))
+        for sub_id in subs:
+            sub_name = mux_names.get(sub_id, f"{name}_{sub_id}")
+            layout = tuple(
+                _from_start_bit(*args, 1) for mux, args in signals if mux in (sub_id, None)
+            )
+            classes[sub_name] = _build_class(sub_name, arbitration_id, layout, sub_id)
+
+    return classes
+
+
+def load(path: str) -> Dict[str, Type[EcuMessage]]:
+    with open(path) as f:
+        return loads(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the doggie_lab messages as DBC")
+    parser.add_argument("output", nargs="?", help="DBC file to write (default: stdout)")
+    args = parser.parse_args()
+
+    if args.output is None:
+        print(dumps(), end="")
+    else:
+        dump(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
-from doggie_lab.messages import EcuMessage
+from doggie_lab.messages import EcuMessage, Signal
 from doggie_lab.common.doors import DoorsStatus
 from doggie_lab import ids
 from typing import Optional
 
 
 class DoorsStatusMessage(EcuMessage):
+    SIGNALS = (
+        Signal("fr", 0, 1, bit=3),
+        Signal("fl", 0, 1, bit=2),
+        Signal("rr", 0, 1, bit=1),
+        Signal("rl", 0, 1, bit=0),
+    )
+
     @staticmethod
     def get_id() -> int:
         return ids.DOORS_ECU_ID
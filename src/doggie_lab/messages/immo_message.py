@@ -1,4 +1,4 @@
-from doggie_lab.messages import EcuMessage
+from doggie_lab.messages import EcuMessage, Signal
 from doggie_lab import ids
 from typing import Optional
 
@@ -10,6 +10,8 @@ class ImmoMessage(EcuMessage):
 
 
 class KeyMessage(ImmoMessage):
+    SIGNALS = (Signal("key_inserted", 0),)
+
     def __init__(self, key_inserted: bool) -> None:
         self.key_inserted = key_inserted
 
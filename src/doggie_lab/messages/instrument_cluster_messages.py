@@ -1,4 +1,4 @@
-from doggie_lab.messages import EcuSubMessage
+from doggie_lab.messages import EcuSubMessage, Signal
 from doggie_lab import ids
 from typing import Optional
 
@@ -10,6 +10,8 @@ class InstrumentClusterMessage(EcuSubMessage):
 
 
 class EngineControlMessage(InstrumentClusterMessage):
+    SIGNALS = (Signal("start_engine", 0),)
+
     @staticmethod
     def get_sub_id() -> int:
         return 0
@@ -32,6 +34,17 @@ class EngineControlMessage(InstrumentClusterMessage):
 
 
 class DoorsControlMessage(InstrumentClusterMessage):
+    # Unlocks are ignored from this speed (km/h) on
+    MAX_UNLOCK_SPEED = 20
+
+    SIGNALS = (
+        Signal("lock", 0),
+        Signal("fr", 1, 1, bit=3),
+        Signal("fl", 1, 1, bit=2),
+        Signal("rr", 1, 1, bit=1),
+        Signal("rl", 1, 1, bit=0),
+    )
+
     @staticmethod
     def get_sub_id() -> int:
         return 1
@@ -1,20 +1,142 @@
 from abc import ABC, abstractmethod
 from can import Message as CanMessage
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Type
+import functools
+
+
+# Decoded frames kept by the shared decode cache
+DECODE_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class Signal:
+    """
+    Layout of a value inside a message payload.
+
+    Positions are relative to the bytes returned by `_to_bytes` (i.e. after the
+    sub ID byte for EcuSubMessage).
+
+    Args:
+        name: Attribute holding the value in the message object
+        start_byte: Index of the first payload byte holding the value
+        length: Size in bits
+        bit: Position of the least significant bit inside `start_byte`, for
+            values smaller than a byte
+        signed: Whether the raw value is two's complement
+        byte_order: "big" or "little" for multi-byte values
+        factor, offset: Physical value = raw * factor + offset
+        unit: Unit of the physical value
+    """
+
+    name: str
+    start_byte: int
+    length: int = 8
+    bit: int = 0
+    signed: bool = False
+    byte_order: str = "big"
+    factor: float = 1
+    offset: float = 0
+    unit: str = ""
+
+    @property
+    def end_byte(self) -> int:
+        """Index one past the last payload byte holding the value."""
+        return self.start_byte + (self.bit + self.length + 7) // 8
+
+
+def _read_only(self: "EcuMessage", *args: Any) -> None:
+    raise AttributeError(f"{type(self).__name__} decoded from a frame is shared, it can't be modified")
 
 
 class EcuMessage(ABC):
+    # Payload layout, used to describe the message to external tools
+    SIGNALS: Tuple[Signal, ...] = ()
+
+    # Frames kept per message class by the cached_can_msg/to_cached_can_msg caches
+    FRAME_CACHE_SIZE = 64
+
+    @classmethod
+    def _frozen_class(cls) -> type:
+        """Read-only variant of this class, given to decoded messages."""
+        frozen = cls.__dict__.get("_frozen")
+        if frozen is None:
+            frozen = type(
+                cls.__name__,
+                (cls,),
+                {
+                    "__module__": cls.__module__,
+                    "__qualname__": cls.__qualname__,
+                    "__setattr__": _read_only,
+                    "__delattr__": _read_only,
+                    # Same frame caches as the mutable class
+                    "_frames": cls._frame_caches(),
+                },
+            )
+            cls._frozen = frozen
+
+        return frozen
+
     @classmethod
     def from_can_msg(cls, msg: CanMessage) -> Optional["EcuMessage"]:
+        """
+        Decode a frame of this message, None if it isn't one.
+
+        Decoding goes through the decode cache (see `_decode`): the returned
+        message is shared with every other decoding of the same frame and
+        can't be modified.
+        """
         if msg.arbitration_id != cls.get_id():
             return None
 
-        return cls._from_bytes(msg.data)
+        return _decode(cls, msg.arbitration_id, bytes(msg.data), 0)
 
     def to_can_msg(self) -> None:
         msg = CanMessage(arbitration_id=self.get_id(), data=self._to_bytes())
         return msg
 
+    @classmethod
+    def _frame_caches(cls) -> Tuple[Dict[tuple, CanMessage], Dict[tuple, CanMessage]]:
+        """Frames of this class keyed by constructor arguments and by signal values."""
+        caches = cls.__dict__.get("_frames")
+        if caches is None:
+            caches = ({}, {})
+            cls._frames = caches
+
+        return caches
+
+    @classmethod
+    def cached_can_msg(cls, *args: Any) -> CanMessage:
+        """
+        Frame of `cls(*args)`, built only the first time.
+
+        Meant for periodic senders of messages with few possible values: no
+        message nor frame is allocated once the value has been seen. The frame
+        is shared, it must not be modified.
+        """
+        by_args = cls._frame_caches()[0]
+
+        frame = by_args.get(args)
+        if frame is None:
+            frame = cls(*args).to_cached_can_msg()
+            if len(by_args) < cls.FRAME_CACHE_SIZE:
+                by_args[args] = frame
+
+        return frame
+
+    def to_cached_can_msg(self) -> CanMessage:
+        """Like `to_can_msg`, sharing the frame between messages with the same SIGNALS values."""
+        by_value = self._frame_caches()[1]
+        value = tuple(getattr(self, signal.name) for signal in self.SIGNALS)
+
+        frame = by_value.get(value)
+        if frame is None:
+            frame = self.to_can_msg()
+            if len(by_value) < self.FRAME_CACHE_SIZE:
+                by_value[value] = frame
+
+        return frame
+
     @classmethod
     @abstractmethod
     def _from_bytes(cls, data: bytes) -> Optional["EcuMessage"]:
@@ -29,6 +151,11 @@ class EcuMessage(ABC):
     def get_id() -> int:
         raise NotImplementedError
 
+    @classmethod
+    def payload_length(cls) -> int:
+        """Number of data bytes of the frame, according to SIGNALS."""
+        return max((signal.end_byte for signal in cls.SIGNALS), default=0)
+
 
 class EcuSubMessage(EcuMessage):
     @staticmethod
@@ -45,7 +172,11 @@ class EcuSubMessage(EcuMessage):
         ):
             return None
 
-        return cls._from_bytes(msg.data[1:])
+        return _decode(cls, msg.arbitration_id, bytes(msg.data), 1)
+
+    @classmethod
+    def payload_length(cls) -> int:
+        return 1 + super().payload_length()
 
     def to_can_msg(self) -> None:
         data = self.get_sub_id().to_bytes(1, "big") + self._to_bytes()
@@ -53,3 +184,42 @@ class EcuSubMessage(EcuMessage):
             arbitration_id=self.get_id(),
             data=data,
         )
+
+
+@functools.lru_cache(maxsize=DECODE_CACHE_SIZE)
+def _decode(
+    cls: Type[EcuMessage], arbitration_id: int, data: bytes, offset: int
+) -> Optional[EcuMessage]:
+    """
+    Decoded message of a frame, `data[offset:]` being what `_from_bytes` parses.
+
+    Bounded LRU keyed by (arbitration ID, payload) and the decoding class
+    (always the same one for a given frame). Most of the bus is periodic
+    frames repeating the same payload, so a repeated frame costs a lookup
+    instead of a parse and an allocation. The cached message is handed to
+    every receiver of the frame, hence frozen.
+    """
+    decoded = cls._from_bytes(data[offset:])
+    if decoded is not None:
+        decoded.__class__ = cls._frozen_class()
+
+    return decoded
+
+
+def decode_cache_info() -> "functools._CacheInfo":
+    """Hits, misses, maxsize and current size of the decode cache."""
+    return _decode.cache_info()
+
+
+def clear_decode_cache() -> None:
+    _decode.cache_clear()
+
+
+def format_decode_cache_report() -> str:
+    info = _decode.cache_info()
+    lookups = info.hits + info.misses
+    hit_rate = info.hits / lookups if lookups else 0.0
+    return (
+        f"Decode cache: {info.hits} hits, {info.misses} misses ({hit_rate:.1%} hit rate),"
+        f" {info.currsize}/{info.maxsize} entries"
+    )
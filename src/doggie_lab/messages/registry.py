@@ -0,0 +1,59 @@
+from doggie_lab.messages.messages import EcuMessage, EcuSubMessage
+from doggie_lab.messages.central_ecu_message import (
+    EngineStatusMessage,
+    SpeedStatusMessage,
+    RpmStatusMessage,
+    AbsStatusMessage,
+    AirbagStatusMessage,
+)
+from doggie_lab.messages.instrument_cluster_messages import (
+    EngineControlMessage,
+    DoorsControlMessage,
+    AirbagToggleMessage,
+)
+from doggie_lab.messages.immo_message import KeyMessage
+from doggie_lab.messages.doors_message import DoorsStatusMessage
+from doggie_lab.messages.cruise_control_message import CruiseControlMessage
+from doggie_lab.messages.abs_message import AbsMessage
+from can import Message as CanMessage
+from typing import Dict, Optional, Tuple, Type
+
+
+# Every message exchanged by the simulator's ECUs
+MESSAGE_CLASSES = (
+    EngineStatusMessage,
+    SpeedStatusMessage,
+    RpmStatusMessage,
+    AbsStatusMessage,
+    AirbagStatusMessage,
+    EngineControlMessage,
+    DoorsControlMessage,
+    AirbagToggleMessage,
+    KeyMessage,
+    DoorsStatusMessage,
+    CruiseControlMessage,
+    AbsMessage,
+)
+
+# Arbitration IDs whose first data byte is a sub ID
+SUB_MESSAGE_IDS = frozenset(
+    cls.get_id() for cls in MESSAGE_CLASSES if issubclass(cls, EcuSubMessage)
+)
+
+_BY_KEY: Dict[Tuple[int, Optional[int]], Type[EcuMessage]] = {
+    (cls.get_id(), cls.get_sub_id() if issubclass(cls, EcuSubMessage) else None): cls
+    for cls in MESSAGE_CLASSES
+}
+
+
+def message_key(msg: CanMessage) -> Tuple[int, Optional[int]]:
+    """(arbitration ID, sub ID) of a frame, sub ID is None for plain messages."""
+    if msg.arbitration_id in SUB_MESSAGE_IDS and len(msg.data) > 0:
+        return msg.arbitration_id, msg.data[0]
+
+    return msg.arbitration_id, None
+
+
+def message_class(key: Tuple[int, Optional[int]]) -> Optional[Type[EcuMessage]]:
+    """Message class registered for a (arbitration ID, sub ID) key."""
+    return _BY_KEY.get(key)
@@ -0,0 +1,190 @@
+from doggie_lab.ecus.ecu import Ecu
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import cProfile
+import pstats
+import re
+import sys
+import threading
+import time
+
+
+# From Python 3.12 cProfile is built on sys.monitoring, which is process wide:
+# a single profiler can be enabled at a time, and it sees every thread
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class ThreadProfiler:
+    """
+    Deterministic profiler covering every thread of the simulator.
+
+    Once started, each new thread (ECU loops, report/control helpers, the
+    Notifier, bus writers...) gets its own cProfile.Profile on its first
+    profiled event. Threads that already exist are not profiled, except the
+    one calling `start`, so it must be started before building the car.
+
+    On Python 3.12+ a single profiler covers all the threads (dumped as one
+    all-threads.prof), new threads are only recorded for their CPU time.
+
+    `stop` samples the CPU time of the threads, so call it before stopping
+    the car: the clock of a finished thread can't be read anymore.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # thread ident -> (thread name, profile, None with a shared profile)
+        self._profiles: Dict[int, Tuple[str, Optional[cProfile.Profile]]] = {}
+        self._shared: Optional[cProfile.Profile] = None
+        self._wall_start = 0.0
+        # Thread CPU times and wall time sampled by `stop`
+        self._stopped_cpu: Optional[Dict[int, Optional[float]]] = None
+        self._wall_stop: Optional[float] = None
+
+    def start(self) -> None:
+        self._wall_start = time.monotonic()
+        self._stopped_cpu = None
+        self._wall_stop = None
+        if not PER_THREAD_PROFILES:
+            self._shared = cProfile.Profile()
+            self._shared.enable()
+
+        threading.setprofile(self._bootstrap)
+        self._profile_current_thread()
+
+    def stop(self) -> None:
+        if self._wall_stop is not None:
+            return
+
+        threading.setprofile(None)
+        self._wall_stop = time.monotonic()
+        with self._lock:
+            idents = list(self._profiles)
+        self._stopped_cpu = {ident: self._thread_cpu_time(ident) for ident in idents}
+
+        if self._shared is not None:
+            self._shared.disable()
+            return
+
+        with self._lock:
+            entry = self._profiles.get(threading.get_ident())
+        if entry is not None:
+            entry[1].disable()
+
+    def _bootstrap(self, frame, event, arg) -> None:
+        # First profiled event of a new thread: swap this hook for a profiler
+        sys.setprofile(None)
+        self._profile_current_thread()
+
+    def _profile_current_thread(self) -> None:
+        profile = cProfile.Profile() if PER_THREAD_PROFILES else None
+
+        with self._lock:
+            self._profiles[threading.get_ident()] = (
+                threading.current_thread().name,
+                profile,
+            )
+
+        if profile is not None:
+            profile.enable()
+
+    @staticmethod
+    def _thread_cpu_time(ident: int) -> Optional[float]:
+        """CPU time used by a live thread, None if it can't be measured."""
+        if not hasattr(time, "pthread_getcpuclockid"):
+            return None
+
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, OverflowError):
+            # The thread already finished
+            return None
+
+    def cpu_times(self) -> Dict[str, float]:
+        """
+        CPU time per thread name.
+
+        Uses the thread CPU clock when available, or the time recorded by the
+        profiler otherwise (which includes the profiling overhead, and is only
+        known per thread before Python 3.12).
+        """
+        times: Dict[str, float] = {}
+
+        with self._lock:
+            profiles = list(self._profiles.items())
+
+        for ident, (name, profile) in profiles:
+            if self._stopped_cpu is not None:
+                cpu = self._stopped_cpu.get(ident)
+            else:
+                cpu = self._thread_cpu_time(ident)
+            if cpu is None:
+                if profile is None:
+                    continue
+                cpu = pstats.Stats(profile).total_tt
+
+            times[name] = times.get(name, 0.0) + cpu
+
+        return times
+
+    @staticmethod
+    def _ecu_for_thread(name: str, ecus: Iterable[Ecu]) -> Optional[Ecu]:
+        for ecu in ecus:
+            if name == ecu.ecu_name or name.startswith(f"{ecu.ecu_name} "):
+                return ecu
+
+        return None
+
+    def summary(self, ecus: Iterable[Ecu]) -> str:
+        """CPU time per ECU class, threads not owned by an ECU listed on their own."""
+        ecus = list(ecus)
+        per_ecu: Dict[str, float] = {}
+        others: Dict[str, float] = {}
+
+        for name, cpu in self.cpu_times().items():
+            ecu = self._ecu_for_thread(name, ecus)
+            if ecu is None:
+                others[name] = others.get(name, 0.0) + cpu
+            else:
+                key = type(ecu).__name__
+                per_ecu[key] = per_ecu.get(key, 0.0) + cpu
+
+        end = time.monotonic() if self._wall_stop is None else self._wall_stop
+        wall = max(end - self._wall_start, 1e-9)
+        lines = [f"CPU time over {wall:.1f} s (process total {time.process_time():.2f} s)"]
+        for title, times in (("ECUs", per_ecu), ("Other threads", others)):
+            lines.append(f"{title}:")
+            for name, cpu in sorted(times.items(), key=lambda item: -item[1]):
+                lines.append(f"  {name:<32} {cpu:8.3f} s {cpu / wall * 100:6.1f}%")
+
+        return "\n".join(lines)
+
+    def dump(self, directory: str, ecus: Iterable[Ecu]) -> List[Path]:
+        """
+        Write one .prof file per thread (readable with pstats/snakeviz) and a
+        summary.txt with the CPU time per ECU class.
+
+        Returns:
+            Paths of the written files
+        """
+        out_dir = Path(directory)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+
+        with self._lock:
+            profiles = list(self._profiles.values())
+
+        if self._shared is not None:
+            profiles = [("all-threads", self._shared)]
+
+        for i, (name, profile) in enumerate(profiles):
+            safe_name = re.sub(r"[^\w.-]+", "_", name).strip("_")
+            path = out_dir / f"{i:02d}-{safe_name}.prof"
+            profile.dump_stats(path)
+            written.append(path)
+
+        summary = self.summary(ecus)
+        path = out_dir / "summary.txt"
+        path.write_text(summary + "\n")
+        written.append(path)
+
+        return written
@@ -0,0 +1,174 @@
+"""
+Periodic task timing.
+
+Periodic loops wait on a PeriodicTimer instead of sleeping for their period:
+deadlines are absolute (on the monotonic clock), so the time spent working
+doesn't add up to drift, and a cycle that overruns its deadline is counted
+as missed instead of silently shifting the schedule.
+
+In real-time mode (see `configure`) each timed thread optionally switches to
+SCHED_FIFO and/or pins itself to a set of CPUs (Linux only), and, if spinning
+is also enabled, timers sleep until shortly before the deadline and spin for
+the rest, which keeps wake-ups well under a millisecond late at the cost of a
+busy CPU.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Set
+import itertools
+import logging
+import os
+import threading
+import time
+import weakref
+
+
+logger = logging.getLogger(__name__)
+
+
+# Real-time timers sleep until this long before the deadline, then spin
+SPIN_THRESHOLD = 0.0005
+
+# SCHED_FIFO priority of timed threads in real-time mode
+FIFO_PRIORITY = 10
+
+
+@dataclass
+class TimingConfig:
+    realtime: bool = False
+    fifo: bool = False
+    cpus: Optional[Set[int]] = None
+    spin: bool = False
+
+
+_config = TimingConfig()
+# Timers still in use, by creation order: the report lists them as they were created
+_timers: "weakref.WeakValueDictionary[int, PeriodicTimer]" = weakref.WeakValueDictionary()
+_timer_ids = itertools.count()
+_timers_lock = threading.Lock()
+
+
+def configure(
+    realtime: bool = False,
+    fifo: bool = False,
+    cpus: Optional[Set[int]] = None,
+    spin: bool = False,
+) -> None:
+    """
+    Select the timing mode of every PeriodicTimer.
+
+    Must be called before the timed threads start (i.e., before building the car).
+
+    Args:
+        realtime: Use hybrid sleep/spin waits
+        fifo: Run timed threads with the SCHED_FIFO policy (needs CAP_SYS_NICE)
+        cpus: Pin timed threads to these CPUs
+        spin: Busy-wait the last SPIN_THRESHOLD before each deadline
+    """
+    global _config
+    _config = TimingConfig(realtime, fifo, cpus, spin)
+
+
+def get_config() -> TimingConfig:
+    """Timing mode selected by `configure` (e.g., to apply it in a worker process)."""
+    return _config
+
+
+def _setup_thread(name: str) -> None:
+    """Apply the real-time scheduling options to the calling thread."""
+    if _config.cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, _config.cpus)
+        except OSError as e:
+            logger.warning("Can't pin %s to CPUs %s: %s", name, sorted(_config.cpus), e)
+
+    if _config.fifo:
+        if not hasattr(os, "sched_setscheduler"):
+            logger.warning("SCHED_FIFO not available for %s", name)
+            return
+
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(FIFO_PRIORITY))
+        except OSError as e:
+            logger.warning("Can't use SCHED_FIFO for %s: %s", name, e)
+
+
+class PeriodicTimer:
+    """
+    Absolute deadline scheduler for a periodic loop.
+
+    The loop calls `wait` at the top of every cycle. Cycles whose work
+    overruns the next deadline are counted in `missed`; if the overrun spans
+    whole periods, those cycles are skipped (counted in `skipped`) rather than
+    run back to back.
+
+    Args:
+        period: Seconds between cycles
+        name: Task name, used in reports
+    """
+
+    def __init__(self, period: float, name: str) -> None:
+        self.period = period
+        self.name = name
+        self.cycles = 0
+        self.missed = 0
+        self.skipped = 0
+        self.max_lateness = 0.0
+
+        self._deadline: Optional[float] = None
+
+        with _timers_lock:
+            _timers[next(_timer_ids)] = self
+
+    def wait(self) -> None:
+        """Block until the start of the next cycle."""
+        now = time.monotonic()
+
+        if self._deadline is None:
+            # First cycle, in the thread that runs the loop
+            if _config.realtime:
+                _setup_thread(self.name)
+            self._deadline = now + self.period
+
+        elif now > self._deadline:
+            self.missed += 1
+            late_periods = int((now - self._deadline) / self.period)
+            if late_periods:
+                self.skipped += late_periods
+                self._deadline += late_periods * self.period
+
+        if _config.realtime and _config.spin:
+            self._sleep_spin(self._deadline)
+        else:
+            remaining = self._deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+        self.max_lateness = max(self.max_lateness, time.monotonic() - self._deadline)
+        self.cycles += 1
+        self._deadline += self.period
+
+    @staticmethod
+    def _sleep_spin(deadline: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining > SPIN_THRESHOLD:
+            time.sleep(remaining - SPIN_THRESHOLD)
+
+        while time.monotonic() < deadline:
+            # Let the other threads run, a spinning thread would hold the GIL
+            time.sleep(0)
+
+
+def timers() -> List[PeriodicTimer]:
+    with _timers_lock:
+        return [_timers[key] for key in sorted(_timers.keys())]
+
+
+def format_report() -> str:
+    lines = [f"{'Task':<28} {'Period':>9} {'Cycles':>8} {'Missed':>7} {'Skipped':>8} {'Max late':>9}"]
+    for timer in timers():
+        lines.append(
+            f"{timer.name:<28} {timer.period * 1e3:7.1f}ms {timer.cycles:>8}"
+            f" {timer.missed:>7} {timer.skipped:>8} {timer.max_lateness * 1e3:7.3f}ms"
+        )
+
+    return "\n".join(lines)
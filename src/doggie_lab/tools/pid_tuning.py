@@ -0,0 +1,203 @@
+"""
+Offline gain tuning of the cruise control PID.
+
+The closed loop of CruiseControlEcu (PIDController every 200 ms) and
+CentralEcu's Engine (updated every 100 ms) is reproduced with NumPy arrays,
+one lane per (kp, ki, kd) combination, so a whole grid of gains is simulated
+in a single pass. The model keeps the integer truncations of the real code
+(throttle byte, rpm and speed) and leaves out the random idle fluctuation.
+
+Each combination is scored on settling time, overshoot and throttle effort.
+The best gains are written to the JSON file CruiseControlEcu loads at start.
+"""
+from doggie_lab.ecus.central_ecu import Engine
+from doggie_lab.ecus.cruise_control_ecu import CruiseControlEcu, PIDController
+from dataclasses import dataclass
+from typing import Tuple
+import argparse
+import json
+import numpy as np
+
+
+# Engine update and cruise control periods, in seconds
+ENGINE_PERIOD = 0.1
+CONTROL_PERIOD = 0.2
+
+
+@dataclass
+class Responses:
+    """Simulated closed loop responses, one row per gain combination."""
+
+    kp: np.ndarray
+    ki: np.ndarray
+    kd: np.ndarray
+    # Speed at every engine update, throttle at every control update
+    speed: np.ndarray
+    throttle: np.ndarray
+
+
+def simulate(
+    kp: np.ndarray,
+    ki: np.ndarray,
+    kd: np.ndarray,
+    setpoint: float,
+    duration: float,
+) -> Responses:
+    """Run the cruise control loop from idle towards `setpoint` for every gain lane."""
+    engine = Engine()
+    pid = PIDController()
+    n = len(kp)
+    steps = int(round(duration / ENGINE_PERIOD))
+    control_every = int(round(CONTROL_PERIOD / ENGINE_PERIOD))
+
+    rpm = np.full(n, engine.rpm, dtype=np.float64)
+    speed = np.zeros(n)
+    throttle = np.zeros(n)
+    previous_error = np.zeros(n)
+    integral = np.zeros(n)
+
+    rpm_range = engine.max_rpm - engine.idle_rpm
+    speeds = np.empty((n, steps))
+    throttles = np.empty((n, steps // control_every + 1))
+
+    for step in range(steps):
+        if step % control_every == 0:
+            # PIDController.update, then the throttle byte of CruiseControlMessage
+            error = setpoint - speed
+            integral = np.clip(integral + error * CONTROL_PERIOD, pid.integral_min, pid.integral_max)
+            derivative = kd * (error - previous_error) / CONTROL_PERIOD
+            output = np.clip(kp * error + ki * integral + derivative, pid.output_min, pid.output_max)
+            previous_error = error
+            throttle = np.clip(np.trunc(output), 0, 100)
+            throttles[:, step // control_every] = throttle
+
+        # Engine._update_on with the engine running
+        target = np.where(
+            throttle == 0,
+            engine.idle_rpm,
+            engine.idle_rpm + np.floor(rpm_range * throttle / 100),
+        )
+        acceleration = engine.rpm_acceleration * np.floor(1 + throttle / 100)
+        deceleration = engine.rpm_deceleration * np.floor(1 + (100 - throttle) / 100)
+        rpm = np.where(
+            rpm < target,
+            rpm + np.minimum(acceleration, target - rpm),
+            rpm - np.minimum(deceleration, np.maximum(rpm - target, 0)),
+        )
+        rpm = np.clip(rpm, 0, engine.max_rpm)
+
+        speed = np.where(
+            rpm > engine.idle_rpm,
+            np.floor(speed * 0.8 + (rpm - engine.idle_rpm) * 0.1 * 0.2),
+            0,
+        )
+        speeds[:, step] = speed
+
+    return Responses(kp, ki, kd, speeds, throttles[:, :int(np.ceil(steps / control_every))])
+
+
+def score(
+    responses: Responses,
+    setpoint: float,
+    band: float,
+    overshoot_weight: float,
+    effort_weight: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rank the simulated responses, lower is better.
+
+    Returns:
+        (score, settling time in s, overshoot in %, throttle effort in %/s)
+    """
+    speed = responses.speed
+    steps = speed.shape[1]
+    duration = steps * ENGINE_PERIOD
+
+    # Settled from the step after the last sample outside the band
+    outside = np.abs(speed - setpoint) > band
+    last_outside = steps - 1 - np.argmax(outside[:, ::-1], axis=1)
+    settling = np.where(outside.any(axis=1), (last_outside + 1) * ENGINE_PERIOD, 0.0)
+    # Never settled: penalize past the whole run
+    settling = np.where(outside[:, -1], 2 * duration, settling)
+
+    overshoot = np.maximum(speed.max(axis=1) - setpoint, 0) / setpoint * 100
+    effort = np.abs(np.diff(responses.throttle, axis=1)).sum(axis=1) / duration
+
+    total = settling + overshoot_weight * overshoot + effort_weight * effort
+    return total, settling, overshoot, effort
+
+
+def gain_range(values: list) -> np.ndarray:
+    start, stop, count = values
+    return np.linspace(float(start), float(stop), int(count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid search of the cruise control PID gains")
+    parser.add_argument(
+        "--kp", nargs=3, default=[0.1, 5.0, 25], metavar=("MIN", "MAX", "N"),
+        help="Proportional gains to try (default: 0.1 5 25)",
+    )
+    parser.add_argument(
+        "--ki", nargs=3, default=[0.0, 2.0, 21], metavar=("MIN", "MAX", "N"),
+        help="Integral gains to try (default: 0 2 21)",
+    )
+    parser.add_argument(
+        "--kd", nargs=3, default=[0.0, 1.0, 11], metavar=("MIN", "MAX", "N"),
+        help="Derivative gains to try (default: 0 1 11)",
+    )
+    parser.add_argument(
+        "--setpoint", type=float, default=60, help="Target speed in km/h (default: 60)"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=60, help="Simulated seconds (default: 60)"
+    )
+    parser.add_argument(
+        "--band", type=float, default=3, help="Settled when within this many km/h (default: 3)"
+    )
+    parser.add_argument(
+        "--overshoot-weight", type=float, default=0.5,
+        help="Score seconds per %% of overshoot (default: 0.5)",
+    )
+    parser.add_argument(
+        "--effort-weight", type=float, default=0.5,
+        help="Score seconds per %%/s of throttle movement (default: 0.5)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Best combinations to print (default: 10)"
+    )
+    parser.add_argument(
+        "--output", default=str(CruiseControlEcu.PID_CONFIG),
+        help=f"Gains file to write (default: {CruiseControlEcu.PID_CONFIG})",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Don't write the gains file")
+    args = parser.parse_args()
+
+    kp, ki, kd = np.meshgrid(gain_range(args.kp), gain_range(args.ki), gain_range(args.kd), indexing="ij")
+    responses = simulate(kp.ravel(), ki.ravel(), kd.ravel(), args.setpoint, args.duration)
+    total, settling, overshoot, effort = score(
+        responses, args.setpoint, args.band, args.overshoot_weight, args.effort_weight
+    )
+
+    print(f"{len(total)} gain combinations, {args.duration:.0f} s to {args.setpoint:.0f} km/h")
+    print(f"{'kp':>6} {'ki':>6} {'kd':>6} {'score':>8} {'settle':>8} {'overshoot':>10} {'effort':>8}")
+    for i in np.argsort(total)[:args.top]:
+        print(
+            f"{responses.kp[i]:6.2f} {responses.ki[i]:6.2f} {responses.kd[i]:6.2f}"
+            f" {total[i]:8.2f} {settling[i]:7.1f}s {overshoot[i]:9.1f}% {effort[i]:7.1f}%"
+        )
+
+    best = int(np.argmin(total))
+    gains = {
+        "kp": round(float(responses.kp[best]), 4),
+        "ki": round(float(responses.ki[best]), 4),
+        "kd": round(float(responses.kd[best]), 4),
+    }
+    if not args.dry_run:
+        with open(args.output, "w") as f:
+            json.dump(gains, f, indent=2)
+        print(f"Gains {gains} written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Golden trace regression runner.
+
+A scenario is a JSON file with timed inputs:
+
+    {
+        "duration": 8.0,
+        "snapshot": "warm.msgpack",
+        "inputs": [
+            {"t": 0.5, "command": ["Instrument Cluster ECU", "start_button", "OFF"]},
+            {"t": 2.0, "command": ["Cruise Control ECU", "set_speed", 60]},
+            {"t": 5.0, "frame": {"id": 258, "data": "0100"}}
+        ],
+        "tolerances": {"RpmStatusMessage.rpm": 40},
+        "time_tolerance": 0.3
+    }
+
+`command` inputs are dispatched like the GUI would (see UiLink.command),
+`frame` inputs are injected on the bus. `snapshot` (optional, relative to the
+scenario) is a Car.snapshot blob restored before starting. The cruise control
+runs with CruiseControlEcu.DEFAULT_GAINS, or the optional `pid` gains of the
+scenario, never with the ones tools/pid_tuning.py wrote for the simulator.
+
+Each scenario runs a headless Car on its own virtual bus, in its own process,
+and the decoded signals of the bus trace are compared with the golden trace
+stored next to the scenario (<name>.golden.npz). Signals are sampled on a
+common time grid and a sample passes if the golden value is within the value
+tolerance of what the new trace shows anywhere within the time tolerance.
+"""
+from doggie_lab import log
+from doggie_lab.analysis.log_import import signal_dtype
+from doggie_lab.car import Car
+from doggie_lab.ecus.cruise_control_ecu import CruiseControlEcu
+from doggie_lab.gui.link import UiLink
+from doggie_lab.messages import Signal, message_key, message_class
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import can
+import numpy as np
+
+
+# Sampling step of the comparison grid, in seconds
+GRID_STEP = 0.01
+
+DEFAULT_TIME_TOLERANCE = 0.25
+
+Trace = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+@dataclass
+class SignalDiff:
+    signal: str
+    mismatches: int
+    samples: int
+    first_mismatch: Optional[float]
+    max_error: float
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    passed: bool
+    frames: int = 0
+    elapsed: float = 0.0
+    diffs: List[SignalDiff] = field(default_factory=list)
+    error: str = ""
+
+
+def golden_path(scenario: Path) -> Path:
+    return scenario.with_suffix(".golden.npz")
+
+
+def run_scenario(path: Path) -> Tuple[Trace, int]:
+    """
+    Run a scenario against a fresh car.
+
+    Returns:
+        (decoded trace, number of frames captured)
+    """
+    scenario = json.loads(path.read_text())
+    inputs = sorted(scenario.get("inputs", []), key=lambda entry: entry["t"])
+
+    bus = can.ThreadSafeBus(
+        interface="virtual", channel=f"scenario-{path.stem}", receive_own_messages=True
+    )
+    notifier = can.Notifier(bus, [])
+    frames: List[can.Message] = []
+
+    # Gains the golden trace was recorded with
+    gains = {**CruiseControlEcu.DEFAULT_GAINS, **scenario.get("pid", {})}
+    with tempfile.TemporaryDirectory() as directory:
+        pid_config = Path(directory) / "cruise_pid.json"
+        pid_config.write_text(json.dumps(gains))
+        os.environ[CruiseControlEcu.PID_CONFIG_ENV] = str(pid_config)
+        car = Car(bus, notifier)
+    if scenario.get("snapshot"):
+        car.restore((path.parent / scenario["snapshot"]).read_bytes())
+    car.add_listener(frames.append)
+
+    start_wall = time.time()
+    start = time.monotonic()
+    car.start()
+
+    link = UiLink.get()
+    for entry in inputs:
+        time.sleep(max(0.0, start + entry["t"] - time.monotonic()))
+
+        if "command" in entry:
+            ecu_name, command, *args = entry["command"]
+            if not link.command(ecu_name, command, *args):
+                raise ValueError(f"No ECU handles {command} for {ecu_name}")
+
+        elif "frame" in entry:
+            bus.send(can.Message(
+                arbitration_id=entry["frame"]["id"],
+                data=bytes.fromhex(entry["frame"]["data"]),
+                is_extended_id=False,
+            ))
+
+    time.sleep(max(0.0, start + scenario["duration"] - time.monotonic()))
+    car.remove_listener(frames.append)
+    # No car.stop(): joining ECU loops that never return only adds delay, the
+    # worker process ends with the scenario anyway
+    notifier.stop()
+
+    columns: Dict[str, Tuple[Signal, list, list]] = {}
+    for frame in frames:
+        cls = message_class(message_key(frame))
+        msg = cls.from_can_msg(frame) if cls is not None else None
+        if msg is None:
+            continue
+
+        for signal in cls.SIGNALS:
+            _, t, v = columns.setdefault(f"{cls.__name__}.{signal.name}", (signal, [], []))
+            t.append(frame.timestamp - start_wall)
+            v.append(getattr(msg, signal.name))
+
+    trace = {
+        name: (np.array(t, dtype=np.float64), np.array(v, dtype=signal_dtype(signal)))
+        for name, (signal, t, v) in columns.items()
+    }
+
+    return trace, len(frames)
+
+
+def save_trace(path: Path, trace: Trace) -> None:
+    arrays = {}
+    for name, (t, v) in trace.items():
+        arrays[f"{name}.t"] = t
+        arrays[f"{name}.v"] = v
+    np.savez_compressed(path, **arrays)
+
+
+def load_trace(path: Path) -> Trace:
+    with np.load(path) as data:
+        names = {key.rsplit(".", 1)[0] for key in data.files}
+        return {name: (data[f"{name}.t"], data[f"{name}.v"]) for name in names}
+
+
+def sample(t: np.ndarray, v: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Value of a step signal at every grid time (the first value before it starts)."""
+    index = np.searchsorted(t, grid, side="right") - 1
+    return v[np.clip(index, 0, len(v) - 1)].astype(np.float64)
+
+
+def compare_signal(
+    name: str,
+    golden: Tuple[np.ndarray, np.ndarray],
+    trace: Tuple[np.ndarray, np.ndarray],
+    tolerance: float,
+    time_tolerance: float,
+    duration: float,
+) -> SignalDiff:
+    grid = np.arange(0.0, duration, GRID_STEP)
+    expected = sample(*golden, grid)
+
+    # Candidate values within +-time_tolerance of each grid time
+    offsets = np.arange(-time_tolerance, time_tolerance + GRID_STEP / 2, GRID_STEP)
+    window = sample(*trace, grid[np.newaxis, :] + offsets[:, np.newaxis])
+    low = window.min(axis=0) - tolerance
+    high = window.max(axis=0) + tolerance
+
+    error = np.maximum(low - expected, expected - high)
+    failed = error > 0
+    mismatches = int(np.count_nonzero(failed))
+
+    return SignalDiff(
+        signal=name,
+        mismatches=mismatches,
+        samples=len(grid),
+        first_mismatch=float(grid[np.argmax(failed)]) if mismatches else None,
+        max_error=float(error.max(initial=0.0)) if mismatches else 0.0,
+    )
+
+
+def check_scenario(path: str, update: bool = False) -> ScenarioResult:
+    """Run a scenario and compare it with (or store it as) its golden trace."""
+    scenario_path = Path(path)
+    result = ScenarioResult(scenario=str(scenario_path), passed=False)
+
+    try:
+        scenario = json.loads(scenario_path.read_text())
+
+        # Keep the runner's output readable, only ECU warnings and errors show
+        log.configure(level="WARNING")
+
+        start = time.monotonic()
+        trace, result.frames = run_scenario(scenario_path)
+        result.elapsed = time.monotonic() - start
+
+        if update:
+            save_trace(golden_path(scenario_path), trace)
+            result.passed = True
+            return result
+
+        golden = load_trace(golden_path(scenario_path))
+        tolerances = scenario.get("tolerances", {})
+        time_tolerance = scenario.get("time_tolerance", DEFAULT_TIME_TOLERANCE)
+
+        for name, golden_signal in sorted(golden.items()):
+            if name not in trace:
+                result.diffs.append(SignalDiff(name, 1, 1, 0.0, float("inf")))
+                continue
+
+            diff = compare_signal(
+                name,
+                golden_signal,
+                trace[name],
+                tolerances.get(name, 0),
+                time_tolerance,
+                scenario["duration"],
+            )
+            if diff.mismatches:
+                result.diffs.append(diff)
+
+        # New signals mean the frames changed, the golden has to be regenerated
+        for name in sorted(trace.keys() - golden.keys()):
+            result.diffs.append(SignalDiff(name, 1, 1, 0.0, float("inf")))
+
+        result.passed = not result.diffs
+
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def format_result(result: ScenarioResult) -> str:
+    status = "PASS" if result.passed else "FAIL"
+    lines = [f"{status} {result.scenario} ({result.frames} frames, {result.elapsed:.1f} s)"]
+
+    if result.error:
+        lines.append(f"  {result.error}")
+    for diff in result.diffs:
+        lines.append(
+            f"  {diff.signal}: {diff.mismatches}/{diff.samples} samples off,"
+            f" first at {diff.first_mismatch:.2f} s, max error {diff.max_error:g}"
+        )
+
+    return "\n".join(lines)
+
+
+def run_isolated(
+    scenarios: List[str], update: bool, jobs: Optional[int] = None
+) -> List[ScenarioResult]:
+    """
+    Check every scenario in a fresh interpreter, `jobs` at a time: ECU threads
+    never exit, and the UI link and timing configuration are per process.
+    """
+    context = multiprocessing.get_context("spawn")
+    if sys.version_info >= (3, 11):
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=context, max_tasks_per_child=1
+        ) as pool:
+            return list(pool.map(check_scenario, scenarios, [update] * len(scenarios)))
+
+    # Workers would be reused, give each scenario a pool of its own
+    jobs = jobs or os.cpu_count() or 1
+    results: List[ScenarioResult] = []
+    for start in range(0, len(scenarios), jobs):
+        batch = scenarios[start:start + jobs]
+        pools = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in batch]
+        futures = [
+            pool.submit(check_scenario, scenario, update) for pool, scenario in zip(pools, batch)
+        ]
+        results.extend(future.result() for future in futures)
+        for pool in pools:
+            pool.shutdown()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scenarios and compare them with their golden traces")
+    parser.add_argument("scenarios", nargs="+", help="Scenario JSON files")
+    parser.add_argument(
+        "--update", action="store_true", help="Store the new traces as the golden traces"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Scenarios run in parallel (default: number of CPUs)",
+    )
+    args = parser.parse_args()
+
+    results = run_isolated(args.scenarios, args.update, args.jobs)
+
+    for result in results:
+        print(format_result(result))
+
+    failed = sum(not result.passed for result in results)
+    print(f"{len(results) - failed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Client of a simulator running with --udp.
+
+Dumps the frames of the car's bus, or sends frames to it, without vcan or
+hardware. Other tools can join the same bus with UdpBus directly, or through
+python-can as interface "doggie_udp" (e.g., can.Bus(interface="doggie_udp",
+channel="127.0.0.1:29536")).
+"""
+from doggie_lab.car.udp_bus import DEFAULT_PORT, UdpBus
+from typing import Optional, Set
+import argparse
+import time
+import can
+
+
+def parse_frame(frame: str) -> can.Message:
+    """can-utils syntax: 123#DEADBEEF, 12345678#00 (extended ID), 123#R (remote)."""
+    can_id, separator, data = frame.partition("#")
+    if not separator or not can_id:
+        raise argparse.ArgumentTypeError(f"Invalid frame {frame}, expected ID#DATA")
+
+    try:
+        if data.upper().startswith("R"):
+            return can.Message(
+                arbitration_id=int(can_id, 16),
+                is_extended_id=len(can_id) > 3,
+                is_remote_frame=True,
+                dlc=int(data[1:] or "0"),
+            )
+
+        return can.Message(
+            arbitration_id=int(can_id, 16),
+            is_extended_id=len(can_id) > 3,
+            data=bytes.fromhex(data.replace(".", "")),
+        )
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid frame {frame}: {e}")
+
+
+def format_frame(msg: can.Message) -> str:
+    can_id = f"{msg.arbitration_id:08X}" if msg.is_extended_id else f"{msg.arbitration_id:03X}"
+    data = f"R{msg.dlc}" if msg.is_remote_frame else msg.data.hex().upper()
+    return f"({msg.timestamp:.6f}) {can_id}#{data}"
+
+
+def format_stats(bus: UdpBus) -> str:
+    stats = bus.stats
+    return (
+        f"TX {stats.tx_frames} frames in {stats.tx_datagrams} datagrams"
+        f" ({stats.frames_per_datagram:.1f} per datagram, {stats.tx_overruns} overruns),"
+        f" RX {stats.rx_frames} frames in {stats.rx_datagrams} datagrams"
+        f" ({stats.rx_lost} lost, {stats.rx_reordered} reordered, {stats.rx_malformed} malformed)"
+    )
+
+
+def dump(bus: UdpBus, ids: Optional[Set[int]], quiet: bool) -> None:
+    start = time.monotonic()
+    count = 0
+    try:
+        while True:
+            msg = bus.recv(timeout=1.0)
+            if msg is None or (ids is not None and msg.arbitration_id not in ids):
+                continue
+
+            count += 1
+            if not quiet:
+                print(format_frame(msg))
+
+    except KeyboardInterrupt:
+        elapsed = time.monotonic() - start
+        print(f"{count} frames in {elapsed:.1f} s ({count / elapsed:.0f} frames/s)")
+
+
+def send(bus: UdpBus, frames: list, count: int, interval: float) -> None:
+    start = time.monotonic()
+    for i in range(count):
+        for msg in frames:
+            bus.send(msg)
+
+        if interval:
+            # On schedule, not drifting by the time spent sending
+            time.sleep(max(0.0, start + (i + 1) * interval - time.monotonic()))
+
+    elapsed = time.monotonic() - start
+    sent = count * len(frames)
+    if elapsed > 0:
+        print(f"{sent} frames queued in {elapsed:.2f} s ({sent / elapsed:.0f} frames/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CAN over UDP client of the simulator")
+    parser.add_argument(
+        "--address", default=f"127.0.0.1:{DEFAULT_PORT}",
+        help=f"HOST:PORT of the simulator (default: 127.0.0.1:{DEFAULT_PORT})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = commands.add_parser("dump", help="Print the frames of the bus until Ctrl+C")
+    dump_parser.add_argument(
+        "--ids", type=lambda value: int(value, 16), nargs="+", help="Only these IDs (hex)"
+    )
+    dump_parser.add_argument("--quiet", action="store_true", help="Only count the frames")
+
+    send_parser = commands.add_parser("send", help="Send frames to the bus")
+    send_parser.add_argument("frames", type=parse_frame, nargs="+", metavar="ID#DATA")
+    send_parser.add_argument(
+        "--count", type=int, default=1, help="Times to send the frames (default: 1)"
+    )
+    send_parser.add_argument(
+        "--interval", type=float, default=0.0,
+        help="Seconds between repetitions, 0 for as fast as possible (default: 0)",
+    )
+
+    args = parser.parse_args()
+
+    bus = UdpBus(args.address)
+    try:
+        if args.command == "dump":
+            dump(bus, set(args.ids) if args.ids else None, args.quiet)
+        else:
+            send(bus, args.frames, args.count, args.interval)
+            # Let the writer flush the last datagrams
+            time.sleep(0.2)
+
+        print(format_stats(bus))
+
+    finally:
+        bus.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Transfer rate benchmark of the Memory ECU's UDS services.
+
+Dumps a region of the memory image with RequestUpload/TransferData and with
+ReadMemoryByAddress, and reports the payload rate of each. By default a
+Memory ECU is run in-process on a virtual bus, which measures the
+simulator's own ceiling; with --interface/--channel the benchmark talks to a
+running simulator instead.
+"""
+from doggie_lab.ecus.memory_ecu import MemoryEcu
+from typing import Any, Dict, Optional
+import argparse
+import sys
+import time
+import can
+import isotp
+
+
+class UdsClient:
+    """Minimal blocking UDS client on top of an ISO-TP stack."""
+
+    def __init__(self, bus: can.BusABC, notifier: can.Notifier, params: Dict[str, Any]) -> None:
+        self.stack = isotp.NotifierBasedCanStack(
+            bus,
+            notifier,
+            address=isotp.Address(isotp.AddressingMode.Normal_11bits, txid=0x7E2, rxid=0x7EA),
+            params=params,
+        )
+        self.stack.start()
+
+    def close(self) -> None:
+        self.stack.stop()
+
+    def request(self, payload: bytes, timeout: float = 5.0) -> bytes:
+        self.stack.send(payload)
+        response = self.stack.recv(block=True, timeout=timeout)
+        if response is None:
+            raise TimeoutError(f"No response to service 0x{payload[0]:02X}")
+        if response[0] == 0x7F:
+            raise RuntimeError(f"Service 0x{payload[0]:02X} rejected, NRC 0x{response[2]:02X}")
+
+        return bytes(response)
+
+    @staticmethod
+    def _address_and_length(address: int, size: int) -> bytes:
+        # 4 byte address, 4 byte size
+        return bytes([0x44]) + address.to_bytes(4, "big") + size.to_bytes(4, "big")
+
+    def upload(self, address: int, size: int) -> bytes:
+        response = self.request(bytes([0x35, 0x00]) + self._address_and_length(address, size))
+        length_len = response[1] >> 4
+        block_data = int.from_bytes(response[2:2 + length_len], "big") - 2
+
+        data = bytearray()
+        counter = 1
+        while len(data) < size:
+            response = self.request(bytes([0x36, counter]))
+            data += response[2:]
+            counter = (counter + 1) & 0xFF
+            if len(response) - 2 < block_data and len(data) < size:
+                raise RuntimeError("Short TransferData block")
+
+        self.request(bytes([0x37]))
+        return bytes(data)
+
+    def read_memory(self, address: int, size: int, chunk: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            n = min(chunk, size - len(data))
+            data += self.request(bytes([0x23]) + self._address_and_length(address + len(data), n))[1:]
+
+        return bytes(data)
+
+
+def run(name: str, size: int, transfer, expected: Optional[memoryview]) -> None:
+    start = time.perf_counter()
+    data = transfer()
+    elapsed = time.perf_counter() - start
+
+    check = ""
+    if expected is not None:
+        check = ", data OK" if data == expected else ", DATA MISMATCH"
+
+    print(f"{name:<28} {size / 1024:8.0f} KiB in {elapsed:6.2f} s: {size / 1024 / elapsed:8.1f} KiB/s{check}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory ECU UDS transfer rate benchmark")
+    parser.add_argument(
+        "--interface", help="Benchmark a running simulator through this python-can interface"
+    )
+    parser.add_argument("--channel", help="Channel of the bus (e.g., can0)")
+    parser.add_argument(
+        "--size", type=int, default=256 * 1024, help="Bytes to transfer (default: 256 KiB)"
+    )
+    parser.add_argument(
+        "--read-chunk", type=int, default=MemoryEcu.MAX_RESPONSE - 1,
+        help=f"Bytes per ReadMemoryByAddress (default: {MemoryEcu.MAX_RESPONSE - 1})",
+    )
+    parser.add_argument(
+        "--max-response", type=int, default=MemoryEcu.MAX_RESPONSE,
+        help="Largest response of the in-process Memory ECU, above 4095 bytes needs"
+        f" ISO-TP frames longer than the standard ones (default: {MemoryEcu.MAX_RESPONSE})",
+    )
+    parser.add_argument("--blocksize", type=int, default=0, help="ISO-TP block size (default: 0)")
+    parser.add_argument("--stmin", type=int, default=0, help="ISO-TP STmin (default: 0)")
+    parser.add_argument("--fd", action="store_true", help="Use 64 byte CAN FD frames")
+    args = parser.parse_args()
+
+    params = {
+        "tx_padding": 0x00,
+        "blocksize": args.blocksize,
+        "stmin": args.stmin,
+        "max_frame_size": max(args.max_response, MemoryEcu.MAX_RESPONSE),
+    }
+    if args.fd:
+        params.update({"tx_data_length": 64, "can_fd": True})
+
+    ecu = None
+    if args.interface is None:
+        bus = can.ThreadSafeBus(interface="virtual", channel="uds_benchmark", fd=args.fd)
+        ecu_bus = can.ThreadSafeBus(interface="virtual", channel="uds_benchmark", fd=args.fd)
+        ecu_notifier = can.Notifier(ecu_bus, [])
+        ecu = MemoryEcu(
+            ecu_bus, ecu_notifier, isotp_params=params, max_response=args.max_response
+        )
+        ecu.start()
+    else:
+        bus = can.Bus(interface=args.interface, channel=args.channel, fd=args.fd)
+
+    notifier = can.Notifier(bus, [])
+    client = UdsClient(bus, notifier, params)
+
+    address = MemoryEcu.IMAGE_BASE
+    expected = ecu.image[:args.size] if ecu is not None else None
+
+    try:
+        run("RequestUpload/TransferData", args.size, lambda: client.upload(address, args.size), expected)
+        run(
+            f"ReadMemoryByAddress ({args.read_chunk} B)",
+            args.size,
+            lambda: client.read_memory(address, args.size, args.read_chunk),
+            expected,
+        )
+
+    except (TimeoutError, RuntimeError) as e:
+        print(e)
+        sys.exit(1)
+
+    finally:
+        client.close()
+        notifier.stop()
+        bus.shutdown()
+        if ecu is not None:
+            ecu.stop()
+            ecu_notifier.stop()
+            ecu_bus.shutdown()
+
+
+if __name__ == "__main__":
+    main()